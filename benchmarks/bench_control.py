@@ -0,0 +1,59 @@
+# benchmarks/bench_control.py
+"""
+Microbenchmark: control-signal decode per instruction.
+
+Compares the reference if/elif control logic (one new ControlSignals
+per call) against the precomputed, interned lookup table.
+
+Usage (from the project root):
+  python -m benchmarks.bench_control [iterations]
+"""
+import sys
+import timeit
+from typing import Optional
+
+from src.cpu_core.isa import decode
+from src.cpu_core.control import _compute_control, control_for_word, decode_control
+
+
+# A mix of common RV32I instructions
+WORDS = [
+    0x00500093,   # addi x1, x0, 5
+    0x002081B3,   # add  x3, x1, x2
+    0x40110233,   # sub  x4, x2, x1
+    0x0000A183,   # lw   x3, 0(x1)
+    0x0020A023,   # sw   x2, 0(x1)
+    0xFE009CE3,   # bne  x1, x0, -8
+    0x123452B7,   # lui  x5, 0x12345
+    0x0000006F,   # jal  x0, 0
+]
+DECODED = [decode(w) for w in WORDS]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    iterations = int(argv[0]) if argv else 100_000
+
+    cases = {
+        "reference (if/elif + alloc)": lambda: [
+            _compute_control(d.opcode, d.funct3, d.funct7) for d in DECODED
+        ],
+        "decode_control (table)": lambda: [decode_control(d) for d in DECODED],
+        "control_for_word (table)": lambda: [control_for_word(w) for w in WORDS],
+    }
+
+    per_call = len(WORDS) * iterations
+    baseline = None
+    for name, fn in cases.items():
+        best = min(timeit.repeat(fn, number=iterations, repeat=3))
+        ns = best / per_call * 1e9
+        if baseline is None:
+            baseline = ns
+        print(f"  {name:<28} {ns:8.1f} ns/instr  ({baseline / ns:4.1f}x)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
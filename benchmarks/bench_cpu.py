@@ -0,0 +1,100 @@
+# benchmarks/bench_cpu.py
+"""
+Instructions/second of the CPU execution engines on a .hex program,
+plus the register-file access paths CPU.step() can use.
+
+Usage (from the project root):
+  python -m benchmarks.bench_cpu [path/to/prog.hex] [steps] [repeats]
+"""
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from src.cpu_core.prog_loader import load_prog_hex
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import CPU
+from src.cpu_core.regfile import RegFile
+
+
+DEFAULT_HEX = Path(__file__).parent.parent / "tests" / "programs" / "prog.hex"
+
+
+# ------------------------------------------------------------
+# Timing helper
+# ------------------------------------------------------------
+def _bench(words: list[int], engine: Callable[[CPU, int], None],
+           steps: int, repeats: int) -> float:
+    """Return the best instructions/second over several fresh runs."""
+    best = 0.0
+    for _ in range(repeats):
+        imem = Memory(1024)
+        dmem = Memory(1024)
+        imem.load_program(words)
+        cpu = CPU(imem, dmem)
+
+        t0 = time.perf_counter()
+        engine(cpu, steps)
+        elapsed = time.perf_counter() - t0
+
+        best = max(best, cpu.cycle / elapsed)
+    return best
+
+
+def _bench_regfile(checked: bool, rounds: int, repeats: int) -> float:
+    """Return the best register accesses/second (two reads + one write per op)."""
+    regs = RegFile()
+    if checked:
+        read, write = regs.read, regs.write
+    else:
+        read, write = regs.read_unchecked, regs.write_unchecked
+    best = 0.0
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for rd in range(32):
+                write(rd, (read(rd) + read(31 - rd)) & 0xFFFF_FFFF)
+        elapsed = time.perf_counter() - t0
+        best = max(best, 3 * 32 * rounds / elapsed)
+    return best
+
+
+ENGINES = {
+    "run":        lambda cpu, n: cpu.run(max_steps=n),
+    "run_fast":   lambda cpu, n: cpu.run_fast(max_steps=n),
+    "run_blocks": lambda cpu, n: cpu.run_blocks(max_steps=n),
+}
+
+
+# ------------------------------------------------------------
+# Command-line entry point
+# ------------------------------------------------------------
+def main(argv: Optional[list[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+
+    hex_path = argv[0] if len(argv) >= 1 else str(DEFAULT_HEX)
+    steps = int(argv[1]) if len(argv) >= 2 else 200_000
+    repeats = int(argv[2]) if len(argv) >= 3 else 3
+
+    words = load_prog_hex(hex_path)
+    print(f"{hex_path}: {steps} steps, best of {repeats}")
+
+    baseline = None
+    for name, engine in ENGINES.items():
+        ips = _bench(words, engine, steps, repeats)
+        if baseline is None:
+            baseline = ips
+        print(f"  {name:<11} {ips:>14,.0f} instr/s  ({ips / baseline:5.1f}x)")
+
+    print("RegFile access (what step() pays per instruction)")
+    checked = _bench_regfile(True, steps // 32, repeats)
+    unchecked = _bench_regfile(False, steps // 32, repeats)
+    print(f"  {'read/write':<11} {checked:>14,.0f} access/s  (  1.0x)")
+    print(f"  {'unchecked':<11} {unchecked:>14,.0f} access/s  ({unchecked / checked:5.1f}x)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+# benchmarks/bench_lockstep.py
+"""
+One kernel over many inputs: N reference CPUs vs one LockstepCPU.
+
+The kernel sums n + (n-1) + ... + 1 with n = 32 + (i % 8) per
+instance, so instances diverge near the end of the loop.
+
+Usage (from the project root):
+  python -m benchmarks.bench_lockstep [instances]
+"""
+import sys
+import time
+from typing import Optional
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import CPU, StopConditions
+from src.cpu_core.lockstep import LockstepCPU
+
+
+KERNEL = [
+    0x00050863,   # 0x00: beq  x10, x0, +16
+    0x00A585B3,   # 0x04: add  x11, x11, x10
+    0xFFF50513,   # 0x08: addi x10, x10, -1
+    0xFF5FF06F,   # 0x0C: jal  x0, -12
+    0x00B62023,   # 0x10: sw   x11, 0(x12)
+    0x00100073,   # 0x14: ebreak
+]
+DMEM_WORDS = 16
+
+
+def _imem() -> Memory:
+    imem = Memory(64)
+    imem.load_program(KERNEL)
+    return imem
+
+
+def _inputs(n: int) -> list[int]:
+    return [32 + (i % 8) for i in range(n)]
+
+
+def _run_reference(n: int) -> int:
+    total = 0
+    imem = _imem()
+    for x10 in _inputs(n):
+        cpu = CPU(imem, Memory(DMEM_WORDS))
+        cpu.regs.write(10, x10)
+        cpu.run(max_steps=10_000, stop=StopConditions())
+        total += cpu.cycle
+    return total
+
+
+def _run_lockstep(n: int) -> int:
+    batch = LockstepCPU(_imem(), n, DMEM_WORDS)
+    batch.set_reg(10, _inputs(n))
+    batch.run(max_steps=10_000, stop=StopConditions())
+    return int(batch.cycle.sum())
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    n = int(argv[0]) if argv else 2000
+
+    print(f"{n} instances")
+    baseline = None
+    for name, fn in (("CPU.run x N", _run_reference), ("LockstepCPU", _run_lockstep)):
+        t0 = time.perf_counter()
+        instrs = fn(n)
+        ips = instrs / (time.perf_counter() - t0)
+        if baseline is None:
+            baseline = ips
+        print(f"  {name:<12} {ips:>14,.0f} instr/s  ({ips / baseline:5.1f}x)")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,58 @@
+# benchmarks/bench_memory.py
+"""
+Whole-memory operations: list-backed Memory vs array-backed ArrayMemory.
+
+Times the things done between runs on a large DMEM: reinitialise
+(reset), load an image (load_program, or straight from a .hex file),
+and inspect it (dump_words, or the zero-copy view() for ArrayMemory).
+
+Usage (from the project root):
+  python -m benchmarks.bench_memory [words] [repeats]
+"""
+import os
+import sys
+import tempfile
+import timeit
+from typing import Optional
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.array_memory import ArrayMemory
+from src.cpu_core.prog_loader import load_hex_into, load_prog_hex
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    words = int(argv[0]) if argv else 1 << 20
+    repeats = int(argv[1]) if len(argv) >= 2 else 3
+
+    image = list(range(words))
+    print(f"{words} words ({words * 4 // (1 << 20)} MiB), best of {repeats}")
+
+    fd, hex_path = tempfile.mkstemp(suffix=".hex")
+    with os.fdopen(fd, "w") as f:
+        f.write("\n".join(f"{w:08X}" for w in image) + "\n")
+
+    for cls in (Memory, ArrayMemory):
+        mem = cls(words)
+        cases = {
+            "reset": lambda: mem.reset(0),
+            "load_program": lambda: mem.load_program(image),
+            "dump_words": lambda: mem.dump_words(),
+            "hex: list+load": lambda: mem.load_program(load_prog_hex(hex_path)),
+            "hex: streamed": lambda: load_hex_into(hex_path, mem),
+        }
+        if cls is ArrayMemory:
+            cases["view (no copy)"] = lambda: mem.view()
+
+        print(f"  {cls.__name__}")
+        for name, fn in cases.items():
+            best = min(timeit.repeat(fn, number=1, repeat=repeats))
+            print(f"    {name:<15} {best * 1e3:9.2f} ms")
+
+    os.unlink(hex_path)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
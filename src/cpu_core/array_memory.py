@@ -0,0 +1,133 @@
+# src/cpu_core/array_memory.py
+from array import array
+from typing import Iterable, List
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only as_numpy() needs it
+    np = None
+
+from .memory import Memory, _check_aligned, _mask32
+
+
+# array('I') must hold exactly one 32-bit word per item
+_WORD_TYPECODE = "I" if array("I").itemsize == 4 else "L"
+assert array(_WORD_TYPECODE).itemsize == 4
+
+
+def _to_words(values: Iterable[int]) -> array:
+    """Pack values into an unsigned 32-bit array, masking only if needed."""
+    if isinstance(values, array) and values.typecode == _WORD_TYPECODE:
+        return values
+    if not isinstance(values, (list, tuple)):
+        values = list(values)
+    try:
+        return array(_WORD_TYPECODE, values)
+    except OverflowError:
+        return array(_WORD_TYPECODE, [_mask32(v) for v in values])
+
+
+# ============================================================
+# AI-BEGIN
+# Contiguous word storage.  The words live in one array('I'), so
+# ranged operations are single C-level slice copies instead of
+# per-word Python loops, and the buffer can be exported without
+# copying.  The array is never resized, so exported views stay
+# valid for the lifetime of the memory.
+# ============================================================
+class ArrayMemory(Memory):
+    """
+    Memory backed by a flat array of unsigned 32-bit words.
+
+    Same API and error behaviour as Memory, plus bulk ranged
+    operations (load_words, store_words, fill, copy_within) and
+    zero-copy read-only views (view, as_numpy).
+    """
+
+    def __init__(self, num_words: int) -> None:
+        if num_words <= 0:
+            raise ValueError("num_words must be positive")
+        self._size = num_words
+        self._data = array(_WORD_TYPECODE, bytes(4 * num_words))
+        self._write_hooks = []
+
+    def _range(self, addr: int, num_words: int) -> int:
+        """Check an aligned word range and return its first index."""
+        _check_aligned(addr)
+        start = addr // 4
+        if num_words < 0 or start + num_words > self._size:
+            raise IndexError(
+                f"Range of {num_words} words at index {start} does not fit "
+                f"in memory of size {self._size}"
+            )
+        return start
+
+    # ----------------------------------------
+    # Bulk operations
+    # ----------------------------------------
+    def load_words(self, addr: int, num_words: int) -> List[int]:
+        """Return num_words words starting at addr."""
+        start = self._range(addr, num_words)
+        return self._data[start:start + num_words].tolist()
+
+    def store_words(self, addr: int, values: Iterable[int]) -> None:
+        """Store a sequence of words starting at addr."""
+        words = _to_words(values)
+        start = self._range(addr, len(words))
+        self._data[start:start + len(words)] = words
+        if self._write_hooks and words:
+            self._notify_write(addr, len(words))
+
+    def fill(self, addr: int, num_words: int, value: int = 0) -> None:
+        """Set num_words words starting at addr to value (memset)."""
+        start = self._range(addr, num_words)
+        self._data[start:start + num_words] = array(_WORD_TYPECODE, [_mask32(value)]) * num_words
+        if self._write_hooks and num_words:
+            self._notify_write(addr, num_words)
+
+    def copy_within(self, dst_addr: int, src_addr: int, num_words: int) -> None:
+        """Copy num_words words from src_addr to dst_addr (memmove: overlap is fine)."""
+        src = self._range(src_addr, num_words)
+        dst = self._range(dst_addr, num_words)
+        self._data[dst:dst + num_words] = self._data[src:src + num_words]
+        if self._write_hooks and num_words:
+            self._notify_write(dst_addr, num_words)
+
+    # ----------------------------------------
+    # Memory API overrides (whole-range fast paths)
+    # ----------------------------------------
+    def reset(self, value: int = 0) -> None:
+        """Fill memory with a repeated 32-bit value."""
+        self.fill(0, self._size, value)
+
+    def load_program(self, words: List[int], base_addr: int = 0) -> None:
+        """Load a list of 32-bit words into memory starting at base_addr."""
+        _check_aligned(base_addr)
+        start_idx = base_addr // 4
+        if start_idx + len(words) > self._size:
+            raise IndexError(
+                f"Program of {len(words)} words does not fit starting at "
+                f"index {start_idx} in memory of size {self._size}"
+            )
+        self.store_words(base_addr, words)
+
+    def dump_words(self) -> List[int]:
+        """Return a full copy of the memory array (prefer view() for large memories)."""
+        return self._data.tolist()
+
+    # ----------------------------------------
+    # Zero-copy views
+    # ----------------------------------------
+    def view(self) -> memoryview:
+        """Read-only memoryview of all words (format 'I', no copy)."""
+        return memoryview(self._data).toreadonly()
+
+    def as_numpy(self):
+        """Read-only uint32 NumPy array sharing this memory's buffer."""
+        if np is None:
+            raise ImportError("as_numpy requires numpy (pip install numpy)")
+        arr = np.frombuffer(self._data, dtype=np.uint32)
+        arr.flags.writeable = False
+        return arr
+# AI-END
+# ============================================================
@@ -0,0 +1,302 @@
+# src/cpu_core/batch.py
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, asdict, replace
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .image_cache import load_prog_hex_cached
+from .datapath import CPU, StopConditions, StopInfo, STOP_MAX_STEPS
+from .scheduler import STOP_CANCELLED
+from .run_cpu import build_cpu, _parse_int
+from .result_cache import ResultCache, dmem_digest, run_key
+
+
+# ----------------------------------------
+# Job description and compact result
+# ----------------------------------------
+@dataclass(frozen=True)
+class BatchJob:
+    """One program to run: a .hex path or an in-memory list of words."""
+    program: Union[str, Sequence[int]]
+    max_steps: int = 10_000
+    imem_words: int = 1024
+    dmem_words: int = 1024
+    pc_reset: int = 0
+
+    @property
+    def name(self) -> str:
+        if isinstance(self.program, str):
+            return self.program
+        return f"<{len(self.program)} words>"
+
+
+@dataclass(frozen=True)
+class JobResult:
+    """
+    Final state of one job, small enough to send between processes.
+
+    error is "ExcType: message" when loading or running raised; the
+    state fields then hold whatever the CPU reached before the error.
+    """
+    index: int
+    name: str
+    pc: int
+    regs: Tuple[int, ...]
+    cycle: int
+    stop_reason: Optional[str]
+    dmem_digest: Optional[str] = None
+    error: Optional[str] = None
+
+
+# ----------------------------------------
+# Worker side (runs inside the pool processes)
+# ----------------------------------------
+CANCEL_CHECK_STEPS = 1 << 14    # steps between cancellation checks
+
+
+def run_cancellable(
+    cpu: CPU,
+    max_steps: int,
+    stop: Optional[StopConditions],
+    cancelled: Callable[[], bool],
+) -> StopInfo:
+    """
+    CPU.run in slices of CANCEL_CHECK_STEPS, calling cancelled()
+    between slices; a True result ends the run with STOP_CANCELLED.
+    The time budget covers the whole run, not each slice.
+    """
+    deadline = None
+    if stop is not None and stop.time_budget is not None:
+        deadline = time.monotonic() + stop.time_budget
+
+    total = 0
+    while True:
+        slice_stop = stop
+        if deadline is not None:
+            slice_stop = replace(stop, time_budget=max(0.0, deadline - time.monotonic()))
+        info = cpu.run(max_steps=min(CANCEL_CHECK_STEPS, max_steps - total), stop=slice_stop)
+        total += info.steps
+        if info.reason != STOP_MAX_STEPS or total >= max_steps:
+            break
+        if cancelled():
+            info = StopInfo(STOP_CANCELLED, total, cpu.pc)
+            break
+    cpu.last_stop = StopInfo(info.reason, total, info.pc)
+    return cpu.last_stop
+
+
+def run_job(
+    index: int,
+    job: BatchJob,
+    stop: Optional[StopConditions] = StopConditions(),
+    digest: bool = False,
+    results: Optional[str] = None,
+    cancelled: Optional[Callable[[], bool]] = None,
+) -> JobResult:
+    """
+    Run one job in the current process and summarise it.  With a
+    results directory, finished runs are memoized there (see
+    result_cache.py) and repeated jobs are answered without running.
+    With a cancelled() callback the run can be stopped part-way
+    (see run_cancellable); a cancelled run is never memoized.
+    """
+    cpu = None
+    error = None
+    cache = key = None
+    try:
+        words = job.program
+        if isinstance(words, str):
+            words = load_prog_hex_cached(words)
+        if results is not None:
+            cache = ResultCache(results, store_dmem=False)
+            key = run_key(words, job.imem_words, job.dmem_words,
+                          job.max_steps, job.pc_reset, stop)
+            rec = cache.get(key)
+            if rec is not None:
+                return JobResult(index, job.name, rec.pc, rec.regs, rec.cycle,
+                                 rec.stop.reason, rec.dmem_digest if digest else None)
+        cpu = build_cpu(list(words), job.imem_words, job.dmem_words, job.pc_reset)
+        if cancelled is None:
+            cpu.run(max_steps=job.max_steps, stop=stop)
+        else:
+            run_cancellable(cpu, job.max_steps, stop, cancelled)
+    except (OSError, IndexError, ValueError) as exc:
+        error = f"{type(exc).__name__}: {exc}"
+
+    if (cache is not None and cpu is not None and error is None
+            and cpu.last_stop.reason != STOP_CANCELLED):
+        cache.put(key, cpu)
+
+    if cpu is None:
+        return JobResult(index, job.name, 0, (), 0, None, None, error)
+
+    return JobResult(
+        index=index,
+        name=job.name,
+        pc=cpu.pc,
+        regs=tuple(cpu.regs.dump()),
+        cycle=cpu.cycle,
+        stop_reason=None if error else cpu.last_stop.reason,
+        dmem_digest=dmem_digest(cpu.dmem.dump_words()) if digest else None,
+        error=error,
+    )
+
+
+def _run_chunk(
+    chunk: List[Tuple[int, BatchJob]],
+    stop: Optional[StopConditions],
+    digest: bool,
+    results: Optional[str] = None,
+) -> List[JobResult]:
+    return [run_job(i, job, stop, digest, results) for i, job in chunk]
+
+
+# ============================================================
+# AI-BEGIN
+# Pool driver.  Jobs are grouped into chunks so each pool task
+# amortises the pickling/IPC round trip over several programs;
+# chunks are submitted up front and yielded with as_completed(),
+# so results stream back in completion order.
+# ============================================================
+def run_batch(
+    jobs: Iterable[Union[BatchJob, str, Sequence[int]]],
+    workers: Optional[int] = None,
+    chunksize: int = 8,
+    stop: Optional[StopConditions] = StopConditions(),
+    digest: bool = False,
+    results: Optional[str] = None,
+) -> Iterator[JobResult]:
+    """
+    Run many programs across a process pool, yielding JobResults as
+    they finish (use JobResult.index to match them to the input).
+
+    Plain paths and word lists are wrapped in a default BatchJob.
+    workers=None uses every core; workers=0 runs in this process.
+    results names a result-cache directory shared by all workers.
+    """
+    if chunksize <= 0:
+        raise ValueError("chunksize must be positive")
+
+    indexed = [
+        (i, job if isinstance(job, BatchJob) else BatchJob(job))
+        for i, job in enumerate(jobs)
+    ]
+    chunks = [indexed[k:k + chunksize] for k in range(0, len(indexed), chunksize)]
+
+    if workers == 0:
+        for chunk in chunks:
+            yield from _run_chunk(chunk, stop, digest, results)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_chunk, chunk, stop, digest, results) for chunk in chunks]
+        for fut in as_completed(futures):
+            yield from fut.result()
+# AI-END
+# ============================================================
+
+
+# ------------------------------------------------------------
+# Command-line entry point
+# ------------------------------------------------------------
+def _read_job_file(path: str, defaults: BatchJob) -> List[BatchJob]:
+    """
+    Jobs file: one JSON object per line, e.g.
+      {"hex": "prog.hex", "max_steps": 500, "dmem_words": 4096}
+    Missing fields fall back to the command-line defaults.
+    """
+    jobs = []
+    with open(path, "r") as f:
+        for lineno, line in enumerate(f, start=1):
+            text = line.strip()
+            if not text or text.startswith("#"):
+                continue
+            try:
+                spec = json.loads(text)
+                program = spec["hex"] if "hex" in spec else spec["words"]
+            except (ValueError, KeyError) as e:
+                raise ValueError(f"Invalid job on line {lineno}: {line!r}") from e
+            jobs.append(BatchJob(
+                program=program,
+                max_steps=spec.get("max_steps", defaults.max_steps),
+                imem_words=spec.get("imem_words", defaults.imem_words),
+                dmem_words=spec.get("dmem_words", defaults.dmem_words),
+                pc_reset=spec.get("pc_reset", defaults.pc_reset),
+            ))
+    return jobs
+
+
+def _format_result(res: JobResult) -> str:
+    if res.error and not res.regs:
+        return f"{res.name}: ERROR {res.error}"
+    line = f"{res.name}: pc=0x{res.pc:08X} cycles={res.cycle}"
+    line += f" stop={res.stop_reason}" if res.stop_reason else ""
+    line += f" dmem={res.dmem_digest[:16]}" if res.dmem_digest else ""
+    line += f" ERROR {res.error}" if res.error else ""
+    return line
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cpu_core.batch",
+        description="Run many RV32I .hex programs across a process pool.",
+    )
+    parser.add_argument("hex_paths", nargs="*", help=".hex programs to run")
+    parser.add_argument("--jobs", metavar="FILE",
+                        help="JSON-lines file with per-job settings")
+    parser.add_argument("--max-steps", type=_parse_int, default=10_000)
+    parser.add_argument("--imem-words", type=_parse_int, default=1024)
+    parser.add_argument("--dmem-words", type=_parse_int, default=1024)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="pool size (default: all cores; 0 = in-process)")
+    parser.add_argument("--chunksize", type=int, default=8)
+    parser.add_argument("--digest", action="store_true",
+                        help="report a SHA-256 digest of each final DMEM")
+    parser.add_argument("--no-halt", action="store_true",
+                        help="ignore EBREAK/ECALL/self-loops and use the full budget")
+    parser.add_argument("--json", action="store_true",
+                        help="print one JSON object per result")
+    parser.add_argument("--result-cache", metavar="DIR", default=None,
+                        help="memoize finished runs in DIR; repeated jobs are not re-run")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    CLI usage:
+      python -m src.cpu_core.batch a.hex b.hex ... [--jobs FILE]
+          [--max-steps N] [--workers N] [--digest] [--json] [--result-cache DIR]
+
+    Returns 1 if any job reported an error.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    args = _build_parser().parse_args(argv)
+
+    defaults = BatchJob("", args.max_steps, args.imem_words, args.dmem_words)
+    jobs = [
+        BatchJob(p, defaults.max_steps, defaults.imem_words, defaults.dmem_words)
+        for p in args.hex_paths
+    ]
+    if args.jobs:
+        jobs += _read_job_file(args.jobs, defaults)
+
+    stop: Optional[StopConditions] = StopConditions()
+    if args.no_halt:
+        stop = None
+
+    failed = 0
+    for res in run_batch(jobs, workers=args.workers, chunksize=args.chunksize,
+                         stop=stop, digest=args.digest, results=args.result_cache):
+        failed += res.error is not None
+        print(json.dumps(asdict(res)) if args.json else _format_result(res),
+              flush=True)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
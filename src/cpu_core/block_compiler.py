@@ -0,0 +1,318 @@
+# src/cpu_core/block_compiler.py
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from .datapath import _alu_execute
+from .isa import INSTR_ECALL
+from .syscalls import GuestExit
+from .predecode import PredecodedInstr, predecode_word
+from .control import (
+    ALU_ADD,
+    ALU_SUB,
+    ALU_AND,
+    ALU_OR,
+    ALU_XOR,
+    ALU_SLT,
+    ALU_SLTU,
+    ALU_SLL,
+    ALU_SRL,
+    ALU_SRA,
+    ALU_COPY_B,
+    BR_EQ,
+    BR_NE,
+    BR_LT,
+    BR_GE,
+    BR_LTU,
+    BR_GEU,
+)
+
+
+# ----------------------------------------
+# Block compiler constants
+# ----------------------------------------
+WORD_MASK = 0xFFFF_FFFF
+SIGN_BIT = 0x8000_0000
+MAX_BLOCK_LEN = 64   # longest straight-line run compiled as one block
+
+
+# ----------------------------------------
+# A compiled basic block
+# ----------------------------------------
+class CompiledBlock(NamedTuple):
+    start: int          # PC of the first instruction
+    length: int         # number of instructions (cycle cost)
+    fn: Callable        # fn(x, ld, st, cpu) -> next_pc
+    source: str         # generated Python source (for debugging)
+
+
+# ----------------------------------------
+# Small source-generation helpers
+# ----------------------------------------
+def _reg(idx: int) -> str:
+    """Source for reading register x[idx] (x0 folds to a constant)."""
+    return "0" if idx == 0 else f"x[{idx}]"
+
+
+def _signed(expr: str) -> str:
+    """Source that reinterprets a masked 32-bit value as signed."""
+    return f"(({expr} ^ 0x80000000) - 0x80000000)"
+
+
+def _fold_signed(value: int) -> int:
+    return (value ^ SIGN_BIT) - SIGN_BIT
+
+
+# ============================================================
+# AI-BEGIN
+# Source generation for one ALU operation.
+# Operands are already masked 32-bit values; 'b_const' is set
+# when the second operand comes from a folded immediate.  The
+# emitted expression must reproduce _alu_execute bit-for-bit.
+# ============================================================
+def _alu_source(op: int, a: str, b: str, b_const: Optional[int]) -> str:
+    """Return a Python expression computing the masked ALU result."""
+    if op == ALU_ADD:
+        if b_const == 0:
+            return a
+        return f"({a} + {b}) & 0xFFFFFFFF"
+    if op == ALU_SUB:
+        return f"({a} - {b}) & 0xFFFFFFFF"
+    if op == ALU_AND:
+        return f"{a} & {b}"
+    if op == ALU_OR:
+        return f"{a} | {b}"
+    if op == ALU_XOR:
+        return f"{a} ^ {b}"
+
+    if op in (ALU_SLL, ALU_SRL, ALU_SRA):
+        shamt = str(b_const & 0x1F) if b_const is not None else f"({b} & 31)"
+        if op == ALU_SLL:
+            return f"({a} << {shamt}) & 0xFFFFFFFF"
+        if op == ALU_SRL:
+            return f"{a} >> {shamt}"
+        return f"({_signed(a)} >> {shamt}) & 0xFFFFFFFF"
+
+    if op == ALU_SLT:
+        sb = str(_fold_signed(b_const)) if b_const is not None else _signed(b)
+        return f"(1 if {_signed(a)} < {sb} else 0)"
+    if op == ALU_SLTU:
+        return f"(1 if {a} < {b} else 0)"
+    if op == ALU_COPY_B:
+        return b
+    return "0"  # fallback for unknown ALU ops (matches _alu_execute)
+
+
+def _branch_source(cond: int, a: str, b: str) -> str:
+    """Return a Python expression for a branch condition."""
+    if cond == BR_EQ:
+        return f"{a} == {b}"
+    if cond == BR_NE:
+        return f"{a} != {b}"
+    if cond == BR_LT:
+        return f"{_signed(a)} < {_signed(b)}"
+    if cond == BR_GE:
+        return f"{_signed(a)} >= {_signed(b)}"
+    if cond == BR_LTU:
+        return f"{a} < {b}"
+    if cond == BR_GEU:
+        return f"{a} >= {b}"
+    return "False"
+# AI-END
+# ============================================================
+
+
+# ============================================================
+# AI-BEGIN
+# Per-instruction code generation.  Each call appends the lines
+# for one instruction and returns True when it ends the block.
+# Memory accesses are wrapped so that a faulting load/store
+# leaves cpu.pc / cpu.cycle exactly where CPU.step would.
+# ============================================================
+def _emit_instr(
+    lines: List[str],
+    pc: int,
+    index: int,
+    pre: PredecodedInstr,
+) -> bool:
+    di, ctrl, imm = pre
+    rd, rs1, rs2 = di.rd, di.rs1, di.rs2
+    pc_plus_4 = (pc + 4) & WORD_MASK
+    imm32 = imm & WORD_MASK
+
+    def write_rd(expr: str) -> None:
+        if ctrl.reg_write and rd != 0:
+            lines.append(f"    x[{rd}] = {expr}")
+
+    def guarded(stmt: str) -> None:
+        lines.append("    try:")
+        lines.append(f"        {stmt}")
+        lines.append("    except Exception:")
+        lines.append(f"        cpu.pc = {pc:#010x}")
+        if index:
+            lines.append(f"        cpu.cycle += {index}")
+        lines.append("        raise")
+
+    # --- Control transfers (block terminators) ----------------
+    if ctrl.system and di.instr == INSTR_ECALL:
+        # Serviced by cpu.syscalls (if attached); exit unwinds run_blocks
+        lines.append("    sc = cpu.syscalls")
+        lines.append("    if sc is not None and sc.ecall(cpu):")
+        lines.append(f"        raise GuestExit({pc_plus_4:#010x}, {index + 1})")
+        lines.append(f"    return {pc_plus_4:#010x}")
+        return True
+
+    if ctrl.jump:
+        write_rd(str(pc_plus_4))
+        lines.append(f"    return {(pc + imm) & WORD_MASK:#010x}")
+        return True
+
+    if ctrl.jalr:
+        lines.append(f"    t = ({_reg(rs1)} + {imm}) & 0xFFFFFFFE")
+        write_rd(str(pc_plus_4))
+        lines.append("    return t")
+        return True
+
+    if ctrl.branch_cond:
+        cond = _branch_source(ctrl.branch_cond, _reg(rs1), _reg(rs2))
+        target = (pc + imm) & WORD_MASK
+        lines.append(f"    return {target:#010x} if {cond} else {pc_plus_4:#010x}")
+        return True
+
+    # --- Memory access ----------------------------------------
+    if ctrl.mem_read or ctrl.mem_write:
+        if rs1 == 0:
+            addr = str(imm32)
+        else:
+            addr = _alu_source(ALU_ADD, _reg(rs1), str(imm32), imm32)
+        size = ctrl.mem_size
+        if ctrl.mem_read:
+            if size == 4:
+                load = f"ld({addr})"
+            else:
+                kind = "half" if size == 2 else "byte"
+                load = f"cpu.dmem.load_{kind}({addr})"
+                if not ctrl.mem_unsigned:
+                    sign = 0x8000 if size == 2 else 0x80
+                    load = f"(({load} ^ {sign:#x}) - {sign:#x}) & 0xFFFFFFFF"
+            guarded(f"x[{rd}] = {load}" if ctrl.reg_write and rd else load)
+        if ctrl.mem_write:
+            if size == 4:
+                guarded(f"st({addr}, {_reg(rs2)})")
+            else:
+                kind = "half" if size == 2 else "byte"
+                guarded(f"cpu.dmem.store_{kind}({addr}, {_reg(rs2)})")
+        return False
+
+    # --- Plain ALU / upper-immediate ops ----------------------
+    if not ctrl.reg_write or rd == 0:
+        return False  # no architectural effect
+
+    if ctrl.use_pc_plus_imm:
+        write_rd(f"{(pc + imm32) & WORD_MASK:#010x}")          # AUIPC
+    elif ctrl.use_imm_high or ctrl.alu_src_imm:
+        if rs1 == 0 or ctrl.use_imm_high:
+            write_rd(str(_alu_execute(ctrl.alu_op, 0, imm32)))     # constant
+        else:
+            write_rd(_alu_source(ctrl.alu_op, _reg(rs1), str(imm32), imm32))
+    else:
+        if rs1 == 0 and rs2 == 0:
+            write_rd(str(_alu_execute(ctrl.alu_op, 0, 0)))
+        else:
+            write_rd(_alu_source(ctrl.alu_op, _reg(rs1), _reg(rs2), None))
+    return False
+# AI-END
+# ============================================================
+
+
+# ----------------------------------------
+# Block compiler / cache
+# ----------------------------------------
+class BlockCompiler:
+    """
+    Translate basic blocks of IMEM into compiled Python functions.
+
+    A block starts at any PC execution reaches and ends at the first
+    BRANCH / JAL / JALR / ECALL (or after MAX_BLOCK_LEN instructions).  When
+    IMEM and DMEM are the same memory, stores also end a block so
+    self-modifying code is picked up.  Compiled blocks are cached by
+    start PC and dropped whenever IMEM words they cover are written.
+    """
+
+    def __init__(self, cpu, max_block_len: int = MAX_BLOCK_LEN) -> None:
+        self._cpu = cpu
+        self._imem = cpu.imem
+        self._max_len = max_block_len
+        self._blocks: Dict[int, CompiledBlock] = {}
+        self._covering: Dict[int, List[int]] = {}  # word addr -> block starts
+        self.compiled = 0
+        self._imem.add_write_hook(self.invalidate)
+
+    def get(self, pc: int) -> CompiledBlock:
+        """Return the compiled block starting at pc (compiling on a miss)."""
+        blk = self._blocks.get(pc)
+        if blk is None:
+            blk = self._compile(pc)
+        return blk
+
+    # --------------------------------------------------------
+    # Block discovery + code generation
+    # --------------------------------------------------------
+    def _compile(self, start: int) -> CompiledBlock:
+        imem = self._imem
+        stores_end_block = self._cpu.dmem is imem
+        name = f"_block_{start:08x}"
+        lines = [f"def {name}(x, ld, st, cpu):"]
+
+        pc = start
+        count = 0
+        ended = False
+        while count < self._max_len:
+            try:
+                word = imem.load_word(pc)
+            except (IndexError, ValueError):
+                if count == 0:
+                    raise       # same error CPU.step would raise
+                break           # let the next block fetch fault exactly
+            pre = predecode_word(word)
+            ended = _emit_instr(lines, pc, count, pre)
+            count += 1
+            pc = (pc + 4) & WORD_MASK
+            if ended or (stores_end_block and pre.ctrl.mem_write):
+                break
+
+        if not ended:
+            lines.append(f"    return {pc:#010x}")
+
+        source = "\n".join(lines) + "\n"
+        namespace: Dict[str, object] = {"GuestExit": GuestExit}
+        exec(compile(source, f"<block {start:#010x}>", "exec"), namespace)
+
+        blk = CompiledBlock(start, count, namespace[name], source)
+        self._blocks[start] = blk
+        for i in range(count):
+            self._covering.setdefault(start + 4 * i, []).append(start)
+        self.compiled += 1
+        return blk
+
+    # --------------------------------------------------------
+    # Invalidation (IMEM write hook)
+    # --------------------------------------------------------
+    def invalidate(self, addr: int, num_words: int) -> None:
+        """Drop every block that covers one of the written words."""
+        if not self._blocks:
+            return
+        if num_words > 64:
+            self.clear()
+            return
+        for i in range(num_words):
+            starts = self._covering.pop(addr + 4 * i, None)
+            if starts:
+                for s in starts:
+                    self._blocks.pop(s, None)
+
+    def clear(self) -> None:
+        """Drop every compiled block."""
+        self._blocks.clear()
+        self._covering.clear()
+
+    def __len__(self) -> int:
+        return len(self._blocks)
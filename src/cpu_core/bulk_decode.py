@@ -0,0 +1,143 @@
+# src/cpu_core/bulk_decode.py
+from dataclasses import dataclass
+from typing import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only this module needs it
+    np = None
+
+from .isa import OPCODES
+from .memory import Memory
+
+
+# ----------------------------------------
+# Instruction class ids (one per RV32I opcode group)
+# ----------------------------------------
+CLS_INVALID = 0
+CLS_OP      = 1
+CLS_OP_IMM  = 2
+CLS_LUI     = 3
+CLS_AUIPC   = 4
+CLS_JAL     = 5
+CLS_JALR    = 6
+CLS_BRANCH  = 7
+CLS_LOAD    = 8
+CLS_STORE   = 9
+CLS_SYSTEM  = 10
+
+CLASS_OF_OPCODE = {
+    OPCODES["OP"]:     CLS_OP,
+    OPCODES["OP_IMM"]: CLS_OP_IMM,
+    OPCODES["LUI"]:    CLS_LUI,
+    OPCODES["AUIPC"]:  CLS_AUIPC,
+    OPCODES["JAL"]:    CLS_JAL,
+    OPCODES["JALR"]:   CLS_JALR,
+    OPCODES["BRANCH"]: CLS_BRANCH,
+    OPCODES["LOAD"]:   CLS_LOAD,
+    OPCODES["STORE"]:  CLS_STORE,
+    OPCODES["SYSTEM"]: CLS_SYSTEM,
+}
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("bulk decoding requires numpy (pip install numpy)")
+
+
+# ----------------------------------------
+# Struct-of-arrays container
+# ----------------------------------------
+@dataclass
+class DecodedImage:
+    """Decoded fields for every word of an image, one NumPy array each."""
+    words: "np.ndarray"     # uint32 raw instruction words
+    opcode: "np.ndarray"    # uint8
+    rd: "np.ndarray"        # uint8
+    rs1: "np.ndarray"       # uint8
+    rs2: "np.ndarray"       # uint8
+    funct3: "np.ndarray"    # uint8
+    funct7: "np.ndarray"    # uint8
+    imm: "np.ndarray"       # int64, same value the datapath would use
+    iclass: "np.ndarray"    # uint8, one of the CLS_* ids
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+
+def _sign_extend(raw: "np.ndarray", bits: int) -> "np.ndarray":
+    """Vectorised isa.sign_extend on an int64 array."""
+    sign_bit = np.int64(1 << (bits - 1))
+    raw = raw & np.int64((1 << bits) - 1)
+    return (raw ^ sign_bit) - sign_bit
+
+
+# ============================================================
+# AI-BEGIN
+# Vectorised decode.  Every field is computed for every word with
+# whole-array shifts and masks; the per-format immediates are then
+# merged with np.select using the instruction class, mirroring the
+# opcode -> immediate mapping used by predecode_word().
+# ============================================================
+def decode_image(words: Sequence[int]) -> DecodedImage:
+    """Decode a whole array of 32-bit instruction words at once."""
+    _require_numpy()
+    w = np.asarray(words, dtype=np.int64) & 0xFFFF_FFFF
+
+    opcode = (w & 0x7F).astype(np.uint8)
+
+    # Class lookup: 128-entry table indexed by the opcode
+    table = np.zeros(128, dtype=np.uint8)
+    for opc, cls in CLASS_OF_OPCODE.items():
+        table[opc] = cls
+    iclass = table[opcode]
+
+    # --- Immediates for each format ---------------------------
+    imm_i = _sign_extend(w >> 20, 12)
+    imm_s = _sign_extend(((w >> 25) << 5) | ((w >> 7) & 0x1F), 12)
+    imm_b = _sign_extend(
+        (((w >> 31) & 0x1) << 12)
+        | (((w >> 7) & 0x1) << 11)
+        | (((w >> 25) & 0x3F) << 5)
+        | (((w >> 8) & 0xF) << 1),
+        13,
+    )
+    imm_u = w & 0xFFFF_F000
+    imm_j = _sign_extend(
+        (((w >> 31) & 0x1) << 20)
+        | (((w >> 12) & 0xFF) << 12)
+        | (((w >> 20) & 0x1) << 11)
+        | (((w >> 21) & 0x3FF) << 1),
+        21,
+    )
+
+    imm = np.select(
+        [
+            (iclass == CLS_OP_IMM) | (iclass == CLS_LOAD) | (iclass == CLS_JALR),
+            iclass == CLS_STORE,
+            iclass == CLS_BRANCH,
+            (iclass == CLS_LUI) | (iclass == CLS_AUIPC),
+            iclass == CLS_JAL,
+        ],
+        [imm_i, imm_s, imm_b, imm_u, imm_j],
+        default=0,
+    ).astype(np.int64)
+
+    return DecodedImage(
+        words=w.astype(np.uint32),
+        opcode=opcode,
+        rd=((w >> 7) & 0x1F).astype(np.uint8),
+        rs1=((w >> 15) & 0x1F).astype(np.uint8),
+        rs2=((w >> 20) & 0x1F).astype(np.uint8),
+        funct3=((w >> 12) & 0x7).astype(np.uint8),
+        funct7=((w >> 25) & 0x7F).astype(np.uint8),
+        imm=imm,
+        iclass=iclass,
+    )
+# AI-END
+# ============================================================
+
+
+def decode_memory(mem: Memory) -> DecodedImage:
+    """Decode every word currently held in a Memory."""
+    return decode_image(mem.dump_words())
@@ -0,0 +1,432 @@
+# src/cpu_core/bus.py
+import sys
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .memory import WriteHook, _check_aligned, _mask32
+from .paged_memory import PAGE_SHIFT, PAGE_SIZE
+
+
+# ----------------------------------------
+# Device base class
+# ----------------------------------------
+class Device(ABC):
+    """
+    A memory-mapped peripheral.  Subclasses implement read/write of
+    1, 2 or 4 bytes at a byte offset into the device; this class
+    supplies the Memory-style access methods the bus and CPU call.
+    """
+
+    size_bytes = PAGE_SIZE
+
+    @abstractmethod
+    def read(self, offset: int, size: int) -> int:
+        """Value of the size-byte register/field at offset."""
+
+    @abstractmethod
+    def write(self, offset: int, size: int, value: int) -> None:
+        """Store the size-byte value at offset."""
+
+    def flush(self) -> None:
+        """Push any buffered output to the host (no-op by default)."""
+
+    def _check(self, addr: int, size: int) -> None:
+        if size > 1:
+            _check_aligned(addr, size)
+        if not (0 <= addr and addr + size <= self.size_bytes):
+            raise IndexError(
+                f"{type(self).__name__} offset out of range: 0x{addr:X} "
+                f"(size=0x{self.size_bytes:X} bytes)"
+            )
+
+    def load_word(self, addr: int) -> int:
+        self._check(addr, 4)
+        return self.read(addr, 4)
+
+    def load_half(self, addr: int) -> int:
+        self._check(addr, 2)
+        return self.read(addr, 2)
+
+    def load_byte(self, addr: int) -> int:
+        self._check(addr, 1)
+        return self.read(addr, 1)
+
+    def store_word(self, addr: int, value: int) -> None:
+        self._check(addr, 4)
+        self.write(addr, 4, _mask32(value))
+
+    def store_half(self, addr: int, value: int) -> None:
+        self._check(addr, 2)
+        self.write(addr, 2, value & 0xFFFF)
+
+    def store_byte(self, addr: int, value: int) -> None:
+        self._check(addr, 1)
+        self.write(addr, 1, value & 0xFF)
+
+
+# ============================================================
+# AI-BEGIN
+# UART: a transmit register, a status register and a receive
+# register.  Transmitted bytes collect in a buffer that is written
+# to the host stream in one call once it reaches flush_threshold
+# (or on flush()), instead of one write per character.
+# ============================================================
+UART_TX = 0x0          # write: transmit the low byte
+UART_STATUS = 0x4      # read: UART_TX_READY | UART_RX_AVAIL
+UART_RX = 0x8          # read: next received byte (0 if none)
+
+UART_TX_READY = 1 << 0
+UART_RX_AVAIL = 1 << 1
+
+
+class UART(Device):
+    """Console device with buffered host output and a queued input."""
+
+    def __init__(self, stream=None, flush_threshold: int = 4096) -> None:
+        self._stream = stream          # binary stream; None = sys.stdout
+        self.flush_threshold = flush_threshold
+        self._tx = bytearray()
+        self._rx: Deque[int] = deque()
+        self.bytes_sent = 0
+        self.flushes = 0
+
+    def feed(self, data: bytes) -> None:
+        """Queue bytes for the program to read from UART_RX."""
+        self._rx.extend(data)
+
+    def read(self, offset: int, size: int) -> int:
+        reg = offset & ~3
+        if reg == UART_STATUS:
+            value = UART_TX_READY | (UART_RX_AVAIL if self._rx else 0)
+        elif reg == UART_RX and self._rx:
+            value = self._rx.popleft()
+        else:
+            value = 0
+        return (value >> (8 * (offset & 3))) & ((1 << (8 * size)) - 1)
+
+    def write(self, offset: int, size: int, value: int) -> None:
+        if offset == UART_TX:
+            self._tx.append(value & 0xFF)
+            if len(self._tx) >= self.flush_threshold:
+                self.flush()
+
+    def flush(self) -> None:
+        if not self._tx:
+            return
+        stream = self._stream if self._stream is not None else sys.stdout.buffer
+        stream.write(bytes(self._tx))
+        stream.flush()
+        self.bytes_sent += len(self._tx)
+        self.flushes += 1
+        self._tx.clear()
+# AI-END
+# ============================================================
+
+
+# ============================================================
+# AI-BEGIN
+# Block device: 512-byte sectors behind a sector register, a
+# command register and a one-sector data window.  A program sets
+# BLK_SECTOR, copies data through the window at BLK_BUFFER and
+# writes BLK_CMD; BLK_STATUS reports whether the sector existed.
+# ============================================================
+SECTOR_SIZE = 512
+
+BLK_SECTOR = 0x00      # rw: sector number for the next command
+BLK_CMD = 0x04         # w:  BLK_CMD_READ / BLK_CMD_WRITE
+BLK_STATUS = 0x08      # r:  BLK_OK or BLK_ERROR (last command)
+BLK_COUNT = 0x0C       # r:  number of sectors
+BLK_BUFFER = 0x200     # rw: SECTOR_SIZE-byte data window
+
+BLK_CMD_READ = 1
+BLK_CMD_WRITE = 2
+BLK_OK = 0
+BLK_ERROR = 1
+
+
+class BlockDevice(Device):
+    """Sector-addressed disk backed by an in-memory image."""
+
+    size_bytes = BLK_BUFFER + SECTOR_SIZE
+
+    def __init__(self, image: Optional[bytes] = None, num_sectors: int = 64) -> None:
+        if image is None:
+            image = bytes(num_sectors * SECTOR_SIZE)
+        self.image = bytearray(image)
+        self.image += bytes(-len(self.image) % SECTOR_SIZE)
+        self.buffer = bytearray(SECTOR_SIZE)
+        self.sector = 0
+        self.status = BLK_OK
+
+    @classmethod
+    def from_file(cls, path: str) -> "BlockDevice":
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            f.write(self.image)
+
+    @property
+    def num_sectors(self) -> int:
+        return len(self.image) // SECTOR_SIZE
+
+    def read(self, offset: int, size: int) -> int:
+        if offset >= BLK_BUFFER:
+            pos = offset - BLK_BUFFER
+            return int.from_bytes(self.buffer[pos:pos + size], "little")
+        value = {BLK_SECTOR: self.sector, BLK_STATUS: self.status,
+                 BLK_COUNT: self.num_sectors}.get(offset & ~3, 0)
+        return (value >> (8 * (offset & 3))) & ((1 << (8 * size)) - 1)
+
+    def write(self, offset: int, size: int, value: int) -> None:
+        if offset >= BLK_BUFFER:
+            pos = offset - BLK_BUFFER
+            self.buffer[pos:pos + size] = value.to_bytes(size, "little")
+        elif offset == BLK_SECTOR:
+            self.sector = value
+        elif offset == BLK_CMD:
+            self._command(value)
+
+    def _command(self, cmd: int) -> None:
+        if cmd not in (BLK_CMD_READ, BLK_CMD_WRITE) or self.sector >= self.num_sectors:
+            self.status = BLK_ERROR
+            return
+        start = self.sector * SECTOR_SIZE
+        if cmd == BLK_CMD_READ:
+            self.buffer[:] = self.image[start:start + SECTOR_SIZE]
+        else:
+            self.image[start:start + SECTOR_SIZE] = self.buffer
+        self.status = BLK_OK
+# AI-END
+# ============================================================
+
+
+# ============================================================
+# AI-BEGIN
+# The bus.  Every mapped page number points straight at its
+# (device, base) pair in a dict, so an access costs one lookup
+# however many devices exist.  Large RAM should be the bus's
+# background 'ram', which serves every address no device claims
+# (with the bus address passed through unchanged), so it needs no
+# table entries at all: a lookup miss goes straight to it.  Write
+# hooks registered on the bus are forwarded from RAM devices
+# (installed only while the bus has hooks, so plain RAM stores pay
+# nothing extra).
+# ============================================================
+class Bus:
+    """
+    Address-range dispatch to RAM and devices; usable wherever the CPU
+    expects a Memory (imem and/or dmem).
+    """
+
+    def __init__(self, ram=None) -> None:
+        self.ram = ram
+        self._table: Dict[int, Tuple[object, int]] = {}
+        self._mappings: List[Tuple[int, int, object]] = []   # (base, size, device)
+        self._write_hooks: List[WriteHook] = []
+        self._forwarders: List[Tuple[object, WriteHook]] = []
+
+    # ----------------------------------------
+    # Mapping
+    # ----------------------------------------
+    def map(self, base: int, device, size: Optional[int] = None):
+        """
+        Map device (a Device or any Memory-like object) at the
+        page-aligned base.  Returns the device.
+        """
+        if base % PAGE_SIZE:
+            raise ValueError(f"Device base 0x{base:08X} is not page-aligned")
+        if size is None:
+            size = device.size_bytes
+        first = base >> PAGE_SHIFT
+        end = (base + size + PAGE_SIZE - 1) >> PAGE_SHIFT
+        for pn in range(first, end):
+            if pn in self._table:
+                raise ValueError(f"Device at 0x{base:08X} overlaps an existing mapping")
+        for pn in range(first, end):
+            self._table[pn] = (device, base)
+        self._mappings.append((base, size, device))
+        if self._write_hooks:
+            self._forward_hooks(device, base)
+        return device
+
+    def unmap(self, base: int) -> None:
+        """Remove the mapping that starts at base."""
+        for i, (b, size, device) in enumerate(self._mappings):
+            if b == base:
+                break
+        else:
+            raise ValueError(f"No device mapped at 0x{base:08X}")
+        del self._mappings[i]
+        for pn in range(base >> PAGE_SHIFT, (base + size + PAGE_SIZE - 1) >> PAGE_SHIFT):
+            del self._table[pn]
+        for fwd in [f for f in self._forwarders if f[0] is device]:
+            device.remove_write_hook(fwd[1])
+            self._forwarders.remove(fwd)
+
+    def device_at(self, addr: int) -> Tuple[object, int]:
+        """(device, base) serving addr; raises IndexError if unmapped."""
+        entry = self._table.get(addr >> PAGE_SHIFT)
+        if entry is not None:
+            return entry
+        if self.ram is not None:
+            return self.ram, 0
+        raise self._unmapped(addr)
+
+    @staticmethod
+    def _unmapped(addr: int) -> IndexError:
+        return IndexError(f"Bus error: no device at address 0x{addr:08X}")
+
+    @property
+    def devices(self) -> Tuple[Tuple[int, object], ...]:
+        """(base, device) for every mapping, in mapping order."""
+        return tuple((b, d) for b, _, d in self._mappings)
+
+    def flush(self) -> None:
+        """Flush every device that buffers output (e.g. the UART)."""
+        for _, _, device in self._mappings:
+            if isinstance(device, Device):
+                device.flush()
+
+    # ----------------------------------------
+    # Access (same API as Memory)
+    # ----------------------------------------
+    def load_word(self, addr: int) -> int:
+        entry = self._table.get(addr >> PAGE_SHIFT)
+        if entry is None:
+            if self.ram is None:
+                raise self._unmapped(addr)
+            return self.ram.load_word(addr)
+        dev, base = entry
+        return dev.load_word(addr - base)
+
+    def store_word(self, addr: int, value: int) -> None:
+        entry = self._table.get(addr >> PAGE_SHIFT)
+        if entry is None:
+            if self.ram is None:
+                raise self._unmapped(addr)
+            self.ram.store_word(addr, value)
+            return
+        dev, base = entry
+        dev.store_word(addr - base, value)
+
+    def load_half(self, addr: int) -> int:
+        entry = self._table.get(addr >> PAGE_SHIFT)
+        if entry is None:
+            if self.ram is None:
+                raise self._unmapped(addr)
+            return self.ram.load_half(addr)
+        dev, base = entry
+        return dev.load_half(addr - base)
+
+    def store_half(self, addr: int, value: int) -> None:
+        entry = self._table.get(addr >> PAGE_SHIFT)
+        if entry is None:
+            if self.ram is None:
+                raise self._unmapped(addr)
+            self.ram.store_half(addr, value)
+            return
+        dev, base = entry
+        dev.store_half(addr - base, value)
+
+    def load_byte(self, addr: int) -> int:
+        entry = self._table.get(addr >> PAGE_SHIFT)
+        if entry is None:
+            if self.ram is None:
+                raise self._unmapped(addr)
+            return self.ram.load_byte(addr)
+        dev, base = entry
+        return dev.load_byte(addr - base)
+
+    def store_byte(self, addr: int, value: int) -> None:
+        entry = self._table.get(addr >> PAGE_SHIFT)
+        if entry is None:
+            if self.ram is None:
+                raise self._unmapped(addr)
+            self.ram.store_byte(addr, value)
+            return
+        dev, base = entry
+        dev.store_byte(addr - base, value)
+
+    def load_program(self, words: List[int], base_addr: int = 0) -> None:
+        """Load words into the RAM (mapped or background) that holds base_addr."""
+        dev, base = self.device_at(base_addr)
+        if isinstance(dev, Device):
+            raise ValueError(f"Cannot load a program into {type(dev).__name__}")
+        dev.load_program(words, base_addr - base)
+
+    def dump_words(self, addr: int = 0, num_words: Optional[int] = None) -> List[int]:
+        """
+        Return num_words words starting at addr (device reads may have
+        side effects).  Without num_words, the RAM that holds addr is
+        dumped from addr to its end, so dump_words() works as it does
+        for a Memory.
+        """
+        if num_words is None:
+            _check_aligned(addr)
+            dev, base = self.device_at(addr)
+            if isinstance(dev, Device):
+                raise ValueError(f"num_words is required to read {type(dev).__name__} registers")
+            return dev.dump_words()[(addr - base) // 4:]
+        return [self.load_word(addr + 4 * i) for i in range(num_words)]
+
+    # ----------------------------------------
+    # Fork / restore (CPU.fork and time-travel snapshots)
+    # ----------------------------------------
+    def fork(self) -> "Bus":
+        """
+        Return a bus with the same layout whose RAM (background and
+        mapped memories) is forked with its own fork().  Devices are
+        shared with the fork: their registers and host I/O are not
+        part of the memory image.  Write hooks are not inherited.
+        """
+        child = Bus(self.ram.fork() if self.ram is not None else None)
+        for base, size, device in self._mappings:
+            child.map(base, device if isinstance(device, Device) else device.fork(), size)
+        return child
+
+    def restore(self, snapshot: "Bus") -> None:
+        """Make this bus's RAM equal to an earlier fork() (devices are left alone)."""
+        layout = [(b, size) for b, size, _ in self._mappings]
+        if ([(b, size) for b, size, _ in snapshot._mappings] != layout
+                or (snapshot.ram is None) != (self.ram is None)):
+            raise ValueError("Snapshot does not match this bus's mappings")
+        if self.ram is not None:
+            self.ram.restore(snapshot.ram)
+        for (_, _, device), (_, _, saved) in zip(self._mappings, snapshot._mappings):
+            if not isinstance(device, Device):
+                device.restore(saved)
+
+    # ----------------------------------------
+    # Write hooks (forwarded from RAM; device registers never hold code)
+    # ----------------------------------------
+    def add_write_hook(self, hook: WriteHook) -> None:
+        """Register hook(start_addr, num_words), called after RAM writes."""
+        if not self._write_hooks:
+            for base, _, device in self._mappings:
+                self._forward_hooks(device, base)
+            if self.ram is not None:
+                self._forward_hooks(self.ram, 0)
+        self._write_hooks.append(hook)
+
+    def remove_write_hook(self, hook: WriteHook) -> None:
+        self._write_hooks.remove(hook)
+        if not self._write_hooks:
+            for device, fwd in self._forwarders:
+                device.remove_write_hook(fwd)
+            self._forwarders.clear()
+
+    def _forward_hooks(self, device, base: int) -> None:
+        if isinstance(device, Device) or not hasattr(device, "add_write_hook"):
+            return
+
+        def forward(addr: int, num_words: int) -> None:
+            for hook in self._write_hooks:
+                hook(addr + base, num_words)
+
+        device.add_write_hook(forward)
+        self._forwarders.append((device, forward))
+# AI-END
+# ============================================================
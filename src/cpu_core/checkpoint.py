@@ -0,0 +1,372 @@
+# src/cpu_core/checkpoint.py
+import mmap
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+from array import array
+from dataclasses import replace
+from typing import Iterator, List, Optional, Tuple
+
+from .memory import Memory
+from .array_memory import ArrayMemory, _WORD_TYPECODE
+from .paged_memory import PagedMemory, PAGE_SHIFT, PAGE_SIZE
+from .regfile import NUM_REGS
+from .datapath import CPU, StopConditions, StopInfo, STOP_MAX_STEPS, STOP_TIMEOUT
+
+
+# ----------------------------------------
+# File format (all fields little-endian)
+#
+#   header   magic, version, flags, pc, cycle, index offset, exit
+#            code (meaningful with FLAG_EXITED)
+#   regs     32 × u32
+#   pages    raw 4 KiB pages (page-aligned in the file) or zlib blobs
+#   index    memory count, then per memory: kind, size, fill word,
+#            page count and one (page number, length, offset) entry
+#            per stored page
+#
+# Only pages that differ from the memory's fill pattern are stored.
+# ----------------------------------------
+MAGIC = b"RVCKPT\x00\x01"
+VERSION = 2
+
+FLAG_ZLIB = 1 << 0          # page blobs are zlib-compressed
+FLAG_SHARED_MEM = 1 << 1    # dmem is imem: only one memory stored
+FLAG_EXITED = 1 << 2        # the guest had exited (cpu.exit_code)
+
+KIND_MEMORY = 0
+KIND_ARRAY = 1
+KIND_PAGED = 2
+
+_HEADER = struct.Struct("<8sHHIQQi")
+_REGS = struct.Struct(f"<{NUM_REGS}I")
+_COUNT = struct.Struct("<B")
+_MEM = struct.Struct("<BxxxQIQ")
+_ENTRY = struct.Struct("<IIQ")
+
+_WORDS_PER_PAGE = PAGE_SIZE // 4
+_ZLIB_LEVEL = 1             # checkpoints are written often: favour speed
+_BIG_ENDIAN = sys.byteorder == "big"
+
+CHECKPOINT_SUFFIX = ".rvck"
+_NAME_RE = re.compile(r"^ckpt-(\d+)" + re.escape(CHECKPOINT_SUFFIX) + "$")
+
+
+# ----------------------------------------
+# Page enumeration per memory type
+# ----------------------------------------
+def _words_to_bytes(words: array) -> bytes:
+    if _BIG_ENDIAN:
+        words = array(_WORD_TYPECODE, words)
+        words.byteswap()
+    return words.tobytes()
+
+
+def _bytes_to_words(data) -> array:
+    words = array(_WORD_TYPECODE)
+    words.frombytes(data)
+    if _BIG_ENDIAN:
+        words.byteswap()
+    return words
+
+
+def _memory_pages(mem) -> Tuple[int, int, int, Iterator[Tuple[int, bytes]]]:
+    """Return (kind, size, fill word, iterator of non-blank pages)."""
+    if isinstance(mem, PagedMemory):
+        blank = mem._blank
+        candidates = set(mem._pages)
+        for region in mem.regions:
+            candidates.update(range(region.first_page, region.end_page))
+
+        def paged():
+            for pn in sorted(candidates):
+                page = bytes(mem._read_page(pn << PAGE_SHIFT))
+                if page != blank:
+                    yield pn, page
+        return KIND_PAGED, mem.size_bytes, struct.unpack_from("<I", blank)[0], paged()
+
+    if isinstance(mem, Memory):
+        kind = KIND_ARRAY if isinstance(mem, ArrayMemory) else KIND_MEMORY
+        data = mem._data
+
+        def dense():
+            for start in range(0, mem._size, _WORDS_PER_PAGE):
+                chunk = data[start:start + _WORDS_PER_PAGE]
+                if any(chunk):
+                    yield start // _WORDS_PER_PAGE, _words_to_bytes(array(_WORD_TYPECODE, chunk))
+        return kind, mem._size, 0, dense()
+
+    raise TypeError(f"Cannot checkpoint memory of type {type(mem).__name__}")
+
+
+# ============================================================
+# AI-BEGIN
+# Writing: pages are streamed to a temporary file and the index
+# goes at the end (its offset is patched into the header), so a
+# checkpoint never needs the whole memory image in RAM.  The file
+# is renamed into place only when complete, so a crash while
+# saving leaves the previous checkpoint intact.
+# ============================================================
+def save_checkpoint(cpu: CPU, path: str, compress: bool = False) -> int:
+    """
+    Write the CPU's registers, PC, cycle count and memory contents to
+    path.  Returns the number of pages stored.
+    """
+    shared = cpu.dmem is cpu.imem
+    mems = [cpu.imem] if shared else [cpu.imem, cpu.dmem]
+    flags = (FLAG_ZLIB if compress else 0) | (FLAG_SHARED_MEM if shared else 0)
+    exit_code = 0
+    if cpu.exit_code is not None:
+        flags |= FLAG_EXITED
+        exit_code = cpu.exit_code
+
+    index = bytearray(_COUNT.pack(len(mems)))
+    stored = 0
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, flags, cpu.pc, cpu.cycle, 0, exit_code))
+        f.write(_REGS.pack(*cpu.regs.dump()))
+
+        for mem in mems:
+            kind, size, fill, pages = _memory_pages(mem)
+            entries = bytearray()
+            count = 0
+            for pn, data in pages:
+                if compress:
+                    data = zlib.compress(data, _ZLIB_LEVEL)
+                else:
+                    # Page-align raw pages so restore maps them directly
+                    f.write(bytes(-f.tell() % PAGE_SIZE))
+                entries += _ENTRY.pack(pn, len(data), f.tell())
+                f.write(data)
+                count += 1
+            index += _MEM.pack(kind, size, fill, count) + entries
+            stored += count
+
+        index_offset = f.tell()
+        f.write(index)
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, flags, cpu.pc, cpu.cycle, index_offset,
+                             exit_code))
+    os.replace(tmp, path)
+    return stored
+# AI-END
+# ============================================================
+
+
+# ============================================================
+# AI-BEGIN
+# Restoring: the file is mmap'd read-only.  For an uncompressed
+# checkpoint, PagedMemory pages are installed as views of the
+# mapping without copying; they are not marked as owned, so the
+# first store to one copies it (the same copy-on-write path that
+# fork() uses) and the file is never modified.  Such a memory owns
+# the mapping (shared with its forks) and unmaps it in close();
+# otherwise - compressed pages, dense memories - everything is
+# decoded straight from the mapping and it is closed at once.
+# ============================================================
+class _CheckpointMapping:
+    """The mmap'd checkpoint file behind a restored PagedMemory's pages."""
+
+    def __init__(self, mm: mmap.mmap) -> None:
+        self._mm = mm
+        self.buf = memoryview(mm)
+        self._views: List[memoryview] = []
+        self.users = 0          # memories holding page views (see PagedMemory.fork)
+
+    def view(self, offset: int, length: int) -> memoryview:
+        view = self.buf[offset:offset + length]
+        self._views.append(view)
+        return view
+
+    def close(self) -> None:
+        """Drop one user; the last one (or a mapping nobody uses) unmaps the file."""
+        if self._mm.closed:
+            return
+        self.users -= 1
+        if self.users > 0:
+            return
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        self.buf.release()
+        self._mm.close()
+
+
+def _restore_memory(mapping: _CheckpointMapping, kind: int, size: int, fill: int,
+                    entries: List[Tuple[int, int, int]], compressed: bool):
+    buf = mapping.buf
+
+    def page_bytes(length: int, offset: int):
+        blob = buf[offset:offset + length]
+        return zlib.decompress(blob) if compressed else blob
+
+    if kind == KIND_PAGED:
+        mem = PagedMemory(size)
+        mem._blank = struct.pack("<I", fill) * _WORDS_PER_PAGE
+        for pn, length, offset in entries:
+            if compressed:
+                mem._pages[pn] = bytearray(page_bytes(length, offset))
+                mem._owned.add(pn)
+            else:
+                mem._pages[pn] = mapping.view(offset, length)
+        if entries and not compressed:
+            mem._backing.append(mapping)
+            mapping.users += 1
+        return mem
+
+    if kind not in (KIND_MEMORY, KIND_ARRAY):
+        raise ValueError(f"Unknown memory kind in checkpoint: {kind}")
+    mem = ArrayMemory(size) if kind == KIND_ARRAY else Memory(size)
+    for pn, length, offset in entries:
+        start = pn * _WORDS_PER_PAGE
+        words = _bytes_to_words(page_bytes(length, offset))
+        if start + len(words) > size:
+            raise ValueError(f"Checkpoint page {pn} does not fit in {size} words")
+        mem._data[start:start + len(words)] = (
+            words if kind == KIND_ARRAY else words.tolist()
+        )
+    return mem
+
+
+def load_checkpoint(path: str, predecode: bool = False, fuse: bool = False) -> CPU:
+    """
+    Recreate the CPU saved by save_checkpoint.  A PagedMemory restored
+    from an uncompressed checkpoint views the file; call its close()
+    to unmap it early.
+    """
+    with open(path, "rb") as f:
+        mapping = _CheckpointMapping(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    try:
+        return _load(path, mapping, predecode, fuse)
+    finally:
+        if mapping.users == 0:
+            mapping.close()             # nothing views the file
+
+
+def _load(path: str, mapping: _CheckpointMapping, predecode: bool, fuse: bool) -> CPU:
+    buf = mapping.buf
+    if len(buf) < _HEADER.size + _REGS.size:
+        raise ValueError(f"{path!r} is too short to be a checkpoint")
+    magic, version, flags, pc, cycle, index_offset, exit_code = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise ValueError(f"{path!r} is not a CPU checkpoint")
+    if version != VERSION:
+        raise ValueError(f"Unsupported checkpoint version {version} in {path!r}")
+    regs = _REGS.unpack_from(buf, _HEADER.size)
+
+    mems = []
+    pos = index_offset
+    (count,) = _COUNT.unpack_from(buf, pos)
+    pos += _COUNT.size
+    for _ in range(count):
+        kind, size, fill, npages = _MEM.unpack_from(buf, pos)
+        pos += _MEM.size
+        entries = [_ENTRY.unpack_from(buf, pos + i * _ENTRY.size) for i in range(npages)]
+        pos += npages * _ENTRY.size
+        mems.append(_restore_memory(mapping, kind, size, fill, entries,
+                                    bool(flags & FLAG_ZLIB)))
+
+    imem = mems[0]
+    dmem = imem if flags & FLAG_SHARED_MEM else mems[1]
+    cpu = CPU(imem, dmem, pc_reset=pc, predecode=predecode, fuse=fuse)
+    cpu.regs._regs[:] = regs
+    cpu.cycle = cycle
+    if flags & FLAG_EXITED:
+        cpu.exit_code = exit_code
+    return cpu
+# AI-END
+# ============================================================
+
+
+# ----------------------------------------
+# Checkpoint directories (used by the run_cpu CLI)
+# ----------------------------------------
+def checkpoint_path(directory: str, cycle: int) -> str:
+    """File name for the checkpoint taken at the given cycle."""
+    return os.path.join(directory, f"ckpt-{cycle:012d}{CHECKPOINT_SUFFIX}")
+
+
+def list_checkpoints(directory: str) -> List[str]:
+    """Checkpoints in directory, oldest (lowest cycle) first."""
+    if not os.path.isdir(directory):
+        return []
+    found = []
+    for name in os.listdir(directory):
+        m = _NAME_RE.match(name)
+        if m:
+            found.append((int(m.group(1)), os.path.join(directory, name)))
+    return [p for _, p in sorted(found)]
+
+
+def latest_checkpoint(directory: str) -> Optional[str]:
+    """Path of the most recent checkpoint in directory, or None."""
+    paths = list_checkpoints(directory)
+    return paths[-1] if paths else None
+
+
+def prune_checkpoints(directory: str, keep: int) -> None:
+    """Delete all but the newest 'keep' checkpoints."""
+    paths = list_checkpoints(directory)
+    for p in paths[:max(0, len(paths) - keep)]:
+        os.remove(p)
+
+
+# ============================================================
+# AI-BEGIN
+# Long runs with periodic checkpoints.  The run is cut into chunks
+# that end on multiples of 'every' cycles, so checkpoints land on
+# the same cycles whether or not the run was resumed.  The wall-
+# clock budget is shared by all chunks.
+# ============================================================
+def run_with_checkpoints(
+    cpu: CPU,
+    max_steps: int,
+    directory: str,
+    every: int,
+    stop: Optional[StopConditions] = None,
+    keep: int = 2,
+    compress: bool = False,
+) -> StopInfo:
+    """
+    Run until cpu.cycle reaches max_steps (counted from cycle 0, so a
+    resumed CPU continues toward the same total), writing a checkpoint
+    to directory every 'every' cycles and when the time budget runs
+    out.  Only the newest 'keep' checkpoints are kept.
+    """
+    if every <= 0:
+        raise ValueError("every must be positive")
+    os.makedirs(directory, exist_ok=True)
+
+    deadline = None
+    if stop is not None and stop.time_budget is not None:
+        deadline = time.monotonic() + stop.time_budget
+
+    def save() -> None:
+        save_checkpoint(cpu, checkpoint_path(directory, cpu.cycle), compress=compress)
+        prune_checkpoints(directory, keep)
+
+    total = 0
+    info = StopInfo(STOP_MAX_STEPS, 0, cpu.pc)
+    while cpu.cycle < max_steps:
+        chunk = min(every - cpu.cycle % every, max_steps - cpu.cycle)
+        chunk_stop = stop
+        if deadline is not None:
+            chunk_stop = replace(stop, time_budget=max(0.0, deadline - time.monotonic()))
+        info = cpu.run(max_steps=chunk, stop=chunk_stop)
+        total += info.steps
+        if info.reason == STOP_TIMEOUT:
+            save()
+        if info.reason != STOP_MAX_STEPS:
+            break
+        if cpu.cycle % every == 0:
+            save()
+
+    info = StopInfo(info.reason, total, cpu.pc)
+    cpu.last_stop = info
+    return info
+# AI-END
+# ============================================================
@@ -0,0 +1,231 @@
+# src/cpu_core/client.py
+#
+# Thin client for the simulation server (server.py).  It only uses
+# the standard library and imports nothing else from the package, so
+# a submission costs a bare interpreter start plus one round trip.
+import argparse
+import itertools
+import json
+import os
+import socket
+import sys
+import tempfile
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Optional, Sequence, Union
+
+ENV_SOCKET = "RVSIM_SOCKET"
+
+
+def default_socket_path() -> str:
+    """$RVSIM_SOCKET, else a per-user socket in $XDG_RUNTIME_DIR or the temp dir."""
+    explicit = os.environ.get(ENV_SOCKET)
+    if explicit:
+        return explicit
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(base, f"rv-sim-{uid}.sock")
+
+
+class SimClient:
+    """
+    Blocking connection to a running server.  submit() returns the
+    job id at once; replies() yields replies as the server sends
+    them, and wait()/run() pick out one job's reply (others are kept
+    for later).
+    """
+
+    def __init__(self, path: Optional[str] = None, host: Optional[str] = None,
+                 port: Optional[int] = None, timeout: Optional[float] = None):
+        if port is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(path or default_socket_path())
+        else:
+            sock = socket.create_connection((host or "127.0.0.1", port))
+        sock.settimeout(timeout)
+        self._sock = sock
+        self._file = sock.makefile("rb")
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._ids = itertools.count(1)
+
+    def close(self) -> None:
+        self._file.close()
+        self._sock.close()
+
+    def __enter__(self) -> "SimClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ----------------------------------------
+    # Requests
+    # ----------------------------------------
+    def send(self, req: Dict[str, Any]) -> None:
+        self._sock.sendall(json.dumps(req).encode() + b"\n")
+
+    def submit(self, program: Union[str, Sequence[int]], job_id=None, **options) -> Any:
+        """
+        Queue a job: a .hex path (made absolute, since the server has
+        its own working directory) or a list of words.  options are
+        the protocol fields: max_steps, dmem_words, no_halt, timeout, ...
+        """
+        if job_id is None:
+            job_id = f"c{next(self._ids)}"
+        req = dict(options, op="run", id=job_id)
+        if isinstance(program, str):
+            req["hex"] = os.path.abspath(program)
+        else:
+            req["words"] = list(program)
+        self.send(req)
+        return job_id
+
+    def cancel(self, job_id) -> None:
+        self.send({"op": "cancel", "id": job_id})
+
+    def stats(self) -> Dict[str, int]:
+        job_id = f"c{next(self._ids)}"
+        self.send({"op": "stats", "id": job_id})
+        return self.wait(job_id)["stats"]
+
+    def shutdown(self) -> None:
+        job_id = f"c{next(self._ids)}"
+        self.send({"op": "shutdown", "id": job_id})
+        self.wait(job_id)
+
+    # ----------------------------------------
+    # Replies
+    # ----------------------------------------
+    def _read(self) -> Dict[str, Any]:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("server closed the connection")
+        return json.loads(line)
+
+    def replies(self) -> Iterator[Dict[str, Any]]:
+        """Replies in arrival order (blocks until each one arrives)."""
+        while True:
+            yield self._pending.popleft() if self._pending else self._read()
+
+    def wait(self, job_id) -> Dict[str, Any]:
+        """Block until the reply for job_id arrives."""
+        for k, reply in enumerate(self._pending):
+            if reply.get("id") == job_id:
+                del self._pending[k]
+                return reply
+        while True:
+            reply = self._read()
+            if reply.get("id") == job_id:
+                return reply
+            self._pending.append(reply)
+
+    def run(self, program: Union[str, Sequence[int]], **options) -> Dict[str, Any]:
+        """Submit one job and wait for its reply."""
+        return self.wait(self.submit(program, **options))
+
+
+# ------------------------------------------------------------
+# Command-line entry point (stands in for run_cpu)
+# ------------------------------------------------------------
+def _print_result(res: Dict[str, Any]) -> None:
+    """Same layout as run_cpu's summary."""
+    print(f"Final PC  = 0x{res['pc']:08X}")
+    print("Registers:")
+    for i, val in enumerate(res["regs"]):
+        print(f"  x{i:02d} = 0x{val:08X}")
+    print(f"Total cycles: {res['cycle']}")
+    if res.get("stop_reason"):
+        print(f"Stop reason: {res['stop_reason']}")
+    if res.get("dmem_digest"):
+        print(f"DMEM digest: {res['dmem_digest']}")
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cpu_core.client",
+        description="Run an RV32I .hex program on a running simulation server "
+                    "and print the final CPU state.",
+    )
+    parser.add_argument("hex_path", nargs="?", help="path to the .hex program")
+    parser.add_argument("max_steps", nargs="?", type=lambda t: int(t, 0),
+                        default=10_000, help="step budget (default 10000)")
+    parser.add_argument("--no-halt", action="store_true",
+                        help="ignore EBREAK/ECALL/self-loops and use the full budget")
+    parser.add_argument("--target-pc", type=lambda t: int(t, 0), default=None,
+                        help="stop when the PC reaches this address")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="wall-clock budget in seconds (enforced by the server)")
+    parser.add_argument("--digest", action="store_true",
+                        help="also report a SHA-256 digest of the final DMEM")
+    parser.add_argument("--json", action="store_true",
+                        help="print the raw JSON reply")
+    parser.add_argument("--socket", default=None,
+                        help="server Unix socket (default $RVSIM_SOCKET or a per-user path)")
+    parser.add_argument("--port", type=int, default=None,
+                        help="connect to a loopback TCP server instead")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--stats", action="store_true",
+                        help="print the server's job counters and exit")
+    parser.add_argument("--shutdown", action="store_true",
+                        help="ask the server to exit")
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    CLI usage:
+      python -m src.cpu_core.client path/to/prog.hex [max_steps]
+          [--no-halt] [--target-pc ADDR] [--timeout SECONDS] [--digest] [--json]
+          [--socket PATH | --port N] [--stats] [--shutdown]
+
+    Returns 1 if the job failed, 2 if the server cannot be reached.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if not (args.hex_path or args.stats or args.shutdown):
+        parser.error("a .hex path (or --stats / --shutdown) is required")
+
+    try:
+        client = SimClient(args.socket, args.host, args.port)
+    except OSError as exc:
+        print(f"Cannot reach the simulation server: {exc}", file=sys.stderr)
+        return 2
+
+    try:
+        with client:
+            return _session(client, args)
+    except OSError as exc:          # includes a reset or closed connection
+        print(f"Lost the connection to the simulation server: {exc}", file=sys.stderr)
+        return 2
+
+
+def _session(client: SimClient, args: argparse.Namespace) -> int:
+    """Run the requests named on the command line over one connection."""
+    status = 0
+    if args.hex_path:
+        options: Dict[str, Any] = {"max_steps": args.max_steps, "digest": args.digest}
+        if args.no_halt:
+            options["no_halt"] = True
+        if args.target_pc is not None:
+            options["target_pc"] = args.target_pc
+        if args.timeout is not None:
+            options["timeout"] = args.timeout
+        reply = client.run(args.hex_path, **options)
+        res = reply.get("result")
+        if args.json:
+            print(json.dumps(reply))
+        elif res and res["regs"]:
+            _print_result(res)
+        if reply["status"] != "done":
+            print(f"Error: {reply.get('error') or (res or {}).get('error')}", file=sys.stderr)
+            status = 1
+    if args.stats:
+        print(json.dumps(client.stats()))
+    if args.shutdown:
+        client.shutdown()
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
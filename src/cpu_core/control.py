@@ -1,50 +1,78 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict
 
 from .isa import OPCODES, DecodedInstr
 
 # ----------------------------------------
-# ALU operation codes (simple string labels)
+# ALU operation codes (small ints so dispatch is a table index)
 # ----------------------------------------
-ALU_ADD   = "ADD"
-ALU_SUB   = "SUB"
-ALU_AND   = "AND"
-ALU_OR    = "OR"
-ALU_XOR   = "XOR"
-ALU_SLT   = "SLT"
-ALU_SLTU  = "SLTU"
-ALU_SLL   = "SLL"
-ALU_SRL   = "SRL"
-ALU_SRA   = "SRA"
-ALU_COPY_B = "COPY_B"   # used for LUI (load immediate into rd)
+ALU_ADD    = 0
+ALU_SUB    = 1
+ALU_AND    = 2
+ALU_OR     = 3
+ALU_XOR    = 4
+ALU_SLT    = 5
+ALU_SLTU   = 6
+ALU_SLL    = 7
+ALU_SRL    = 8
+ALU_SRA    = 9
+ALU_COPY_B = 10   # used for LUI (load immediate into rd)
+NUM_ALU_OPS = 11
+
+ALU_NAMES = ("ADD", "SUB", "AND", "OR", "XOR", "SLT", "SLTU",
+             "SLL", "SRL", "SRA", "COPY_B")
 
 # ----------------------------------------
-# Branch condition labels
+# Branch condition codes (0 = not a branch)
 # ----------------------------------------
-BR_NONE = None
-BR_EQ   = "EQ"
-BR_NE   = "NE"
-BR_LT   = "LT"
-BR_GE   = "GE"
-BR_LTU  = "LTU"
-BR_GEU  = "GEU"
+BR_NONE = 0
+BR_EQ   = 1
+BR_NE   = 2
+BR_LT   = 3
+BR_GE   = 4
+BR_LTU  = 5
+BR_GEU  = 6
+NUM_BR_CONDS = 7
+
+BR_NAMES = (None, "EQ", "NE", "LT", "GE", "LTU", "GEU")
 
 # ----------------------------------------
-# Control signals structure (what the control unit outputs)
+# LOAD/STORE funct3 -> (width in bytes, zero-extend)
+# ----------------------------------------
+LOAD_WIDTHS = {
+    0b000: (1, False),   # LB
+    0b001: (2, False),   # LH
+    0b010: (4, False),   # LW
+    0b100: (1, True),    # LBU
+    0b101: (2, True),    # LHU
+}
+STORE_WIDTHS = {
+    0b000: 1,            # SB
+    0b001: 2,            # SH
+    0b010: 4,            # SW
+}
+
 # ----------------------------------------
-@dataclass
+# Control signals structure (what the control unit outputs).
+# Bundles are immutable and interned: every instruction with the
+# same (opcode, funct3, funct7) shares one instance.
+# ----------------------------------------
+@dataclass(frozen=True, slots=True)
 class ControlSignals:
-    alu_op: str
+    alu_op: int
     alu_src_imm: bool
     reg_write: bool
     mem_read: bool
     mem_write: bool
     mem_to_reg: bool
-    branch_cond: Optional[str]
+    branch_cond: int
     jump: bool
     jalr: bool
     use_pc_plus_imm: bool
     use_imm_high: bool
+    mem_size: int = 0          # access width in bytes: 1, 2 or 4
+    mem_unsigned: bool = False  # LBU/LHU zero-extend instead of sign-extend
+    system: bool = False       # ECALL/EBREAK (serviced by cpu.syscalls)
 
 # ============================================================
 # AI-BEGIN
@@ -54,12 +82,8 @@ class ControlSignals:
 # instruction formats, but the logic follows directly from
 # the ISA specification.
 # ============================================================
-def decode_control(di: DecodedInstr) -> ControlSignals:
-    """Generate all control signals for a decoded RV32I instruction."""
-
-    opc = di.opcode
-    f3 = di.funct3
-    f7 = di.funct7
+def _compute_control(opc: int, f3: int, f7: int) -> ControlSignals:
+    """Generate all control signals for one (opcode, funct3, funct7)."""
 
     # Default control: most things disabled.
     alu_op = ALU_ADD       # default ALU op
@@ -68,11 +92,14 @@ def decode_control(di: DecodedInstr) -> ControlSignals:
     mem_read = False
     mem_write = False
     mem_to_reg = False
-    branch_cond: Optional[str] = BR_NONE
+    branch_cond = BR_NONE
     jump = False
     jalr = False
     use_pc_plus_imm = False
     use_imm_high = False
+    mem_size = 0
+    mem_unsigned = False
+    system = False
 
     # ---------------------------
     # R-type ALU operations
@@ -132,19 +159,23 @@ def decode_control(di: DecodedInstr) -> ControlSignals:
     # LOAD instructions
     # ---------------------------
     elif opc == OPCODES["LOAD"]:
-        reg_write = True
-        mem_read = True
-        mem_to_reg = True      # write data from memory
-        alu_src_imm = True     # address = rs1 + imm
-        alu_op = ALU_ADD
+        if f3 in LOAD_WIDTHS:  # reserved funct3 values stay no-ops
+            reg_write = True
+            mem_read = True
+            mem_to_reg = True      # write data from memory
+            alu_src_imm = True     # address = rs1 + imm
+            alu_op = ALU_ADD
+            mem_size, mem_unsigned = LOAD_WIDTHS[f3]
 
     # ---------------------------
     # STORE instructions
     # ---------------------------
     elif opc == OPCODES["STORE"]:
-        mem_write = True
-        alu_src_imm = True
-        alu_op = ALU_ADD      # address = rs1 + imm
+        if f3 in STORE_WIDTHS:
+            mem_write = True
+            alu_src_imm = True
+            alu_op = ALU_ADD      # address = rs1 + imm
+            mem_size = STORE_WIDTHS[f3]
 
     # ---------------------------
     # Branch instructions
@@ -192,7 +223,14 @@ def decode_control(di: DecodedInstr) -> ControlSignals:
     elif opc == OPCODES["AUIPC"]:
         reg_write = True
         use_pc_plus_imm = True
+        alu_src_imm = True     # PC + upper immediate (not rs2)
         alu_op = ALU_ADD
+
+    # ---------------------------
+    # Environment instructions (ECALL, EBREAK)
+    # ---------------------------
+    elif opc == OPCODES["SYSTEM"]:
+        system = f3 == 0b000
     # ============================================================
     # AI-END
     # ============================================================
@@ -209,4 +247,46 @@ def decode_control(di: DecodedInstr) -> ControlSignals:
         jalr=jalr,
         use_pc_plus_imm=use_pc_plus_imm,
         use_imm_high=use_imm_high,
+        mem_size=mem_size,
+        mem_unsigned=mem_unsigned,
+        system=system,
     )
+
+
+# ----------------------------------------
+# Precomputed control table
+# ----------------------------------------
+# Key layout matches the instruction word: opcode | funct3<<12 | funct7<<25
+CONTROL_KEY_MASK = 0xFE00_707F
+
+
+def _build_table() -> Dict[int, ControlSignals]:
+    """Compute and intern the bundle for every known opcode/funct combo."""
+    interned: Dict[ControlSignals, ControlSignals] = {}
+    table: Dict[int, ControlSignals] = {}
+    for opc in OPCODES.values():
+        for f3 in range(8):
+            # funct7 only ever matters as 0b0000000, 0b0100000 or "other"
+            by_class = {}
+            for f7c in (0b0000000, 0b0100000, 0b0000001):
+                sig = _compute_control(opc, f3, f7c)
+                by_class[f7c] = interned.setdefault(sig, sig)
+            for f7 in range(128):
+                f7c = f7 if f7 in (0b0000000, 0b0100000) else 0b0000001
+                table[opc | (f3 << 12) | (f7 << 25)] = by_class[f7c]
+    return table
+
+
+_CONTROL_TABLE = _build_table()
+_CONTROL_DEFAULT = _compute_control(0, 0, 0)   # unknown opcode: no-op
+
+
+def control_for_word(instr: int) -> ControlSignals:
+    """Look up the shared control bundle for a raw instruction word."""
+    return _CONTROL_TABLE.get(instr & CONTROL_KEY_MASK, _CONTROL_DEFAULT)
+
+
+def decode_control(di: DecodedInstr) -> ControlSignals:
+    """Return the (shared, immutable) control signals for an instruction."""
+    key = di.opcode | (di.funct3 << 12) | (di.funct7 << 25)
+    return _CONTROL_TABLE.get(key, _CONTROL_DEFAULT)
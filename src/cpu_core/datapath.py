@@ -1,39 +1,15 @@
+import time
 from dataclasses import dataclass
 from typing import Optional
 
-from .isa import (
-    DecodedInstr,
-    decode,
-    OPCODES,
-    imm_i,
-    imm_s,
-    imm_b,
-    imm_u,
-    imm_j,
-)
+from .isa import OPCODES, INSTR_EBREAK, INSTR_ECALL, get_opcode, get_rd, get_rs1
 from .regfile import RegFile
 from .memory import Memory
-from .control import (
-    ControlSignals,
-    decode_control,
-    ALU_ADD,
-    ALU_SUB,
-    ALU_AND,
-    ALU_OR,
-    ALU_XOR,
-    ALU_SLT,
-    ALU_SLTU,
-    ALU_SLL,
-    ALU_SRL,
-    ALU_SRA,
-    ALU_COPY_B,
-    BR_EQ,
-    BR_NE,
-    BR_LT,
-    BR_GE,
-    BR_LTU,
-    BR_GEU,
-)
+from .predecode import PredecodeCache, predecode_word
+from .fast_interp import run_fast as _run_fast
+from .fusion import FusionTable
+from .control import NUM_ALU_OPS, NUM_BR_CONDS
+from .syscalls import GuestExit
 
 
 # ----------------------------------------
@@ -63,69 +39,77 @@ def _to_signed32(x: int) -> int:
 # ALU logic: this is the main arithmetic/logic block.
 # Even though each case is simple, handling shifts and signed
 # comparisons requires care to match RV32I behavior.
+# ALU op codes are small ints, so dispatch is one tuple index.
 # ============================================================
-def _alu_execute(op: str, a: int, b: int) -> int:
-    """Execute a single ALU operation using masked 32-bit values."""
-    a32 = _mask32(a)
-    b32 = _mask32(b)
-
-    if op == ALU_ADD:
-        res = a32 + b32
-    elif op == ALU_SUB:
-        res = a32 - b32
-    elif op == ALU_AND:
-        res = a32 & b32
-    elif op == ALU_OR:
-        res = a32 | b32
-    elif op == ALU_XOR:
-        res = a32 ^ b32
-    elif op == ALU_SLL:
-        res = a32 << (b32 & 0x1F)
-    elif op == ALU_SRL:
-        res = a32 >> (b32 & 0x1F)
-    elif op == ALU_SRA:
-        # Arithmetic shift requires a signed interpretation
-        sa = _to_signed32(a32)
-        res = sa >> (b32 & 0x1F)
-    elif op == ALU_SLT:
-        res = 1 if _to_signed32(a32) < _to_signed32(b32) else 0
-    elif op == ALU_SLTU:
-        res = 1 if a32 < b32 else 0
-    elif op == ALU_COPY_B:
-        res = b32
-    else:
-        res = 0  # fallback for unknown opcodes
+_ALU_FUNCS = (
+    lambda a, b: a + b,                                          # ADD
+    lambda a, b: a - b,                                          # SUB
+    lambda a, b: a & b,                                          # AND
+    lambda a, b: a | b,                                          # OR
+    lambda a, b: a ^ b,                                          # XOR
+    lambda a, b: 1 if _to_signed32(a) < _to_signed32(b) else 0,  # SLT
+    lambda a, b: 1 if a < b else 0,                              # SLTU
+    lambda a, b: a << (b & 0x1F),                                # SLL
+    lambda a, b: a >> (b & 0x1F),                                # SRL
+    # Arithmetic shift requires a signed interpretation
+    lambda a, b: _to_signed32(a) >> (b & 0x1F),                  # SRA
+    lambda a, b: b,                                              # COPY_B
+)
+assert len(_ALU_FUNCS) == NUM_ALU_OPS
+
 
-    return _mask32(res)
+def _alu_execute(op: int, a: int, b: int) -> int:
+    """Execute a single ALU operation using masked 32-bit values."""
+    if not 0 <= op < NUM_ALU_OPS:
+        return 0  # fallback for unknown opcodes
+    return _mask32(_ALU_FUNCS[op](_mask32(a), _mask32(b)))
 # AI-END
 # ============================================================
 
 
 # ----------------------------------------
-# Branch condition evaluation
+# Branch condition evaluation (indexed by BR_* code; 0 = no branch)
 # ----------------------------------------
-def _branch_taken(cond: Optional[str], rs1_val: int, rs2_val: int) -> bool:
-    if cond is None:
+_BRANCH_FUNCS = (
+    lambda a, b: False,                                     # NONE
+    lambda a, b: a == b,                                    # EQ
+    lambda a, b: a != b,                                    # NE
+    lambda a, b: _to_signed32(a) < _to_signed32(b),         # LT
+    lambda a, b: _to_signed32(a) >= _to_signed32(b),        # GE
+    lambda a, b: a < b,                                     # LTU
+    lambda a, b: a >= b,                                    # GEU
+)
+assert len(_BRANCH_FUNCS) == NUM_BR_CONDS
+
+
+def _branch_taken(cond: int, rs1_val: int, rs2_val: int) -> bool:
+    if not cond:
         return False
+    return _BRANCH_FUNCS[cond](_mask32(rs1_val), _mask32(rs2_val))
 
-    a = _mask32(rs1_val)
-    b = _mask32(rs2_val)
-    sa = _to_signed32(a)
-    sb = _to_signed32(b)
-
-    if cond == BR_EQ:
-        return a == b
-    elif cond == BR_NE:
-        return a != b
-    elif cond == BR_LT:
-        return sa < sb
-    elif cond == BR_GE:
-        return sa >= sb
-    elif cond == BR_LTU:
-        return a < b
-    elif cond == BR_GEU:
-        return a >= b
-    return False
+
+# ----------------------------------------
+# Sized data memory access (LB/LH/LW/LBU/LHU, SB/SH/SW)
+# ----------------------------------------
+def _mem_load(mem, addr: int, size: int, unsigned: bool) -> int:
+    """Load 1, 2 or 4 bytes; sub-word values are sign- or zero-extended."""
+    if size == 4:
+        return mem.load_word(addr)
+    if size == 2:
+        value = mem.load_half(addr)
+        return value if unsigned else _mask32((value ^ 0x8000) - 0x8000)
+    value = mem.load_byte(addr)
+    return value if unsigned else _mask32((value ^ 0x80) - 0x80)
+
+
+def _mem_store(mem, addr: int, size: int, value: int) -> None:
+    """Store the low 1, 2 or 4 bytes of value."""
+    if size == 4:
+        mem.store_word(addr, value)
+    elif size == 2:
+        mem.store_half(addr, value)
+    else:
+        mem.store_byte(addr, value)
 
 
 # ----------------------------------------
@@ -137,27 +121,140 @@ class CPUState:
     regs: list[int]
 
 
+# ----------------------------------------
+# Stop conditions for CPU.run
+# ----------------------------------------
+STOP_MAX_STEPS = "max_steps"    # step budget exhausted
+STOP_EBREAK = "ebreak"          # executed EBREAK
+STOP_ECALL = "ecall"            # executed ECALL
+STOP_EXIT = "exit"              # guest called exit (see syscalls.py)
+STOP_SELF_LOOP = "self_loop"    # jump/branch to itself (e.g. jal x0, 0)
+STOP_TARGET_PC = "target_pc"    # reached the requested PC
+STOP_TIMEOUT = "timeout"        # wall-clock budget exceeded
+
+
+@dataclass(frozen=True)
+class StopConditions:
+    """Which events end CPU.run before the step budget runs out."""
+    halt_on_ebreak: bool = True
+    halt_on_ecall: bool = True
+    halt_on_self_loop: bool = True
+    target_pc: Optional[int] = None
+    time_budget: Optional[float] = None   # seconds of wall-clock time
+    check_every: int = 1024               # steps between clock reads
+
+
+@dataclass
+class StopInfo:
+    """Why CPU.run returned, how many instructions it ran, and the final PC."""
+    reason: str
+    steps: int
+    pc: int
+
+
+# Run with no halt events (used when only fusion needs the slow loop)
+_NO_STOP = StopConditions(
+    halt_on_ebreak=False, halt_on_ecall=False, halt_on_self_loop=False
+)
+
+
+def _is_self_loop(instr: int) -> bool:
+    """
+    True if re-executing 'instr' (which just jumped to its own PC) can
+    never leave that PC: JAL and branches always qualify, JALR only when
+    it does not overwrite its own base register.
+    """
+    opc = get_opcode(instr)
+    if opc == OPCODES["JAL"] or opc == OPCODES["BRANCH"]:
+        return True
+    if opc == OPCODES["JALR"]:
+        rd = get_rd(instr)
+        return rd == 0 or rd != get_rs1(instr)
+    return False
+
+
 # ----------------------------------------
 # Main single-cycle CPU implementation
 # ----------------------------------------
 class CPU:
-    def __init__(self, imem: Memory, dmem: Memory, pc_reset: int = 0) -> None:
+    def __init__(
+        self,
+        imem: Memory,
+        dmem: Memory,
+        pc_reset: int = 0,
+        predecode: bool = False,
+        fuse: bool = False,
+    ) -> None:
         self.imem = imem
         self.dmem = dmem
         self.regs = RegFile()
         self.pc = _mask32(pc_reset)
         self.cycle = 0  # number of executed instructions
+        self.last_instr = 0  # raw word executed by the latest step()
+        self.last_stop: Optional[StopInfo] = None
+
+        # Optional PC-keyed decode cache (invalidated by IMEM writes)
+        self.icache: Optional[PredecodeCache] = (
+            PredecodeCache(imem) if (predecode or fuse) else None
+        )
+
+        # Optional macro-op fusion of common instruction pairs (run() only)
+        self.fusion: Optional[FusionTable] = (
+            FusionTable(self.icache, imem) if fuse else None
+        )
+        self._blocks = None  # BlockCompiler, created by run_blocks()
+
+        # Optional undo journal for reverse execution (see timetravel.py)
+        self.timetravel = None
+
+        # Optional ECALL handler (see syscalls.py); exit sets exit_code
+        self.syscalls = None
+        self.exit_code: Optional[int] = None
 
     def reset(self, pc_reset: int = 0) -> None:
         """Reset PC and register file."""
         self.pc = _mask32(pc_reset)
         self.regs.reset()
         self.cycle = 0
+        self.exit_code = None
 
     def get_state(self) -> CPUState:
         """Return the current PC and register snapshot."""
         return CPUState(pc=self.pc, regs=self.regs.dump())
 
+    def fork(self) -> "CPU":
+        """
+        Return an independent CPU continuing from this one's state.
+
+        Memories are forked with their own fork(): PagedMemory shares
+        pages copy-on-write, dense memories are copied in full (build
+        the CPU with build_cpu(..., paged=True) to fork cheaply).
+        Registers, PC, cycle count and predecoded instructions are
+        carried over.
+        """
+        imem = self.imem.fork()
+        dmem = imem if self.dmem is self.imem else self.dmem.fork()
+        child = CPU(imem, dmem, pc_reset=self.pc,
+                    predecode=self.icache is not None,
+                    fuse=self.fusion is not None)
+        child.regs._regs[:] = self.regs._regs
+        child.cycle = self.cycle
+        child.last_instr = self.last_instr
+        child.last_stop = self.last_stop
+        if self.icache is not None:
+            child.icache._entries.update(self.icache._entries)
+        return child
+
+    def save_checkpoint(self, path: str, compress: bool = False) -> int:
+        """Save registers, PC, cycle count and memories to path (see checkpoint.py)."""
+        from .checkpoint import save_checkpoint
+        return save_checkpoint(self, path, compress=compress)
+
+    @staticmethod
+    def load_checkpoint(path: str, predecode: bool = False, fuse: bool = False) -> "CPU":
+        """Recreate a CPU from a file written by save_checkpoint."""
+        from .checkpoint import load_checkpoint
+        return load_checkpoint(path, predecode=predecode, fuse=fuse)
 
     # ============================================================
     # AI-BEGIN
@@ -169,32 +266,18 @@ class CPU:
         pc = self.pc
         pc_plus_4 = _mask32(pc + 4)
 
-        # 1. Fetch
-        instr_word = self.imem.load_word(pc)
-
-        # 2. Decode instruction
-        di: DecodedInstr = decode(instr_word)
-
-        # 3. Generate control signals
-        ctrl: ControlSignals = decode_control(di)
-
-        # 4. Immediate generation (based on opcode type)
-        opc = di.opcode
-        imm = 0
-        if opc in (OPCODES["OP_IMM"], OPCODES["LOAD"], OPCODES["JALR"]):
-            imm = imm_i(instr_word)
-        elif opc == OPCODES["STORE"]:
-            imm = imm_s(instr_word)
-        elif opc == OPCODES["BRANCH"]:
-            imm = imm_b(instr_word)
-        elif opc in (OPCODES["LUI"], OPCODES["AUIPC"]):
-            imm = imm_u(instr_word)
-        elif opc == OPCODES["JAL"]:
-            imm = imm_j(instr_word)
-
-        # 5. Register read
-        rs1_val = self.regs.read(di.rs1)
-        rs2_val = self.regs.read(di.rs2)
+        # 1-4. Fetch, decode, control signals and immediate
+        #      (served from the predecode cache when enabled)
+        if self.icache is not None:
+            di, ctrl, imm = self.icache.lookup(pc)
+        else:
+            di, ctrl, imm = predecode_word(self.imem.load_word(pc))
+        self.last_instr = di.instr
+
+        # 5. Register read (fields are 5 bits: the unchecked path is safe)
+        regs = self.regs
+        rs1_val = regs.read_unchecked(di.rs1)
+        rs2_val = regs.read_unchecked(di.rs2)
 
         # 6. Operand selection for ALU
         if ctrl.use_pc_plus_imm:
@@ -212,12 +295,21 @@ class CPU:
         # 7. ALU execution
         alu_result = _alu_execute(ctrl.alu_op, op_a, op_b)
 
+        # Time travel: note what this step is about to overwrite
+        tt = self.timetravel
+        if tt is not None:
+            undo = tt.before_step(
+                pc,
+                di.rd if ctrl.reg_write else (10 if ctrl.system else 0),
+                alu_result if ctrl.mem_write else -1,
+            )
+
         # 8. Memory stage
         mem_data = 0
         if ctrl.mem_read:
-            mem_data = self.dmem.load_word(alu_result)
+            mem_data = _mem_load(self.dmem, alu_result, ctrl.mem_size, ctrl.mem_unsigned)
         if ctrl.mem_write:
-            self.dmem.store_word(alu_result, rs2_val)
+            _mem_store(self.dmem, alu_result, ctrl.mem_size, rs2_val)
 
         # 9. Write-back value selection
         wb_val = alu_result
@@ -227,14 +319,18 @@ class CPU:
             wb_val = pc_plus_4  # link register = PC + 4
 
         # 10. Register write-back
-        if ctrl.reg_write and di.rd != 0:
-            self.regs.write(di.rd, wb_val)
+        if ctrl.reg_write:
+            regs.write_unchecked(di.rd, wb_val)
+
+        # ECALL is handed to the syscall proxy, if one is attached
+        if ctrl.system and di.instr == INSTR_ECALL and self.syscalls is not None:
+            self.syscalls.ecall(self)
 
         # 11. Next PC calculation
         next_pc = pc_plus_4
 
         # Branch
-        if ctrl.branch_cond is not None:
+        if ctrl.branch_cond:
             if _branch_taken(ctrl.branch_cond, rs1_val, rs2_val):
                 next_pc = _mask32(pc + imm)
 
@@ -250,14 +346,167 @@ class CPU:
         # 12. Commit next PC
         self.pc = next_pc
         self.cycle += 1
+        if tt is not None:
+            tt.after_step(undo)
     # AI-END
     # ============================================================
 
 
-    def run(self, max_steps: int = 10_000) -> None:
-        """Run repeatedly for up to max_steps instructions."""
-        for _ in range(max_steps):
-            self.step()
+    def run(
+        self,
+        max_steps: int = 10_000,
+        stop: Optional[StopConditions] = None,
+    ) -> StopInfo:
+        """
+        Run repeatedly for up to max_steps instructions.
+
+        With 'stop' set, the run also ends on the enabled halt events
+        (EBREAK/ECALL, a self-loop, reaching target_pc, or the wall-clock
+        budget).  With a syscall handler attached, ECALLs are serviced
+        instead of halting, and the run always ends when the guest calls
+        exit.  A CPU whose guest has exited does not run again.
+        Returns a StopInfo, also kept in self.last_stop.
+        """
+        if (stop is None and self.fusion is None and self.syscalls is None
+                and self.exit_code is None):
+            for _ in range(max_steps):
+                self.step()
+            info = StopInfo(STOP_MAX_STEPS, max_steps, self.pc)
+        else:
+            info = self._run_until(max_steps, stop or _NO_STOP)
+        self.last_stop = info
+        return info
+
+    # ============================================================
+    # AI-BEGIN
+    # Run loop with halt detection.  EBREAK/ECALL and self-loops are
+    # detected after the instruction retires (so it is counted);
+    # target_pc is checked before fetching; the clock is only read
+    # every 'check_every' steps to keep the loop cheap.
+    # With fusion enabled, a fused pair retires two instructions at
+    # once unless the budget or target_pc falls between them.
+    # With a syscall handler attached, ECALL never halts by itself;
+    # only a guest exit does (and a CPU that has exited stays put).
+    # ============================================================
+    def _run_until(self, max_steps: int, stop: StopConditions) -> StopInfo:
+        target = stop.target_pc
+        on_ebreak = stop.halt_on_ebreak
+        on_ecall = stop.halt_on_ecall and self.syscalls is None
+        on_self_loop = stop.halt_on_self_loop
+
+        deadline = None
+        check_every = max(1, stop.check_every)
+        if stop.time_budget is not None:
+            deadline = time.monotonic() + stop.time_budget
+        next_check = check_every
+
+        # Fused pairs bypass step(), so they are not journaled
+        fusion = self.fusion if self.timetravel is None else None
+        x = self.regs._regs
+
+        if self.exit_code is not None:
+            return StopInfo(STOP_EXIT, 0, self.pc)
+
+        n = 0
+        while n < max_steps:
+            pc = self.pc
+            if pc == target:
+                return StopInfo(STOP_TARGET_PC, n, pc)
+            if deadline is not None and n >= next_check:
+                next_check += check_every
+                if time.monotonic() >= deadline:
+                    return StopInfo(STOP_TIMEOUT, n, pc)
+
+            op = None
+            if fusion is not None and n + 2 <= max_steps:
+                op = fusion.lookup(pc)
+                if op is not None and target == _mask32(pc + 4):
+                    op = None
+
+            if op is not None:
+                self.pc = op.fn(x, self)
+                self.cycle += 2
+                self.last_instr = op.second_word
+                fusion.record(op)
+                n += 2
+                pc = _mask32(pc + 4)    # PC of the retired (second) instruction
+            else:
+                self.step()
+                n += 1
+
+            instr = self.last_instr
+            if instr == INSTR_EBREAK and on_ebreak:
+                return StopInfo(STOP_EBREAK, n, self.pc)
+            if instr == INSTR_ECALL:
+                if self.exit_code is not None:
+                    return StopInfo(STOP_EXIT, n, self.pc)
+                if on_ecall:
+                    return StopInfo(STOP_ECALL, n, self.pc)
+            if on_self_loop and self.pc == pc and _is_self_loop(instr):
+                return StopInfo(STOP_SELF_LOOP, n, self.pc)
+
+        if self.pc == target:
+            return StopInfo(STOP_TARGET_PC, n, self.pc)
+        return StopInfo(STOP_MAX_STEPS, n, self.pc)
+    # AI-END
+    # ============================================================
+
+    def run_fast(self, max_steps: int = 10_000) -> None:
+        """
+        Run up to max_steps instructions with the monolithic fast loop.
+
+        Architectural results and access errors match run(); PC and the
+        cycle count are committed back when the loop exits.  With time
+        travel enabled this falls back to run() so every step is journaled.
+        A guest exit through cpu.syscalls ends the loop.
+        """
+        if self.timetravel is not None:
+            self.run(max_steps)
+            return
+        if self.exit_code is None:
+            _run_fast(self, max_steps)
+
+    # ============================================================
+    # AI-BEGIN
+    # Block-compiled execution: dispatch once per basic block
+    # instead of once per instruction.  A block that would overrun
+    # the remaining budget is finished with plain step() calls so
+    # cycle counts match run() exactly.
+    # ============================================================
+    def run_blocks(self, max_steps: int = 10_000) -> None:
+        """Run up to max_steps instructions using compiled basic blocks."""
+        if self.timetravel is not None:     # blocks are not journaled
+            self.run(max_steps)
+            return
+        if self.exit_code is not None:
+            return
+        if self._blocks is None:
+            from .block_compiler import BlockCompiler
+            self._blocks = BlockCompiler(self)
+        get_block = self._blocks.get
+
+        x = self.regs._regs
+        ld = self.dmem.load_word
+        st = self.dmem.store_word
+        remaining = max_steps
+
+        try:
+            while remaining > 0:
+                blk = get_block(self.pc)
+                if blk.length > remaining:
+                    for _ in range(remaining):
+                        self.step()
+                        if self.exit_code is not None:
+                            return
+                    return
+                self.pc = blk.fn(x, ld, st, self)
+                self.cycle += blk.length
+                remaining -= blk.length
+        except GuestExit as e:              # raised by a block's ECALL
+            self.pc = e.pc
+            self.cycle += e.steps
+    # AI-END
+    # ============================================================
 
 
 # ----------------------------------------
@@ -0,0 +1,206 @@
+# src/cpu_core/elf_loader.py
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, NamedTuple, Optional
+
+
+# ----------------------------------------
+# ELF32 constants (only what a RISC-V loader needs)
+# ----------------------------------------
+ELF_MAGIC = b"\x7fELF"
+ELFCLASS32 = 1
+ELFDATA2LSB = 1
+EM_RISCV = 243
+
+PT_LOAD = 1
+PF_X, PF_W, PF_R = 1, 2, 4
+
+SHT_SYMTAB = 2
+STT_FUNC = 2
+
+# Little-endian on-disk layouts
+_EHDR = struct.Struct("<16sHHIIIIIHHHHHH")     # 52 bytes
+_PHDR = struct.Struct("<8I")                   # 32 bytes
+_SHDR = struct.Struct("<10I")                  # 40 bytes
+_SYM = struct.Struct("<IIIBBH")                # 16 bytes
+
+
+class Segment(NamedTuple):
+    vaddr: int
+    data: bytes         # file contents (p_filesz bytes)
+    mem_size: int       # p_memsz; the tail past len(data) is .bss
+    flags: int          # PF_R | PF_W | PF_X
+
+    @property
+    def executable(self) -> bool:
+        return bool(self.flags & PF_X)
+
+
+class Symbol(NamedTuple):
+    name: str
+    value: int
+    size: int
+    type: int           # STT_* (low 4 bits of st_info)
+    bind: int           # STB_* (high 4 bits of st_info)
+    section: int
+
+
+@dataclass
+class ElfImage:
+    """Entry point, loadable segments and symbols of one ELF file."""
+    entry: int
+    segments: List[Segment]
+    symbols: Dict[str, Symbol] = field(default_factory=dict)
+
+    def symbol_at(self, addr: int) -> Optional[Symbol]:
+        """Sized symbol whose [value, value + size) range contains addr."""
+        best = None
+        for sym in self.symbols.values():
+            if sym.value <= addr < sym.value + sym.size:
+                if best is None or sym.type == STT_FUNC:
+                    best = sym
+        return best
+
+
+# ============================================================
+# AI-BEGIN
+# Parsing.  The whole file is one bytes object; headers are
+# unpacked with precompiled structs straight from memoryview
+# slices, and segment contents are sliced out once (no per-word
+# work at all).  Anything that is not a little-endian ELF32
+# RISC-V file is rejected with a ValueError saying why.
+# ============================================================
+def parse_elf(data: bytes) -> ElfImage:
+    """Parse an ELF32 little-endian RISC-V image held in memory."""
+    view = memoryview(data)
+    if len(view) < _EHDR.size or bytes(view[:4]) != ELF_MAGIC:
+        raise ValueError("Not an ELF file")
+    ident = bytes(view[:16])
+    if ident[4] != ELFCLASS32:
+        raise ValueError("Only 32-bit (ELFCLASS32) files are supported")
+    if ident[5] != ELFDATA2LSB:
+        raise ValueError("Only little-endian ELF files are supported")
+
+    (_, _, machine, _, entry, phoff, shoff, _, _,
+     phentsize, phnum, shentsize, shnum, _) = _EHDR.unpack_from(view)
+    if machine != EM_RISCV:
+        raise ValueError(f"ELF machine {machine} is not RISC-V ({EM_RISCV})")
+
+    def _slice(offset: int, size: int, what: str) -> memoryview:
+        if offset + size > len(view):
+            raise ValueError(f"Truncated ELF file: {what} runs past the end")
+        return view[offset:offset + size]
+
+    segments: List[Segment] = []
+    table = _slice(phoff, phnum * phentsize, "program headers")
+    for k in range(phnum):
+        (p_type, p_offset, p_vaddr, _, p_filesz, p_memsz,
+         p_flags, _) = _PHDR.unpack_from(table, k * phentsize)
+        if p_type != PT_LOAD or p_memsz == 0:
+            continue
+        if p_filesz > p_memsz:
+            raise ValueError(f"Segment at 0x{p_vaddr:08X} has filesz > memsz")
+        body = bytes(_slice(p_offset, p_filesz, "a PT_LOAD segment"))
+        segments.append(Segment(p_vaddr, body, p_memsz, p_flags))
+
+    symbols: Dict[str, Symbol] = {}
+    if shoff and shnum:
+        sections = [_SHDR.unpack_from(_slice(shoff, shnum * shentsize, "section headers"),
+                                      k * shentsize) for k in range(shnum)]
+        for sh in sections:
+            sh_type, sh_offset, sh_size, sh_link = sh[1], sh[4], sh[5], sh[6]
+            if sh_type != SHT_SYMTAB or sh_link >= shnum:
+                continue
+            strtab = bytes(_slice(sections[sh_link][4], sections[sh_link][5], "a string table"))
+            for name_off, value, size, info, _, shndx in _SYM.iter_unpack(
+                _slice(sh_offset, sh_size - sh_size % _SYM.size, "a symbol table")
+            ):
+                if not name_off:
+                    continue
+                end = strtab.find(b"\0", name_off)
+                name = strtab[name_off:end if end >= 0 else None].decode("utf-8", "replace")
+                symbols[name] = Symbol(name, value, size, info & 0xF, info >> 4, shndx)
+
+    return ElfImage(entry, segments, symbols)
+# AI-END
+# ============================================================
+
+
+def read_elf(path: str) -> ElfImage:
+    """Parse an ELF file from disk without loading it anywhere."""
+    with open(path, "rb") as f:
+        return parse_elf(f.read())
+
+
+def is_elf(path: str) -> bool:
+    """True if the file starts with the ELF magic number."""
+    with open(path, "rb") as f:
+        return f.read(4) == ELF_MAGIC
+
+
+# ============================================================
+# AI-BEGIN
+# Placement.  Each segment (file bytes plus zeroed .bss) is copied
+# in one call: PagedMemory takes raw bytes via write_bytes(); word
+# memories get one load_program() of an array('I') built from the
+# bytes, after padding the ends with the existing neighbour bytes
+# when the segment is not word-aligned.
+# ============================================================
+def _copy_into(mem, addr: int, data: bytes) -> None:
+    if not data:
+        return
+    write_bytes = getattr(mem, "write_bytes", None)
+    if write_bytes is not None:
+        write_bytes(addr, data)
+        return
+
+    head = addr & 3
+    start = addr - head
+    if head:
+        data = mem.load_word(start).to_bytes(4, "little")[:head] + data
+    tail = -len(data) % 4
+    if tail:
+        last = start + len(data) - len(data) % 4
+        data = data + mem.load_word(last).to_bytes(4, "little")[4 - tail:]
+    words = array("I")
+    words.frombytes(data)
+    if sys.byteorder == "big":
+        words.byteswap()
+    mem.load_program(words, start)
+
+
+def _zero_into(mem, addr: int, n: int) -> None:
+    if n <= 0:
+        return
+    zero_bytes = getattr(mem, "zero_bytes", None)
+    if zero_bytes is not None:
+        zero_bytes(addr, n)             # sparse: untouched pages stay unallocated
+    else:
+        _copy_into(mem, addr, bytes(n))
+
+
+def load_elf(path: str, imem, dmem=None) -> ElfImage:
+    """
+    Copy the PT_LOAD segments of an ELF file to their virtual
+    addresses and return the parsed image (use image.entry as the
+    reset PC).  With separate memories, executable segments go to
+    both IMEM and DMEM (.rodata often shares the text segment) and
+    the rest only to DMEM; pass one memory (or dmem=imem) for a
+    unified address space.
+    """
+    image = read_elf(path)
+    if dmem is None:
+        dmem = imem
+    for seg in image.segments:
+        targets = [dmem]
+        if seg.executable and imem is not dmem:
+            targets.append(imem)
+        bss = seg.vaddr + len(seg.data)
+        for mem in targets:
+            _copy_into(mem, seg.vaddr, seg.data)
+            _zero_into(mem, bss, seg.mem_size - len(seg.data))     # .bss
+    return image
+# AI-END
+# ============================================================
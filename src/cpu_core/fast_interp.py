@@ -0,0 +1,441 @@
+# src/cpu_core/fast_interp.py
+from typing import Callable, Dict, Tuple
+
+from .memory import Memory
+from .array_memory import ArrayMemory
+from .isa import INSTR_ECALL
+from .predecode import predecode_word
+from .syscalls import GuestExit
+from .control import (
+    ALU_ADD,
+    ALU_SUB,
+    ALU_AND,
+    ALU_OR,
+    ALU_XOR,
+    ALU_SLT,
+    ALU_SLTU,
+    ALU_SLL,
+    ALU_SRL,
+    ALU_SRA,
+    ALU_COPY_B,
+    BR_EQ,
+    BR_NE,
+    BR_LT,
+    BR_GE,
+    BR_LTU,
+    BR_GEU,
+)
+
+
+M = 0xFFFF_FFFF
+S = 0x8000_0000
+
+# One decoded entry: (handler, rd, rs1, rs2, imm)
+Entry = Tuple[Callable[[int, int, int, int, int], int], int, int, int, int]
+
+
+def _raw_words(mem) -> bool:
+    """True when the memory's word list/array can be indexed directly."""
+    return type(mem) is Memory or type(mem) is ArrayMemory
+
+
+# ============================================================
+# AI-BEGIN
+# Handler table construction.  Every handler has the signature
+#     h(pc, rd, rs1, rs2, imm) -> next_pc
+# and closes over the register list and the data memory, so the
+# hot loop is a tuple unpack plus one call per instruction.
+# Register values in 'x' are always kept masked to 32 bits, which
+# lets AND/OR/XOR/SRL/SLTU skip re-masking entirely.
+# ============================================================
+def _build_handlers(x, dmem, cpu=None):
+    """
+    Return (alu_reg, alu_imm, branch, misc) handler tables.  With a
+    cpu that has a syscall handler, misc also gets an "ecall" entry.
+    """
+
+    # --- R-type ----------------------------------------------
+    def add(pc, rd, rs1, rs2, imm):
+        x[rd] = (x[rs1] + x[rs2]) & M
+        return (pc + 4) & M
+
+    def sub(pc, rd, rs1, rs2, imm):
+        x[rd] = (x[rs1] - x[rs2]) & M
+        return (pc + 4) & M
+
+    def and_(pc, rd, rs1, rs2, imm):
+        x[rd] = x[rs1] & x[rs2]
+        return (pc + 4) & M
+
+    def or_(pc, rd, rs1, rs2, imm):
+        x[rd] = x[rs1] | x[rs2]
+        return (pc + 4) & M
+
+    def xor(pc, rd, rs1, rs2, imm):
+        x[rd] = x[rs1] ^ x[rs2]
+        return (pc + 4) & M
+
+    def sll(pc, rd, rs1, rs2, imm):
+        x[rd] = (x[rs1] << (x[rs2] & 31)) & M
+        return (pc + 4) & M
+
+    def srl(pc, rd, rs1, rs2, imm):
+        x[rd] = x[rs1] >> (x[rs2] & 31)
+        return (pc + 4) & M
+
+    def sra(pc, rd, rs1, rs2, imm):
+        x[rd] = (((x[rs1] ^ S) - S) >> (x[rs2] & 31)) & M
+        return (pc + 4) & M
+
+    def slt(pc, rd, rs1, rs2, imm):
+        x[rd] = 1 if ((x[rs1] ^ S) - S) < ((x[rs2] ^ S) - S) else 0
+        return (pc + 4) & M
+
+    def sltu(pc, rd, rs1, rs2, imm):
+        x[rd] = 1 if x[rs1] < x[rs2] else 0
+        return (pc + 4) & M
+
+    def copy_b(pc, rd, rs1, rs2, imm):
+        x[rd] = x[rs2]
+        return (pc + 4) & M
+
+    # --- I-type (imm is pre-masked; shifts pre-reduced) ------
+    def addi(pc, rd, rs1, rs2, imm):
+        x[rd] = (x[rs1] + imm) & M
+        return (pc + 4) & M
+
+    def subi(pc, rd, rs1, rs2, imm):
+        x[rd] = (x[rs1] - imm) & M
+        return (pc + 4) & M
+
+    def andi(pc, rd, rs1, rs2, imm):
+        x[rd] = x[rs1] & imm
+        return (pc + 4) & M
+
+    def ori(pc, rd, rs1, rs2, imm):
+        x[rd] = x[rs1] | imm
+        return (pc + 4) & M
+
+    def xori(pc, rd, rs1, rs2, imm):
+        x[rd] = x[rs1] ^ imm
+        return (pc + 4) & M
+
+    def slli(pc, rd, rs1, rs2, imm):
+        x[rd] = (x[rs1] << imm) & M
+        return (pc + 4) & M
+
+    def srli(pc, rd, rs1, rs2, imm):
+        x[rd] = x[rs1] >> imm
+        return (pc + 4) & M
+
+    def srai(pc, rd, rs1, rs2, imm):
+        x[rd] = (((x[rs1] ^ S) - S) >> imm) & M
+        return (pc + 4) & M
+
+    def slti(pc, rd, rs1, rs2, imm):      # imm is the signed immediate
+        x[rd] = 1 if ((x[rs1] ^ S) - S) < imm else 0
+        return (pc + 4) & M
+
+    def sltiu(pc, rd, rs1, rs2, imm):
+        x[rd] = 1 if x[rs1] < imm else 0
+        return (pc + 4) & M
+
+    def li(pc, rd, rs1, rs2, imm):        # LUI / COPY_B of an immediate
+        x[rd] = imm
+        return (pc + 4) & M
+
+    def auipc(pc, rd, rs1, rs2, imm):
+        x[rd] = (pc + imm) & M
+        return (pc + 4) & M
+
+    def nop(pc, rd, rs1, rs2, imm):
+        return (pc + 4) & M
+
+    # --- Branches ----------------------------------------------
+    def beq(pc, rd, rs1, rs2, imm):
+        return (pc + imm) & M if x[rs1] == x[rs2] else (pc + 4) & M
+
+    def bne(pc, rd, rs1, rs2, imm):
+        return (pc + imm) & M if x[rs1] != x[rs2] else (pc + 4) & M
+
+    def blt(pc, rd, rs1, rs2, imm):
+        if ((x[rs1] ^ S) - S) < ((x[rs2] ^ S) - S):
+            return (pc + imm) & M
+        return (pc + 4) & M
+
+    def bge(pc, rd, rs1, rs2, imm):
+        if ((x[rs1] ^ S) - S) >= ((x[rs2] ^ S) - S):
+            return (pc + imm) & M
+        return (pc + 4) & M
+
+    def bltu(pc, rd, rs1, rs2, imm):
+        return (pc + imm) & M if x[rs1] < x[rs2] else (pc + 4) & M
+
+    def bgeu(pc, rd, rs1, rs2, imm):
+        return (pc + imm) & M if x[rs1] >= x[rs2] else (pc + 4) & M
+
+    # --- Jumps -------------------------------------------------
+    def jal(pc, rd, rs1, rs2, imm):
+        if rd:
+            x[rd] = (pc + 4) & M
+        return (pc + imm) & M
+
+    def jalr(pc, rd, rs1, rs2, imm):
+        target = (x[rs1] + imm) & 0xFFFF_FFFE
+        if rd:
+            x[rd] = (pc + 4) & M
+        return target
+
+    # --- Loads / stores ----------------------------------------
+    # Sub-word loads sign-extend with (v ^ sign) - sign; LBU/LHU
+    # return the zero-extended value as-is.
+    if _raw_words(dmem) and not dmem._write_hooks:
+        data = dmem._data
+        limit = dmem._size * 4
+
+        def lw(pc, rd, rs1, rs2, imm):
+            a = (x[rs1] + imm) & M
+            if a & 3 or a >= limit:
+                dmem.load_word(a)       # raises the usual error
+            if rd:
+                x[rd] = data[a >> 2]
+            return (pc + 4) & M
+
+        def lh(pc, rd, rs1, rs2, imm):
+            a = (x[rs1] + imm) & M
+            if a & 1 or a >= limit:
+                dmem.load_half(a)
+            if rd:
+                v = (data[a >> 2] >> ((a & 3) << 3)) & 0xFFFF
+                x[rd] = ((v ^ 0x8000) - 0x8000) & M
+            return (pc + 4) & M
+
+        def lhu(pc, rd, rs1, rs2, imm):
+            a = (x[rs1] + imm) & M
+            if a & 1 or a >= limit:
+                dmem.load_half(a)
+            if rd:
+                x[rd] = (data[a >> 2] >> ((a & 3) << 3)) & 0xFFFF
+            return (pc + 4) & M
+
+        def lb(pc, rd, rs1, rs2, imm):
+            a = (x[rs1] + imm) & M
+            if a >= limit:
+                dmem.load_byte(a)
+            if rd:
+                v = (data[a >> 2] >> ((a & 3) << 3)) & 0xFF
+                x[rd] = ((v ^ 0x80) - 0x80) & M
+            return (pc + 4) & M
+
+        def lbu(pc, rd, rs1, rs2, imm):
+            a = (x[rs1] + imm) & M
+            if a >= limit:
+                dmem.load_byte(a)
+            if rd:
+                x[rd] = (data[a >> 2] >> ((a & 3) << 3)) & 0xFF
+            return (pc + 4) & M
+
+        def sw(pc, rd, rs1, rs2, imm):
+            a = (x[rs1] + imm) & M
+            if a & 3 or a >= limit:
+                dmem.store_word(a, 0)   # raises the usual error
+            data[a >> 2] = x[rs2]
+            return (pc + 4) & M
+
+        def sh(pc, rd, rs1, rs2, imm):
+            a = (x[rs1] + imm) & M
+            if a & 1 or a >= limit:
+                dmem.store_half(a, 0)
+            i, shift = a >> 2, (a & 3) << 3
+            data[i] = (data[i] & ~(0xFFFF << shift) & M) | ((x[rs2] & 0xFFFF) << shift)
+            return (pc + 4) & M
+
+        def sb(pc, rd, rs1, rs2, imm):
+            a = (x[rs1] + imm) & M
+            if a >= limit:
+                dmem.store_byte(a, 0)
+            i, shift = a >> 2, (a & 3) << 3
+            data[i] = (data[i] & ~(0xFF << shift) & M) | ((x[rs2] & 0xFF) << shift)
+            return (pc + 4) & M
+    else:
+        load_word = dmem.load_word
+        load_half = dmem.load_half
+        load_byte = dmem.load_byte
+        store_word = dmem.store_word
+        store_half = dmem.store_half
+        store_byte = dmem.store_byte
+
+        def lw(pc, rd, rs1, rs2, imm):
+            value = load_word((x[rs1] + imm) & M)
+            if rd:
+                x[rd] = value
+            return (pc + 4) & M
+
+        def lh(pc, rd, rs1, rs2, imm):
+            v = load_half((x[rs1] + imm) & M)
+            if rd:
+                x[rd] = ((v ^ 0x8000) - 0x8000) & M
+            return (pc + 4) & M
+
+        def lhu(pc, rd, rs1, rs2, imm):
+            v = load_half((x[rs1] + imm) & M)
+            if rd:
+                x[rd] = v
+            return (pc + 4) & M
+
+        def lb(pc, rd, rs1, rs2, imm):
+            v = load_byte((x[rs1] + imm) & M)
+            if rd:
+                x[rd] = ((v ^ 0x80) - 0x80) & M
+            return (pc + 4) & M
+
+        def lbu(pc, rd, rs1, rs2, imm):
+            v = load_byte((x[rs1] + imm) & M)
+            if rd:
+                x[rd] = v
+            return (pc + 4) & M
+
+        def sw(pc, rd, rs1, rs2, imm):
+            store_word((x[rs1] + imm) & M, x[rs2])
+            return (pc + 4) & M
+
+        def sh(pc, rd, rs1, rs2, imm):
+            store_half((x[rs1] + imm) & M, x[rs2])
+            return (pc + 4) & M
+
+        def sb(pc, rd, rs1, rs2, imm):
+            store_byte((x[rs1] + imm) & M, x[rs2])
+            return (pc + 4) & M
+
+    alu_reg = {
+        ALU_ADD: add, ALU_SUB: sub, ALU_AND: and_, ALU_OR: or_,
+        ALU_XOR: xor, ALU_SLL: sll, ALU_SRL: srl, ALU_SRA: sra,
+        ALU_SLT: slt, ALU_SLTU: sltu, ALU_COPY_B: copy_b,
+    }
+    alu_imm = {
+        ALU_ADD: addi, ALU_SUB: subi, ALU_AND: andi, ALU_OR: ori,
+        ALU_XOR: xori, ALU_SLL: slli, ALU_SRL: srli, ALU_SRA: srai,
+        ALU_SLT: slti, ALU_SLTU: sltiu, ALU_COPY_B: li,
+    }
+    branch = {
+        BR_EQ: beq, BR_NE: bne, BR_LT: blt,
+        BR_GE: bge, BR_LTU: bltu, BR_GEU: bgeu,
+    }
+    misc = {
+        "nop": nop, "li": li, "auipc": auipc,
+        "jal": jal, "jalr": jalr,
+        # loads keyed by (width, unsigned), stores by width
+        (4, False): lw, (2, False): lh, (2, True): lhu,
+        (1, False): lb, (1, True): lbu,
+        4: sw, 2: sh, 1: sb,
+    }
+
+    # --- ECALL (only when a syscall handler is attached) -------
+    syscalls = cpu.syscalls if cpu is not None else None
+    if syscalls is not None:
+        def ecall(pc, rd, rs1, rs2, imm):
+            if syscalls.ecall(cpu):
+                raise GuestExit((pc + 4) & M, 1)
+            return (pc + 4) & M
+
+        misc["ecall"] = ecall
+    return alu_reg, alu_imm, branch, misc
+
+
+def _make_decoder(tables) -> Callable[[int], Entry]:
+    """Return decode(word) -> Entry, choosing the handler once per word."""
+    alu_reg, alu_imm, branch, misc = tables
+
+    def decode_entry(word: int) -> Entry:
+        di, ctrl, imm = predecode_word(word)
+        rd, rs1, rs2 = di.rd, di.rs1, di.rs2
+        imm32 = imm & M
+
+        if ctrl.jump:
+            return misc["jal"], rd, rs1, rs2, imm
+        if ctrl.system and word == INSTR_ECALL and "ecall" in misc:
+            return misc["ecall"], rd, rs1, rs2, imm
+        if ctrl.jalr:
+            return misc["jalr"], rd, rs1, rs2, imm
+        if ctrl.branch_cond:
+            return branch[ctrl.branch_cond], rd, rs1, rs2, imm
+        if ctrl.mem_read:
+            return misc[ctrl.mem_size, ctrl.mem_unsigned], rd, rs1, rs2, imm32
+        if ctrl.mem_write:
+            return misc[ctrl.mem_size], rd, rs1, rs2, imm32
+        if not ctrl.reg_write or rd == 0:
+            return misc["nop"], rd, rs1, rs2, imm
+        if ctrl.use_pc_plus_imm:
+            return misc["auipc"], rd, rs1, rs2, imm32
+        if ctrl.use_imm_high:
+            return misc["li"], rd, rs1, rs2, imm32
+
+        op = ctrl.alu_op
+        handler = (alu_imm if ctrl.alu_src_imm else alu_reg).get(op)
+        if handler is None:
+            return misc["li"], rd, rs1, rs2, 0   # unknown op -> result 0
+        if op in (ALU_SLL, ALU_SRL, ALU_SRA):
+            imm32 &= 0x1F
+        elif op == ALU_SLT:
+            imm32 = (imm32 ^ S) - S
+        return handler, rd, rs1, rs2, imm32
+
+    return decode_entry
+# AI-END
+# ============================================================
+
+
+# ============================================================
+# AI-BEGIN
+# The monolithic fast loop.  PC, the step counter and the last
+# fetched word live in locals and are committed back to the CPU
+# (pc, cycle, last_instr) on exit, including when an access fault
+# propagates or a guest exit unwinds the loop from the ECALL
+# handler.  Decoded entries are cached
+# by instruction *word*, so no invalidation is ever needed: a
+# rewritten IMEM word simply misses and is decoded again.
+# ============================================================
+def run_fast(cpu, max_steps: int) -> None:
+    """Execute up to max_steps instructions on cpu with the fast loop."""
+    imem = cpu.imem
+    x = cpu.regs._regs
+    decode_entry = _make_decoder(_build_handlers(x, cpu.dmem, cpu))
+    entries: Dict[int, Entry] = {}
+
+    pc = cpu.pc
+    n = 0
+    word = cpu.last_instr
+    try:
+        if _raw_words(imem):
+            idata = imem._data
+            ilimit = imem._size * 4
+            fetch = imem.load_word
+            while n < max_steps:
+                if pc & 3 or pc >= ilimit:
+                    fetch(pc)                   # raises the usual error
+                word = idata[pc >> 2]
+                e = entries.get(word)
+                if e is None:
+                    e = entries[word] = decode_entry(word)
+                h, rd, rs1, rs2, imm = e
+                pc = h(pc, rd, rs1, rs2, imm)
+                n += 1
+        else:
+            fetch = imem.load_word
+            while n < max_steps:
+                word = fetch(pc)
+                e = entries.get(word)
+                if e is None:
+                    e = entries[word] = decode_entry(word)
+                h, rd, rs1, rs2, imm = e
+                pc = h(pc, rd, rs1, rs2, imm)
+                n += 1
+    except GuestExit as e:
+        pc = e.pc
+        n += e.steps
+    finally:
+        cpu.pc = pc
+        cpu.cycle += n
+        cpu.last_instr = word
+# AI-END
+# ============================================================
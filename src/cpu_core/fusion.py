@@ -0,0 +1,206 @@
+# src/cpu_core/fusion.py
+from typing import Callable, Dict, NamedTuple, Optional
+
+from .isa import OPCODES
+from .memory import Memory
+from .predecode import PredecodeCache, PredecodedInstr
+from .control import (
+    ALU_ADD,
+    ALU_SUB,
+    ALU_SLT,
+    ALU_SLTU,
+    BR_EQ,
+    BR_NE,
+)
+
+
+M = 0xFFFF_FFFF
+S = 0x8000_0000
+
+# ----------------------------------------
+# Fused pair kinds
+# ----------------------------------------
+FUSE_LUI_ADDI = "lui+addi"        # 32-bit constant
+FUSE_AUIPC_JALR = "auipc+jalr"    # far call / jump
+FUSE_AUIPC_LW = "auipc+lw"        # PC-relative load
+FUSE_CMP_BRANCH = "cmp+branch"    # slt/sltu/sub followed by beq/bne vs x0
+
+
+# ----------------------------------------
+# A superinstruction covering two IMEM words
+# ----------------------------------------
+class FusedOp(NamedTuple):
+    kind: str
+    fn: Callable        # fn(x, cpu) -> next_pc (executes both instructions)
+    second_word: int    # raw word of the second instruction
+
+
+def _is(pre: PredecodedInstr, opcode: str) -> bool:
+    return pre.di.opcode == OPCODES[opcode]
+
+
+# ============================================================
+# AI-BEGIN
+# Pattern matching + superinstruction builders.  Each builder
+# returns a closure with every field and immediate bound as a
+# constant.  Results are written in the same order CPU.step
+# would write them, so architectural state is identical.
+# ============================================================
+def _fuse_lui_addi(pc: int, a: PredecodedInstr, b: PredecodedInstr):
+    rd = a.di.rd
+    if not (b.ctrl.alu_op == ALU_ADD and b.di.funct3 == 0
+            and b.di.rs1 == rd and b.di.rd == rd and rd != 0):
+        return None
+    value = (a.imm + b.imm) & M
+    next_pc = (pc + 8) & M
+
+    def lui_addi(x, cpu):
+        x[rd] = value
+        return next_pc
+    return lui_addi
+
+
+def _fuse_auipc_jalr(pc: int, a: PredecodedInstr, b: PredecodedInstr):
+    rd, link = a.di.rd, b.di.rd
+    if b.di.rs1 != rd or rd == 0:
+        return None
+    base = (pc + a.imm) & M
+    target = (base + b.imm) & 0xFFFF_FFFE
+    ret = (pc + 8) & M
+
+    def auipc_jalr(x, cpu):
+        x[rd] = base
+        if link:
+            x[link] = ret
+        return target
+    return auipc_jalr
+
+
+def _fuse_auipc_lw(pc: int, a: PredecodedInstr, b: PredecodedInstr):
+    rd, dst = a.di.rd, b.di.rd
+    if b.di.funct3 != 0b010 or b.di.rs1 != rd or rd == 0:
+        return None
+    base = (pc + a.imm) & M
+    addr = (base + b.imm) & M
+    mid_pc = (pc + 4) & M
+    next_pc = (pc + 8) & M
+
+    def auipc_lw(x, cpu):
+        x[rd] = base
+        try:
+            value = cpu.dmem.load_word(addr)
+        except Exception:
+            # The AUIPC has retired; fault at the load like step() would
+            cpu.pc = mid_pc
+            cpu.cycle += 1
+            raise
+        if dst:
+            x[dst] = value
+        return next_pc
+    return auipc_lw
+
+
+def _fuse_cmp_branch(pc: int, a: PredecodedInstr, b: PredecodedInstr):
+    rd, rs1, rs2 = a.di.rd, a.di.rs1, a.di.rs2
+    op, cond = a.ctrl.alu_op, b.ctrl.branch_cond
+    if op not in (ALU_SLT, ALU_SLTU, ALU_SUB) or cond not in (BR_EQ, BR_NE):
+        return None
+    if rd == 0 or (b.di.rs1, b.di.rs2) not in ((rd, 0), (0, rd)):
+        return None
+    taken_pc = (pc + 4 + b.imm) & M
+    fall_pc = (pc + 8) & M
+    if cond == BR_EQ:
+        taken_pc, fall_pc = fall_pc, taken_pc   # branch when result == 0
+
+    if op == ALU_SUB:
+        def sub_branch(x, cpu):
+            v = x[rd] = (x[rs1] - x[rs2]) & M
+            return taken_pc if v else fall_pc
+        return sub_branch
+    if op == ALU_SLT:
+        def slt_branch(x, cpu):
+            v = x[rd] = 1 if ((x[rs1] ^ S) - S) < ((x[rs2] ^ S) - S) else 0
+            return taken_pc if v else fall_pc
+        return slt_branch
+
+    def sltu_branch(x, cpu):
+        v = x[rd] = 1 if x[rs1] < x[rs2] else 0
+        return taken_pc if v else fall_pc
+    return sltu_branch
+
+
+def match_pair(pc: int, a: PredecodedInstr, b: PredecodedInstr) -> Optional[FusedOp]:
+    """Return the superinstruction for the pair at (pc, pc+4), if any."""
+    if _is(a, "LUI") and _is(b, "OP_IMM"):
+        kind, fn = FUSE_LUI_ADDI, _fuse_lui_addi(pc, a, b)
+    elif _is(a, "AUIPC") and _is(b, "JALR"):
+        kind, fn = FUSE_AUIPC_JALR, _fuse_auipc_jalr(pc, a, b)
+    elif _is(a, "AUIPC") and _is(b, "LOAD"):
+        kind, fn = FUSE_AUIPC_LW, _fuse_auipc_lw(pc, a, b)
+    elif _is(a, "OP") and _is(b, "BRANCH"):
+        kind, fn = FUSE_CMP_BRANCH, _fuse_cmp_branch(pc, a, b)
+    else:
+        return None
+    if fn is None:
+        return None
+    return FusedOp(kind, fn, b.di.instr)
+# AI-END
+# ============================================================
+
+
+# ----------------------------------------
+# Fusion table (built lazily on top of the predecode cache)
+# ----------------------------------------
+class FusionTable:
+    """
+    PC-keyed table of fused instruction pairs.
+
+    Each PC is analysed once, the first time execution reaches it;
+    the result (a FusedOp or None) is cached and dropped whenever
+    either IMEM word of the pair is written.
+    """
+
+    def __init__(self, icache: PredecodeCache, imem: Memory) -> None:
+        self._icache = icache
+        self._ops: Dict[int, Optional[FusedOp]] = {}
+        self.pairs: Dict[str, int] = {}        # distinct pairs found, by kind
+        self.executed: Dict[str, int] = {}     # fused executions, by kind
+        imem.add_write_hook(self.invalidate)
+
+    def lookup(self, pc: int) -> Optional[FusedOp]:
+        """Return the fused op starting at pc, or None."""
+        try:
+            return self._ops[pc]
+        except KeyError:
+            pass
+
+        first = self._icache.lookup(pc)
+        try:
+            second = self._icache.lookup((pc + 4) & M)
+        except (IndexError, ValueError):
+            second = None
+        op = match_pair(pc, first, second) if second is not None else None
+
+        self._ops[pc] = op
+        if op is not None:
+            self.pairs[op.kind] = self.pairs.get(op.kind, 0) + 1
+        return op
+
+    def record(self, op: FusedOp) -> None:
+        """Count one execution of a fused op."""
+        self.executed[op.kind] = self.executed.get(op.kind, 0) + 1
+
+    @property
+    def fused_count(self) -> int:
+        """Total number of fused pair executions."""
+        return sum(self.executed.values())
+
+    def invalidate(self, addr: int, num_words: int) -> None:
+        """Drop analyses for pairs overlapping the written words."""
+        if not self._ops:
+            return
+        if num_words > 64:
+            self._ops.clear()
+            return
+        for pc in range(addr - 4, addr + 4 * num_words, 4):
+            self._ops.pop(pc, None)
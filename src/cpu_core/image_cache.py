@@ -0,0 +1,344 @@
+# src/cpu_core/image_cache.py
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, fields
+from typing import List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only predecoded images need it
+    np = None
+
+from .prog_loader import load_prog_hex
+
+
+# ----------------------------------------
+# File format (all fields little-endian)
+#
+#   header   magic, version, flags, word count
+#   words    word count × u32
+#   fields   (FLAG_DECODED only) one array per DecodedImage field,
+#            in dataclass order, using the field's NumPy dtype
+#
+# Every section starts on a 64-byte boundary so it can be viewed
+# straight out of the mapping (memoryview / np.frombuffer).
+# ----------------------------------------
+MAGIC = b"RVIMG\x00\x00\x01"
+VERSION = 2
+
+FLAG_DECODED = 1 << 0       # predecoded fields follow the words
+
+_HEADER = struct.Struct("<8sHHQ")
+_ALIGN = 64
+
+IMAGE_SUFFIX = ".rvimg"
+DEFAULT_MAX_BYTES = 256 << 20
+
+# Environment overrides for the default cache
+ENV_DIR = "RVSIM_IMAGE_CACHE"
+ENV_DISABLE = "RVSIM_NO_IMAGE_CACHE"
+
+_FIELD_DTYPES = {
+    "words": "<u4", "opcode": "u1", "rd": "u1", "rs1": "u1", "rs2": "u1",
+    "funct3": "u1", "funct7": "u1", "imm": "<i8", "iclass": "u1",
+}
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _aligned(n: int) -> int:
+    return n + (-n % _ALIGN)
+
+
+def file_digest(path: str) -> str:
+    """Content key of a program file (BLAKE2b-128 of its bytes, hex)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(b"rvimg-%d\0" % VERSION)       # new format => new keys
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@dataclass
+class CachedImage:
+    """
+    Parsed program image backed by a read-only mapping of its cache
+    file.  words is a memoryview of format 'I'; decoded is a
+    bulk_decode.DecodedImage of zero-copy NumPy views, or None.
+    """
+    key: str
+    words: memoryview
+    decoded: Optional[object] = None
+
+    def word_list(self) -> List[int]:
+        return self.words.tolist()
+
+
+# ============================================================
+# AI-BEGIN
+# Encoding and mapping.  A cache file is the header followed by
+# raw little-endian sections, so a hit is one mmap plus a header
+# unpack: the words are a memoryview cast of the mapping and the
+# predecoded fields are np.frombuffer views of it (nothing is
+# parsed or copied until the caller asks for a list).  Files are
+# written to a per-process temporary name and renamed into place,
+# so concurrent runs never see a half-written image.
+# ============================================================
+def _encode(words: array, decoded=None) -> List[bytes]:
+    if _BIG_ENDIAN:
+        words = array("I", words)
+        words.byteswap()
+    flags = FLAG_DECODED if decoded is not None else 0
+    parts = [_HEADER.pack(MAGIC, VERSION, flags, len(words))]
+    pos = _HEADER.size
+    sections = [words.tobytes()]
+    if decoded is not None:
+        sections += [np.ascontiguousarray(getattr(decoded, f.name), _FIELD_DTYPES[f.name]).tobytes()
+                     for f in fields(decoded) if f.name != "words"]
+    for data in sections:
+        parts.append(bytes(_aligned(pos) - pos))
+        parts.append(data)
+        pos = _aligned(pos) + len(data)
+    return parts
+
+
+def _map(path: str, key: str) -> Optional[CachedImage]:
+    """Map a cache file; None if it is missing, stale or damaged."""
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):       # missing, or empty (mmap of 0 bytes)
+        return None
+    buf = memoryview(mm)
+    if len(buf) < _HEADER.size:
+        return None
+    magic, version, flags, count = _HEADER.unpack_from(buf)
+    pos = _aligned(_HEADER.size)
+    if magic != MAGIC or version != VERSION or pos + 4 * count > len(buf):
+        return None
+
+    raw = buf[pos:pos + 4 * count]
+    if _BIG_ENDIAN:
+        words = memoryview(_bytes_to_array(raw))
+    else:
+        words = raw.cast("I")
+
+    decoded = None
+    if flags & FLAG_DECODED and np is not None:
+        from .bulk_decode import DecodedImage
+        arrays = {}
+        for f in fields(DecodedImage):
+            dtype = np.dtype(_FIELD_DTYPES[f.name])
+            size = dtype.itemsize * count
+            if pos + size > len(buf):
+                return None
+            arrays[f.name] = np.frombuffer(buf, dtype, count, pos)
+            pos = _aligned(pos + size)
+        decoded = DecodedImage(**arrays)
+    return CachedImage(key, words, decoded)
+
+
+def _bytes_to_array(data) -> array:
+    words = array("I")
+    words.frombytes(data)
+    if _BIG_ENDIAN:
+        words.byteswap()
+    return words
+# AI-END
+# ============================================================
+
+
+class LruDirectory:
+    """
+    A directory of cache files with a common suffix, kept under
+    max_bytes by deleting the least recently used files first (use
+    touch() on every hit to refresh a file's mtime).  hits and misses
+    count lookups made through this object.
+    """
+    suffix = ".bin"
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+
+    def touch(self, path: str) -> None:
+        """Mark an entry as most recently used."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    # ----------------------------------------
+    # Storage and eviction
+    # ----------------------------------------
+    def _store(self, path: str, parts: List[bytes]) -> bool:
+        """Write one entry atomically; False if the cache is unusable."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.writelines(parts)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return False
+        self.evict(keep=path)
+        return True
+
+    def entries(self) -> List[str]:
+        """Cache files, least recently used first."""
+        found = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        for name in names:
+            if name.endswith(self.suffix):
+                p = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue            # removed by another process
+                found.append((st.st_mtime_ns, name, p, st.st_size))
+        return [p for _, _, p, _ in sorted(found)]
+
+    def size_bytes(self) -> int:
+        total = 0
+        for p in self.entries():
+            try:
+                total += os.path.getsize(p)
+            except OSError:
+                pass
+        return total
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """
+        Delete least recently used entries until the directory fits in
+        max_bytes (never the entry just written).  Returns how many
+        files were removed.
+        """
+        sized = []
+        for p in self.entries():
+            try:
+                sized.append((p, os.path.getsize(p)))
+            except OSError:
+                pass
+        total = sum(size for _, size in sized)
+        removed = 0
+        for p, size in sized:
+            if total <= self.max_bytes:
+                break
+            if p == keep:
+                continue
+            try:
+                os.remove(p)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for p in self.entries():
+            try:
+                os.remove(p)
+            except OSError:
+                pass
+
+
+class ImageCache(LruDirectory):
+    """
+    On-disk cache of parsed .hex program images, keyed by a hash of
+    the file contents, with LRU eviction (see LruDirectory).
+    """
+    suffix = IMAGE_SUFFIX
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        super().__init__(directory or default_directory(), max_bytes)
+
+    # ----------------------------------------
+    # Lookup
+    # ----------------------------------------
+    def load(self, hex_path: str, decoded: bool = False) -> CachedImage:
+        """
+        Parsed image of hex_path, from the cache when possible.  With
+        decoded=True the image also carries the predecoded fields
+        (requires numpy); an entry stored without them is upgraded.
+        Parse errors propagate and nothing is cached for that file.
+        """
+        key = file_digest(hex_path)
+        path = self.path_for(key)
+        image = _map(path, key)
+        if image is not None and (image.decoded is not None or not decoded):
+            self.hits += 1
+            self.touch(path)
+            return image
+
+        self.misses += 1
+        words = array("I", load_prog_hex(hex_path))
+        dec = None
+        if decoded:
+            from .bulk_decode import decode_image
+            dec = decode_image(words)
+        if not self._store(path, _encode(words, dec)):
+            return CachedImage(key, memoryview(words), dec)
+        return _map(path, key) or CachedImage(key, memoryview(words), dec)
+
+    def load_words(self, hex_path: str) -> List[int]:
+        """Drop-in for load_prog_hex that goes through the cache."""
+        return self.load(hex_path).word_list()
+
+
+# ----------------------------------------
+# Process-wide default cache (used by run_program and the CLI)
+# ----------------------------------------
+def cache_home() -> str:
+    """<XDG cache dir>/rv-sim: the parent of the simulator's default caches."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "rv-sim")
+
+
+def default_directory() -> str:
+    """$RVSIM_IMAGE_CACHE, else <XDG cache dir>/rv-sim/images."""
+    explicit = os.environ.get(ENV_DIR)
+    if explicit:
+        return explicit
+    return os.path.join(cache_home(), "images")
+
+
+_default: Optional[ImageCache] = None
+
+
+def default_cache() -> Optional[ImageCache]:
+    """The shared ImageCache, or None when $RVSIM_NO_IMAGE_CACHE is set."""
+    global _default
+    if os.environ.get(ENV_DISABLE):
+        return None
+    if _default is None or _default.directory != default_directory():
+        _default = ImageCache()
+    return _default
+
+
+def load_prog_hex_cached(hex_path: str, cache=True) -> List[int]:
+    """
+    load_prog_hex through an image cache.  cache may be True (the
+    default cache), False/None (always parse the text) or an
+    ImageCache instance.
+    """
+    if cache is True:
+        cache = default_cache()
+    if not cache:
+        return load_prog_hex(hex_path)
+    return cache.load_words(hex_path)
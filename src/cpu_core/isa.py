@@ -13,8 +13,13 @@ OPCODES = {
     "BRANCH":  0b1100011,  # B-type conditional branches
     "LOAD":    0b0000011,  # I-type loads
     "STORE":   0b0100011,  # S-type stores
+    "SYSTEM":  0b1110011,  # ECALL / EBREAK (CSR instructions are no-ops)
 }
 
+# Whole-word encodings of the environment instructions
+INSTR_ECALL = 0x00000073
+INSTR_EBREAK = 0x00100073
+
 
 # ----------------------------------------
 # Basic field extractors (simple helpers)
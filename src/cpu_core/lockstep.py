@@ -0,0 +1,340 @@
+# src/cpu_core/lockstep.py
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only this module needs it
+    np = None
+
+from .isa import INSTR_EBREAK, INSTR_ECALL
+from .memory import Memory, _check_aligned, _check_index
+from .predecode import PredecodedInstr, predecode_word
+from .control import (
+    ALU_ADD,
+    ALU_SUB,
+    ALU_AND,
+    ALU_OR,
+    ALU_XOR,
+    ALU_SLT,
+    ALU_SLTU,
+    ALU_SLL,
+    ALU_SRL,
+    ALU_SRA,
+    ALU_COPY_B,
+    BR_EQ,
+    BR_NE,
+    BR_LT,
+    BR_GE,
+    BR_LTU,
+    BR_GEU,
+)
+from .datapath import (
+    CPUState,
+    StopConditions,
+    STOP_EBREAK,
+    STOP_ECALL,
+    STOP_MAX_STEPS,
+    STOP_SELF_LOOP,
+    STOP_TARGET_PC,
+    _is_self_loop,
+)
+
+
+M = 0xFFFF_FFFF
+S = 0x8000_0000
+
+STOP_FAULT = "fault"    # instance raised an access error (see .faults)
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("the lockstep engine requires numpy (pip install numpy)")
+
+
+# ----------------------------------------
+# Vectorised ALU / branch helpers (int64 arrays of masked values)
+# ----------------------------------------
+def _signed(v):
+    return (v ^ S) - S
+
+
+def _alu_vec(op: int, a, b):
+    if op == ALU_ADD:
+        return (a + b) & M
+    if op == ALU_SUB:
+        return (a - b) & M
+    if op == ALU_AND:
+        return a & b
+    if op == ALU_OR:
+        return a | b
+    if op == ALU_XOR:
+        return a ^ b
+    if op == ALU_SLT:
+        return (_signed(a) < _signed(b)).astype(np.int64)
+    if op == ALU_SLTU:
+        return (a < b).astype(np.int64)
+    if op == ALU_SLL:
+        return (a << (b & 0x1F)) & M
+    if op == ALU_SRL:
+        return a >> (b & 0x1F)
+    if op == ALU_SRA:
+        return (_signed(a) >> (b & 0x1F)) & M
+    if op == ALU_COPY_B:
+        return b
+    return np.zeros_like(a)
+
+
+def _branch_vec(cond: int, a, b):
+    if cond == BR_EQ:
+        return a == b
+    if cond == BR_NE:
+        return a != b
+    if cond == BR_LT:
+        return _signed(a) < _signed(b)
+    if cond == BR_GE:
+        return _signed(a) >= _signed(b)
+    if cond == BR_LTU:
+        return a < b
+    if cond == BR_GEU:
+        return a >= b
+    return np.zeros(a.shape, dtype=bool)
+
+
+# ----------------------------------------
+# Lockstep engine
+# ----------------------------------------
+class LockstepCPU:
+    """
+    N copies of the RV32I CPU running one shared program in lockstep.
+
+    Register files are an (N, 32) uint32 array and data memories an
+    (N, dmem_words) uint32 array.  Each global step groups the active
+    instances by PC and executes that instruction for the whole group
+    with vectorised ALU, load/store and branch evaluation, so diverged
+    instances simply form more groups.
+
+    Instances stop independently (halt events, access faults or the
+    step budget); per-instance results match the reference CPU.
+    IMEM is treated as read-only for the lifetime of the engine.
+    """
+
+    def __init__(
+        self,
+        imem: Memory,
+        num_instances: int,
+        dmem_words: int,
+        pc_reset: int = 0,
+    ) -> None:
+        _require_numpy()
+        if num_instances <= 0:
+            raise ValueError("num_instances must be positive")
+        if dmem_words <= 0:
+            raise ValueError("dmem_words must be positive")
+
+        self.imem = imem
+        self.n = num_instances
+        self.dmem_words = dmem_words
+        self.regs = np.zeros((num_instances, 32), dtype=np.uint32)
+        self.dmem = np.zeros((num_instances, dmem_words), dtype=np.uint32)
+        self.pc = np.full(num_instances, pc_reset & M, dtype=np.int64)
+        self.cycle = np.zeros(num_instances, dtype=np.int64)
+        self.active = np.ones(num_instances, dtype=bool)
+        self.stop_reason: List[Optional[str]] = [None] * num_instances
+        self.faults: List[Optional[Exception]] = [None] * num_instances
+        self._decoded: Dict[int, PredecodedInstr] = {}
+
+    # --------------------------------------------------------
+    # Per-instance state access
+    # --------------------------------------------------------
+    def set_reg(self, idx: int, values: Sequence[int]) -> None:
+        """Set register x[idx] for every instance (x0 stays zero)."""
+        if idx != 0:
+            self.regs[:, idx] = np.asarray(values, dtype=np.int64) & M
+
+    def load_dmem(self, instance: int, words: Sequence[int], base_addr: int = 0) -> None:
+        """Copy words into one instance's data memory."""
+        _check_aligned(base_addr)
+        start = base_addr // 4
+        if start + len(words) > self.dmem_words:
+            raise IndexError(
+                f"{len(words)} words do not fit at index {start} "
+                f"in memory of size {self.dmem_words}"
+            )
+        self.dmem[instance, start:start + len(words)] = np.asarray(words, dtype=np.int64) & M
+
+    def get_state(self, instance: int) -> CPUState:
+        """Return the PC and register snapshot of one instance."""
+        return CPUState(
+            pc=int(self.pc[instance]),
+            regs=[int(v) for v in self.regs[instance]],
+        )
+
+    # --------------------------------------------------------
+    # Decode (once per PC; fetch errors match Memory.load_word)
+    # --------------------------------------------------------
+    def _decode(self, pc: int) -> PredecodedInstr:
+        pre = self._decoded.get(pc)
+        if pre is None:
+            pre = predecode_word(self.imem.load_word(pc))
+            self._decoded[pc] = pre
+        return pre
+
+    def _fault(self, rows, exc_for_row) -> None:
+        for r in rows:
+            r = int(r)
+            self.faults[r] = exc_for_row(r)
+            self.stop_reason[r] = STOP_FAULT
+            self.active[r] = False
+
+    # ============================================================
+    # AI-BEGIN
+    # Execute the instruction at 'pc' for every instance in 'rows'.
+    # Follows CPU.step stage by stage: operand select, ALU, memory,
+    # write-back, next PC.  Instances whose access faults are
+    # retired with the same exception CPU.step would raise and no
+    # state change, exactly like the reference.
+    # ============================================================
+    def _exec_group(self, pc: int, rows, stop: Optional[StopConditions]) -> None:
+        try:
+            di, ctrl, imm = self._decode(pc)
+        except (IndexError, ValueError) as exc:
+            self._fault(rows, lambda r: type(exc)(*exc.args))
+            return
+
+        regs = self.regs
+        a = regs[rows, di.rs1].astype(np.int64)
+        b = regs[rows, di.rs2].astype(np.int64)
+        pc_plus_4 = (pc + 4) & M
+
+        op_a = np.full(len(rows), pc, dtype=np.int64) if ctrl.use_pc_plus_imm else a
+        if ctrl.use_imm_high or ctrl.alu_src_imm:
+            op_b = np.full(len(rows), imm & M, dtype=np.int64)
+        else:
+            op_b = b
+        result = _alu_vec(ctrl.alu_op, op_a, op_b)
+
+        # --- Memory stage (per-instance bounds/alignment) -----
+        if ctrl.mem_read or ctrl.mem_write:
+            size = ctrl.mem_size
+            bad = ((result & (size - 1)) != 0) | (result >= self.dmem_words * 4)
+            if bad.any():
+                addrs = dict(zip(rows[bad].tolist(), result[bad].tolist()))
+                self._fault(rows[bad], lambda r: self._access_error(addrs[r], size))
+                ok = ~bad
+                rows, a, b, result = rows[ok], a[ok], b[ok], result[ok]
+                if len(rows) == 0:
+                    return
+            widx = result >> 2
+            if size == 4:
+                if ctrl.mem_read:
+                    result = self.dmem[rows, widx].astype(np.int64)
+                if ctrl.mem_write:
+                    self.dmem[rows, widx] = b
+            else:
+                # Sub-word access: shift the lane within its word
+                mask = 0xFFFF if size == 2 else 0xFF
+                shift = (result & 3) << 3
+                word = self.dmem[rows, widx].astype(np.int64)
+                if ctrl.mem_read:
+                    result = (word >> shift) & mask
+                    if not ctrl.mem_unsigned:
+                        sign = (mask + 1) >> 1
+                        result = ((result ^ sign) - sign) & M
+                if ctrl.mem_write:
+                    self.dmem[rows, widx] = (word & ~(mask << shift) & M) | ((b & mask) << shift)
+
+        # --- Write-back ---------------------------------------
+        if ctrl.jump or ctrl.jalr:
+            result = np.full(len(rows), pc_plus_4, dtype=np.int64)
+        if ctrl.reg_write and di.rd != 0:
+            regs[rows, di.rd] = result
+
+        # --- Next PC ------------------------------------------
+        if ctrl.jump:
+            next_pc = np.full(len(rows), (pc + imm) & M, dtype=np.int64)
+        elif ctrl.jalr:
+            next_pc = (a + imm) & 0xFFFF_FFFE
+        elif ctrl.branch_cond:
+            taken = _branch_vec(ctrl.branch_cond, a, b)
+            next_pc = np.where(taken, (pc + imm) & M, pc_plus_4).astype(np.int64)
+        else:
+            next_pc = np.full(len(rows), pc_plus_4, dtype=np.int64)
+
+        self.pc[rows] = next_pc
+        self.cycle[rows] += 1
+
+        # --- Halt events (after the instruction retires) ------
+        if stop is None:
+            return
+        word = di.instr
+        reason = None
+        if word == INSTR_EBREAK and stop.halt_on_ebreak:
+            reason = STOP_EBREAK
+        elif word == INSTR_ECALL and stop.halt_on_ecall:
+            reason = STOP_ECALL
+        if reason is not None:
+            halted = rows
+        elif stop.halt_on_self_loop and _is_self_loop(word):
+            halted = rows[next_pc == pc]
+            reason = STOP_SELF_LOOP
+        else:
+            return
+        for r in halted.tolist():
+            self.stop_reason[r] = reason
+        self.active[halted] = False
+
+    def _access_error(self, addr: int, size: int) -> Exception:
+        """Build the exception Memory would raise for a bad data address."""
+        try:
+            if size > 1:
+                _check_aligned(addr, size)
+            _check_index(addr // 4, self.dmem_words)
+        except (IndexError, ValueError) as exc:
+            return exc
+        return IndexError(f"Memory index out of range: {addr // 4}")
+    # AI-END
+    # ============================================================
+
+    # --------------------------------------------------------
+    # Run loop
+    # --------------------------------------------------------
+    def step(self, stop: Optional[StopConditions] = None) -> int:
+        """Advance every active instance by one instruction; return how many ran."""
+        active_rows = np.flatnonzero(self.active)
+        if len(active_rows) == 0:
+            return 0
+
+        if stop is not None and stop.target_pc is not None:
+            at_target = active_rows[self.pc[active_rows] == stop.target_pc]
+            for r in at_target.tolist():
+                self.stop_reason[r] = STOP_TARGET_PC
+            self.active[at_target] = False
+            active_rows = np.flatnonzero(self.active)
+
+        pcs = self.pc[active_rows]
+        for pc in np.unique(pcs).tolist():
+            self._exec_group(pc, active_rows[pcs == pc], stop)
+        return len(active_rows)
+
+    def run(self, max_steps: int = 10_000, stop: Optional[StopConditions] = None) -> int:
+        """
+        Run every instance for up to max_steps instructions.
+
+        Returns the number of lockstep iterations performed.  Instances
+        still active afterwards get stop reason 'max_steps'.
+        """
+        steps = 0
+        while steps < max_steps and self.active.any():
+            self.step(stop)
+            steps += 1
+
+        # target_pc reached exactly at the end of the budget
+        if stop is not None and stop.target_pc is not None:
+            at_target = np.flatnonzero(self.active & (self.pc == stop.target_pc))
+            for r in at_target.tolist():
+                self.stop_reason[r] = STOP_TARGET_PC
+            self.active[at_target] = False
+
+        for r in np.flatnonzero(self.active).tolist():
+            self.stop_reason[r] = STOP_MAX_STEPS
+        return steps
@@ -1,14 +1,18 @@
-from typing import List
+from typing import Callable, List
 
 XLEN = 32
 
+# Callback run after a write: hook(start_addr, num_words)
+WriteHook = Callable[[int, int], None]
+
 # ----------------------------------------
 # Basic safety checks for memory accesses
 # ----------------------------------------
-def _check_aligned(addr: int) -> None:
-    """Ensure the address is 4-byte aligned (required for word access)."""
-    if addr % 4 != 0:
-        raise ValueError(f"Unaligned word access at address 0x{addr:08X}")
+def _check_aligned(addr: int, size: int = 4) -> None:
+    """Ensure the address is size-aligned (4 for words, 2 for halfwords)."""
+    if addr % size != 0:
+        kind = "word" if size == 4 else "halfword"
+        raise ValueError(f"Unaligned {kind} access at address 0x{addr:08X}")
 
 
 def _check_index(idx: int, size: int) -> None:
@@ -35,12 +39,34 @@ class Memory:
             raise ValueError("num_words must be positive")
         self._size = num_words
         self._data: List[int] = [0] * num_words
+        self._write_hooks: List[WriteHook] = []
+
+    @property
+    def size_bytes(self) -> int:
+        return 4 * self._size
 
     def reset(self, value: int = 0) -> None:
         """Fill memory with a repeated 32-bit value."""
         v = _mask32(value)
         for i in range(self._size):
             self._data[i] = v
+        if self._write_hooks:
+            self._notify_write(0, self._size)
+
+    # ----------------------------------------
+    # Write hooks (used to invalidate decode caches)
+    # ----------------------------------------
+    def add_write_hook(self, hook: WriteHook) -> None:
+        """Register hook(start_addr, num_words), called after every write."""
+        self._write_hooks.append(hook)
+
+    def remove_write_hook(self, hook: WriteHook) -> None:
+        """Unregister a hook previously added with add_write_hook."""
+        self._write_hooks.remove(hook)
+
+    def _notify_write(self, addr: int, num_words: int) -> None:
+        for hook in self._write_hooks:
+            hook(addr, num_words)
 
     # ----------------------------------------
     # Word load/store operations
@@ -58,6 +84,43 @@ class Memory:
         idx = addr // 4
         _check_index(idx, self._size)
         self._data[idx] = _mask32(value)
+        if self._write_hooks:
+            self._notify_write(addr, 1)
+
+    # ----------------------------------------
+    # Byte / halfword access (little-endian within each word)
+    # ----------------------------------------
+    def load_byte(self, addr: int) -> int:
+        """Load an unsigned byte from any address."""
+        idx = addr // 4
+        _check_index(idx, self._size)
+        return (self._data[idx] >> ((addr & 3) * 8)) & 0xFF
+
+    def load_half(self, addr: int) -> int:
+        """Load an unsigned halfword from a 2-byte aligned address."""
+        _check_aligned(addr, 2)
+        idx = addr // 4
+        _check_index(idx, self._size)
+        return (self._data[idx] >> ((addr & 3) * 8)) & 0xFFFF
+
+    def store_byte(self, addr: int, value: int) -> None:
+        """Store the low 8 bits of value at any address."""
+        self._store_part(addr, value, 0xFF)
+
+    def store_half(self, addr: int, value: int) -> None:
+        """Store the low 16 bits of value at a 2-byte aligned address."""
+        _check_aligned(addr, 2)
+        self._store_part(addr, value, 0xFFFF)
+
+    def _store_part(self, addr: int, value: int, mask: int) -> None:
+        idx = addr // 4
+        _check_index(idx, self._size)
+        shift = (addr & 3) * 8
+        self._data[idx] = (self._data[idx] & ~(mask << shift) & 0xFFFF_FFFF) | (
+            (value & mask) << shift
+        )
+        if self._write_hooks:
+            self._notify_write(addr & ~3, 1)
 
     # ============================================================
     # AI-BEGIN
@@ -76,11 +139,33 @@ class Memory:
                 f"index {start_idx} in memory of size {self._size}"
             )
 
-        for i, w in enumerate(words):
-            self._data[start_idx + i] = _mask32(w)
+        self._data[start_idx:start_idx + len(words)] = [w & 0xFFFF_FFFF for w in words]
+
+        if self._write_hooks:
+            self._notify_write(base_addr, len(words))
     # AI-END
     # ============================================================
 
     def dump_words(self) -> List[int]:
         """Return a full copy of the memory array (useful for debugging)."""
         return list(self._data)
+
+    def fork(self) -> "Memory":
+        """
+        Return an independent copy of this memory (write hooks are not
+        inherited).  Dense memories copy every word; use PagedMemory
+        for copy-on-write forks.
+        """
+        child = object.__new__(type(self))
+        child.__dict__.update(self.__dict__)
+        child._data = self._data[:]
+        child._write_hooks = []
+        return child
+
+    def restore(self, snapshot: "Memory") -> None:
+        """Overwrite this memory with the contents of an earlier fork()."""
+        if snapshot._size != self._size:
+            raise ValueError("Snapshot size does not match this memory")
+        self._data[:] = snapshot._data
+        if self._write_hooks:
+            self._notify_write(0, self._size)
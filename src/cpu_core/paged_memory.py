@@ -0,0 +1,522 @@
+# src/cpu_core/paged_memory.py
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Set, Tuple
+
+from .memory import WriteHook, _check_aligned, _mask32
+
+
+# ----------------------------------------
+# Page geometry
+# ----------------------------------------
+PAGE_SHIFT = 12
+PAGE_SIZE = 1 << PAGE_SHIFT      # 4 KiB
+PAGE_MASK = PAGE_SIZE - 1
+ADDRESS_SPACE = 1 << 32          # full RV32 address range in bytes
+
+_U32 = struct.Struct("<I")
+_U16 = struct.Struct("<H")
+
+# ----------------------------------------
+# File mapping modes
+# ----------------------------------------
+MAP_READONLY = "ro"         # loads only; stores raise ValueError
+MAP_COPY = "cow"            # private copy-on-write; the file never changes
+MAP_WRITEBACK = "writeback" # stores go to the file (see flush())
+
+_ACCESS = {
+    MAP_READONLY: mmap.ACCESS_READ,
+    MAP_COPY: mmap.ACCESS_COPY,
+    MAP_WRITEBACK: mmap.ACCESS_WRITE,
+}
+
+
+# ============================================================
+# AI-BEGIN
+# One file mapped into the simulated address space.  Pages are
+# handed out as page-sized memoryview slices of the mmap, so the
+# OS loads the file lazily and nothing is copied.  A final
+# partial page is the only exception: it is copied into a
+# bytearray (padded with the memory's fill pattern) and written
+# back on flush() in writeback mode.
+# ============================================================
+class MappedRegion:
+    """A file (or part of one) mapped at base_addr in a PagedMemory."""
+
+    def __init__(
+        self,
+        path: str,
+        base_addr: int,
+        mode: str,
+        offset: int = 0,
+        length: Optional[int] = None,
+    ) -> None:
+        if mode not in _ACCESS:
+            raise ValueError(f"Unknown mapping mode: {mode!r}")
+        if offset < 0:
+            raise ValueError("offset must be non-negative")
+
+        with open(path, "r+b" if mode == MAP_WRITEBACK else "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if length is None:
+                length = size - offset
+            if length <= 0 or offset + length > size:
+                raise ValueError(
+                    f"Cannot map {length} bytes at offset {offset} "
+                    f"of {path!r} ({size} bytes)"
+                )
+            # mmap offsets must be multiples of the allocation granularity
+            delta = offset % mmap.ALLOCATIONGRANULARITY
+            self._mm = mmap.mmap(f.fileno(), length + delta,
+                                 access=_ACCESS[mode], offset=offset - delta)
+
+        self.path = path
+        self.base_addr = base_addr
+        self.mode = mode
+        self.length = length
+        self.first_page = base_addr >> PAGE_SHIFT
+        self.end_page = (base_addr + length + PAGE_MASK) >> PAGE_SHIFT
+        self._buf = memoryview(self._mm)[delta:delta + length]
+        self._views: List[memoryview] = []
+        self._tail: Optional[Tuple[bytearray, int, int]] = None
+        self.users = 1          # memories sharing this mapping (see fork)
+
+    def page(self, pn: int, blank: bytes):
+        """Return the buffer backing page pn (which must be in range)."""
+        off = (pn - self.first_page) << PAGE_SHIFT
+        if off + PAGE_SIZE <= self.length:
+            view = self._buf[off:off + PAGE_SIZE]
+            self._views.append(view)
+            return view
+        if self._tail is None:
+            n = self.length - off
+            tail = bytearray(blank)
+            tail[:n] = self._buf[off:]
+            self._tail = (tail, off, n)
+        return self._tail[0]
+
+    def flush(self) -> None:
+        """Write changes back to the file (writeback mode only)."""
+        if self.mode != MAP_WRITEBACK:
+            return
+        if self._tail is not None:
+            tail, off, n = self._tail
+            self._buf[off:off + n] = tail[:n]
+        self._mm.flush()
+
+    def close(self) -> None:
+        """
+        Drop one user; the last one flushes (writeback), releases every
+        page view and unmaps the file.
+        """
+        if self._mm.closed:
+            return
+        self.users -= 1
+        if self.users > 0:
+            return
+        self.flush()
+        for view in self._views:
+            view.release()
+        self._views.clear()
+        self._buf.release()
+        self._mm.close()
+# AI-END
+# ============================================================
+
+
+# ============================================================
+# AI-BEGIN
+# Sparse, byte-addressable memory.  Pages are bytearrays created
+# on the first write; reads of untouched pages come from a shared
+# read-only blank page, so reading never allocates.  The last page
+# used is cached so sequential accesses skip the dict lookup.
+# Word and halfword accesses must be naturally aligned, which also
+# guarantees they never straddle a page boundary.
+# ============================================================
+class PagedMemory:
+    """
+    Byte-addressable little-endian memory with lazy 4 KiB pages.
+
+    Drop-in replacement for Memory (same word API and write hooks),
+    plus byte/halfword access and raw byte ranges.  Memory use grows
+    with the pages actually written, not with size_bytes.
+    """
+
+    def __init__(self, size_bytes: int = ADDRESS_SPACE) -> None:
+        if size_bytes <= 0:
+            raise ValueError("size_bytes must be positive")
+        self._limit = size_bytes
+        self._pages: Dict[int, bytearray] = {}
+        self._blank = bytes(PAGE_SIZE)
+        self._regions: List[MappedRegion] = []
+        self._views: Dict[int, Tuple[object, MappedRegion]] = {}
+        self._write_hooks: List[WriteHook] = []
+        # Copy-on-write bookkeeping: pages in _pages but not in _owned
+        # may be shared with a fork and are copied before the first
+        # store.  Once mappings are shared, stores to cow mappings
+        # also go to private copies.
+        self._owned: Set[int] = set()
+        self._shared_maps = False
+        # Files whose mmap backs pages in _pages (restored checkpoints);
+        # each has close() and a users count like MappedRegion
+        self._backing: List[object] = []
+        self._drop_page_cache()
+
+    def _drop_page_cache(self) -> None:
+        # Separate read/write caches: a read-only mapped page may be
+        # cached for loads but must never be handed out for a store.
+        self._rpn = -1
+        self._rpage = None
+        self._wpn = -1
+        self._wpage = None
+
+    @property
+    def size_bytes(self) -> int:
+        return self._limit
+
+    @property
+    def num_pages(self) -> int:
+        """Number of private pages allocated (mapped file pages excluded)."""
+        return len(self._pages)
+
+    @property
+    def regions(self) -> Tuple[MappedRegion, ...]:
+        """Currently mapped files."""
+        return tuple(self._regions)
+
+    # ----------------------------------------
+    # Page lookup
+    # ----------------------------------------
+    def _check_range(self, addr: int, n: int) -> None:
+        if not (0 <= addr and addr + n <= self._limit):
+            raise IndexError(
+                f"Memory address out of range: 0x{addr:08X} "
+                f"(size=0x{self._limit:X} bytes)"
+            )
+
+    def _read_page(self, addr: int):
+        pn = addr >> PAGE_SHIFT
+        if pn == self._rpn:
+            return self._rpage
+        page = self._pages.get(pn)
+        if page is None:
+            page = self._mapped_page(addr, pn, False) if self._regions else None
+            if page is None:
+                return self._blank      # untouched: read the fill pattern
+        self._rpn = pn
+        self._rpage = page
+        return page
+
+    def _write_page(self, addr: int):
+        pn = addr >> PAGE_SHIFT
+        if pn == self._wpn:
+            return self._wpage
+        page = self._pages.get(pn)
+        if page is not None:
+            if pn not in self._owned:           # shared with a fork
+                page = self._pages[pn] = bytearray(page)
+                self._owned.add(pn)
+        else:
+            page = self._mapped_page(addr, pn, True) if self._regions else None
+            if page is None:
+                page = self._pages[pn] = bytearray(self._blank)
+                self._owned.add(pn)
+            elif self._shared_maps:             # mapping shared with a fork
+                page = self._pages[pn] = bytearray(page)
+                self._owned.add(pn)
+        # The page just written is also the one to read (it may have
+        # replaced a shared page held in the read cache)
+        self._rpn = self._wpn = pn
+        self._rpage = self._wpage = page
+        return page
+
+    def _mapped_page(self, addr: int, pn: int, write: bool):
+        """Buffer for pn if it lies in a mapped file, else None."""
+        entry = self._views.get(pn)
+        if entry is None:
+            for region in self._regions:
+                if region.first_page <= pn < region.end_page:
+                    entry = (region.page(pn, self._blank), region)
+                    self._views[pn] = entry
+                    break
+            else:
+                return None
+        if write and entry[1].mode == MAP_READONLY:
+            raise ValueError(f"Write to read-only mapping at address 0x{addr:08X}")
+        return entry[0]
+
+    # ----------------------------------------
+    # Write hooks (same contract as Memory)
+    # ----------------------------------------
+    def add_write_hook(self, hook: WriteHook) -> None:
+        """Register hook(start_addr, num_words), called after every write."""
+        self._write_hooks.append(hook)
+
+    def remove_write_hook(self, hook: WriteHook) -> None:
+        """Unregister a hook previously added with add_write_hook."""
+        self._write_hooks.remove(hook)
+
+    def _notify_write(self, addr: int, num_words: int) -> None:
+        for hook in self._write_hooks:
+            hook(addr, num_words)
+
+    # ----------------------------------------
+    # Word / halfword / byte access
+    # ----------------------------------------
+    def load_word(self, addr: int) -> int:
+        """Load a 32-bit word from an aligned address."""
+        _check_aligned(addr)
+        self._check_range(addr, 4)
+        return _U32.unpack_from(self._read_page(addr), addr & PAGE_MASK)[0]
+
+    def store_word(self, addr: int, value: int) -> None:
+        """Store a 32-bit word at an aligned address."""
+        _check_aligned(addr)
+        self._check_range(addr, 4)
+        _U32.pack_into(self._write_page(addr), addr & PAGE_MASK, _mask32(value))
+        if self._write_hooks:
+            self._notify_write(addr, 1)
+
+    def load_half(self, addr: int) -> int:
+        """Load an unsigned halfword from a 2-byte aligned address."""
+        _check_aligned(addr, 2)
+        self._check_range(addr, 2)
+        return _U16.unpack_from(self._read_page(addr), addr & PAGE_MASK)[0]
+
+    def store_half(self, addr: int, value: int) -> None:
+        """Store the low 16 bits of value at a 2-byte aligned address."""
+        _check_aligned(addr, 2)
+        self._check_range(addr, 2)
+        _U16.pack_into(self._write_page(addr), addr & PAGE_MASK, value & 0xFFFF)
+        if self._write_hooks:
+            self._notify_write(addr & ~3, 1)
+
+    def load_byte(self, addr: int) -> int:
+        """Load an unsigned byte from any address."""
+        self._check_range(addr, 1)
+        return self._read_page(addr)[addr & PAGE_MASK]
+
+    def store_byte(self, addr: int, value: int) -> None:
+        """Store the low 8 bits of value at any address."""
+        self._check_range(addr, 1)
+        self._write_page(addr)[addr & PAGE_MASK] = value & 0xFF
+        if self._write_hooks:
+            self._notify_write(addr & ~3, 1)
+
+    # ----------------------------------------
+    # Byte ranges (may cross pages)
+    # ----------------------------------------
+    def read_bytes(self, addr: int, n: int) -> bytes:
+        """Return n bytes starting at addr."""
+        self._check_range(addr, n)
+        out = bytearray()
+        while n > 0:
+            off = addr & PAGE_MASK
+            chunk = min(n, PAGE_SIZE - off)
+            out += self._read_page(addr)[off:off + chunk]
+            addr += chunk
+            n -= chunk
+        return bytes(out)
+
+    def write_bytes(self, addr: int, data: bytes) -> None:
+        """Copy data into memory starting at addr."""
+        self._check_range(addr, len(data))
+        view = memoryview(data)
+        pos = 0
+        while pos < len(view):
+            off = (addr + pos) & PAGE_MASK
+            chunk = min(len(view) - pos, PAGE_SIZE - off)
+            self._write_page(addr + pos)[off:off + chunk] = view[pos:pos + chunk]
+            pos += chunk
+        if self._write_hooks and data:
+            start = addr & ~3
+            self._notify_write(start, (addr + len(data) + 3 - start) // 4)
+
+    def zero_bytes(self, addr: int, n: int) -> None:
+        """
+        Set n bytes from addr to zero.  Whole pages that are untouched
+        (and read as zero) are skipped, so zeroing a large range such
+        as an ELF .bss allocates nothing.
+        """
+        self._check_range(addr, n)
+        end = addr + n
+        blank_is_zero = not any(self._blank)
+        pos = addr
+        while pos < end:
+            off = pos & PAGE_MASK
+            chunk = min(end - pos, PAGE_SIZE - off)
+            pn = pos >> PAGE_SHIFT
+            untouched = pn not in self._pages and (
+                not self._regions or self._mapped_page(pos, pn, False) is None)
+            if not (untouched and blank_is_zero):
+                self._write_page(pos)[off:off + chunk] = bytes(chunk)
+            pos += chunk
+        if self._write_hooks and n:
+            start = addr & ~3
+            self._notify_write(start, (end + 3 - start) // 4)
+
+    # ----------------------------------------
+    # Memory-compatible bulk helpers
+    # ----------------------------------------
+    def load_program(self, words: List[int], base_addr: int = 0) -> None:
+        """Load a list of 32-bit words into memory starting at base_addr."""
+        _check_aligned(base_addr)
+        if base_addr + 4 * len(words) > self._limit:
+            raise IndexError(
+                f"Program of {len(words)} words does not fit starting at "
+                f"address 0x{base_addr:08X} in memory of 0x{self._limit:X} bytes"
+            )
+        data = struct.pack(f"<{len(words)}I", *(_mask32(w) for w in words))
+        self.write_bytes(base_addr, data)
+
+    def reset(self, value: int = 0) -> None:
+        """
+        Forget every page and unmap every file; all memory then reads
+        as the repeated value.
+        """
+        for region in list(self._regions):
+            self.unmap(region)
+        self._pages.clear()
+        self._owned.clear()
+        self._drop_page_cache()
+        self._blank = _U32.pack(_mask32(value)) * (PAGE_SIZE // 4)
+        if self._write_hooks:
+            self._notify_write(0, self._limit // 4)
+
+    def dump_words(self, addr: int = 0, num_words: Optional[int] = None) -> List[int]:
+        """
+        Return num_words words starting at addr.  Without arguments the
+        whole memory is returned, so only do that for small sizes.
+        """
+        if num_words is None:
+            num_words = (self._limit - addr) // 4
+        _check_aligned(addr)
+        raw = self.read_bytes(addr, 4 * num_words)
+        return list(struct.unpack(f"<{num_words}I", raw))
+
+    # ----------------------------------------
+    # Memory-mapped files
+    # ----------------------------------------
+    def map_file(
+        self,
+        path: str,
+        base_addr: int,
+        mode: str = MAP_COPY,
+        offset: int = 0,
+        length: Optional[int] = None,
+    ) -> MappedRegion:
+        """
+        Map length bytes of a file (from offset; default: the rest of
+        it) at the page-aligned base_addr.  The OS pages the file in on
+        demand.  Private pages already written in that range are
+        discarded.
+        """
+        if base_addr % PAGE_SIZE:
+            raise ValueError(f"Mapping base 0x{base_addr:08X} is not page-aligned")
+        region = MappedRegion(path, base_addr, mode, offset, length)
+        if base_addr + region.length > self._limit:
+            region.close()
+            raise IndexError(
+                f"Mapping of {region.length} bytes at 0x{base_addr:08X} does not "
+                f"fit in memory of 0x{self._limit:X} bytes"
+            )
+        for other in self._regions:
+            if region.first_page < other.end_page and other.first_page < region.end_page:
+                region.close()
+                raise ValueError(
+                    f"Mapping at 0x{base_addr:08X} overlaps {other.path!r} "
+                    f"at 0x{other.base_addr:08X}"
+                )
+
+        for pn in range(region.first_page, region.end_page):
+            self._pages.pop(pn, None)
+            self._owned.discard(pn)
+        self._regions.append(region)
+        self._drop_page_cache()
+        if self._write_hooks:
+            self._notify_write(base_addr, (region.length + 3) // 4)
+        return region
+
+    def unmap(self, region: MappedRegion) -> None:
+        """Remove a mapping (flushing it first in writeback mode)."""
+        self._regions.remove(region)
+        for pn in range(region.first_page, region.end_page):
+            self._views.pop(pn, None)
+        self._drop_page_cache()
+        region.close()
+        if self._write_hooks:
+            self._notify_write(region.base_addr, (region.length + 3) // 4)
+
+    def flush(self) -> None:
+        """Write back every writeback-mode mapping."""
+        for region in self._regions:
+            region.flush()
+
+    def close(self) -> None:
+        """
+        Unmap every file.  Pages still viewing a restored checkpoint
+        are copied first, so the memory stays usable.
+        """
+        for region in list(self._regions):
+            self.unmap(region)
+        if self._backing:
+            for pn, page in self._pages.items():
+                if isinstance(page, memoryview):
+                    self._pages[pn] = bytes(page)
+            self._drop_page_cache()
+            for backing in self._backing:
+                backing.close()
+            self._backing.clear()
+
+    # ----------------------------------------
+    # Copy-on-write fork
+    # ----------------------------------------
+    def fork(self) -> "PagedMemory":
+        """
+        Return a copy that shares every page with this memory until
+        either side writes to it.  Costs one dict copy of the page
+        table (O(pages touched)); no page contents are copied.
+        Write hooks are not inherited.
+        """
+        if any(r.mode == MAP_WRITEBACK for r in self._regions):
+            raise ValueError("Cannot fork a memory with writeback mappings")
+
+        child = PagedMemory.__new__(PagedMemory)
+        child._limit = self._limit
+        child._pages = dict(self._pages)
+        child._blank = self._blank
+        child._regions = list(self._regions)
+        child._views = dict(self._views)
+        child._write_hooks = []
+        child._owned = set()
+        child._shared_maps = bool(self._regions)
+        child._backing = list(self._backing)
+        child._drop_page_cache()
+        for shared in self._regions + self._backing:
+            shared.users += 1
+
+        # Every existing page is now shared: copy before the next store
+        self._owned = set()
+        self._shared_maps = self._shared_maps or bool(self._regions)
+        self._drop_page_cache()
+        return child
+
+    def restore(self, snapshot: "PagedMemory") -> None:
+        """
+        Make this memory equal to an earlier fork() of it.  Pages are
+        shared with the snapshot (copy-on-write), so this costs one
+        page-table copy and leaves the snapshot reusable.
+        """
+        if snapshot._limit != self._limit or snapshot._regions != self._regions:
+            raise ValueError("Snapshot does not match this memory's size and mappings")
+        self._pages = dict(snapshot._pages)
+        self._views = dict(snapshot._views)
+        self._blank = snapshot._blank
+        self._owned = set()
+        self._shared_maps = self._shared_maps or bool(self._regions)
+        self._drop_page_cache()
+        if self._write_hooks:
+            self._notify_write(0, self._limit // 4)
+# AI-END
+# ============================================================
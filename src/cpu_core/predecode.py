@@ -0,0 +1,107 @@
+# src/cpu_core/predecode.py
+from typing import Dict, NamedTuple
+
+from .isa import (
+    DecodedInstr,
+    decode,
+    OPCODES,
+    imm_i,
+    imm_s,
+    imm_b,
+    imm_u,
+    imm_j,
+)
+from .memory import Memory
+from .control import ControlSignals, control_for_word
+
+
+# ----------------------------------------
+# Everything the datapath needs from one IMEM word
+# ----------------------------------------
+class PredecodedInstr(NamedTuple):
+    di: DecodedInstr
+    ctrl: ControlSignals
+    imm: int
+
+
+def predecode_word(instr_word: int) -> PredecodedInstr:
+    """Decode fields, control signals and immediate for one instruction."""
+    di = decode(instr_word)
+    ctrl = control_for_word(instr_word)
+
+    # Immediate generation (based on opcode type)
+    opc = di.opcode
+    imm = 0
+    if opc in (OPCODES["OP_IMM"], OPCODES["LOAD"], OPCODES["JALR"]):
+        imm = imm_i(instr_word)
+    elif opc == OPCODES["STORE"]:
+        imm = imm_s(instr_word)
+    elif opc == OPCODES["BRANCH"]:
+        imm = imm_b(instr_word)
+    elif opc in (OPCODES["LUI"], OPCODES["AUIPC"]):
+        imm = imm_u(instr_word)
+    elif opc == OPCODES["JAL"]:
+        imm = imm_j(instr_word)
+
+    return PredecodedInstr(di, ctrl, imm)
+
+
+# ============================================================
+# AI-BEGIN
+# Predecode cache: one PredecodedInstr per fetched PC.
+# Entries are dropped whenever the backing IMEM word is written,
+# so self-modifying code and program reloads stay correct.
+# ============================================================
+class PredecodeCache:
+    """
+    PC-keyed cache of predecoded instructions for one IMEM.
+
+    The cache registers a write hook on the memory it decodes from;
+    any store_word / load_program / reset touching a cached word
+    invalidates that entry.
+    """
+
+    # Above this many words a write just clears the whole cache
+    _BULK_INVALIDATE = 64
+
+    def __init__(self, imem: Memory) -> None:
+        self._imem = imem
+        self._entries: Dict[int, PredecodedInstr] = {}
+        self.misses = 0
+        self.invalidations = 0
+        imem.add_write_hook(self.invalidate)
+
+    def lookup(self, pc: int) -> PredecodedInstr:
+        """Return the predecoded instruction at pc, decoding it on a miss."""
+        entry = self._entries.get(pc)
+        if entry is None:
+            # Fetch through IMEM so alignment/bounds errors still surface
+            entry = predecode_word(self._imem.load_word(pc))
+            self._entries[pc] = entry
+            self.misses += 1
+        return entry
+
+    def invalidate(self, addr: int, num_words: int) -> None:
+        """Drop cached entries for num_words words starting at addr."""
+        if not self._entries:
+            return
+        self.invalidations += 1
+        if num_words > self._BULK_INVALIDATE:
+            self._entries.clear()
+            return
+        for i in range(num_words):
+            self._entries.pop(addr + 4 * i, None)
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self._entries.clear()
+
+    def detach(self) -> None:
+        """Stop tracking writes to IMEM (call before discarding the cache)."""
+        self._imem.remove_write_hook(self.invalidate)
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+# AI-END
+# ============================================================
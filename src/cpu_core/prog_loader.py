@@ -1,67 +1,190 @@
-from typing import List
+import sys
+from array import array
+from typing import Iterator, List, Optional
 
 # ----------------------------------------
 # Load program from a .hex text file
 # Each line represents one 32-bit instruction word.
 # ----------------------------------------
-def load_prog_hex(path: str) -> List[int]:
+def _parse_line(line: str, lineno: int):
     """
-    Read a hex program file and return a list of 32-bit words.
-    Handles comments, blank lines, optional '0x' prefixes,
-    and underscores for readability.
+    Parse one line of a hex file: the 32-bit word it holds, or None
+    for blank and comment-only lines.
     """
-    words: List[int] = []
+    text = line.strip()
 
-    with open(path, "r") as f:
-        for lineno, line in enumerate(f, start=1):
-            text = line.strip()
+    # Skip empty lines early
+    if not text:
+        return None
 
-            # Skip empty lines early
-            if not text:
-                continue
+    # ----------------------------------------
+    # Remove inline comments (supports '#' and '//')
+    # ----------------------------------------
+    if "#" in text:
+        text = text.split("#", 1)[0].strip()
+    if "//" in text:
+        text = text.split("//", 1)[0].strip()
 
-            # ----------------------------------------
-            # Remove inline comments (supports '#' and '//')
-            # ----------------------------------------
-            if "#" in text:
-                text = text.split("#", 1)[0].strip()
-            if "//" in text:
-                text = text.split("//", 1)[0].strip()
+    if not text:
+        return None  # line was only a comment
 
-            if not text:
-                continue  # line was only a comment
+    # ----------------------------------------
+    # Clean optional hex formatting
+    # ----------------------------------------
 
-            # ----------------------------------------
-            # Clean optional hex formatting
-            # ----------------------------------------
+    # Remove 0x prefix
+    if text.startswith("0x") or text.startswith("0X"):
+        text = text[2:]
 
-            # Remove 0x prefix
-            if text.startswith("0x") or text.startswith("0X"):
-                text = text[2:]
+    # Remove underscores like "0000_0000"
+    text = text.replace("_", "")
 
-            # Remove underscores like "0000_0000"
-            text = text.replace("_", "")
+    if not text:
+        return None
+
+    # ============================================================
+    # AI-BEGIN
+    # Difficult section: robust hex parsing from arbitrary text.
+    # Must detect invalid characters and provide helpful errors
+    # with line numbers to assist debugging.
+    # ============================================================
+    try:
+        value = int(text, 16)
+    except ValueError as e:
+        raise ValueError(
+            f"Invalid hex value on line {lineno}: {line!r}"
+        ) from e
+    # AI-END
+    # ============================================================
+
+    # Force into 32-bit word range
+    return value & 0xFFFF_FFFF
+
+
+# ----------------------------------------
+# Chunked parsing
+# ----------------------------------------
+CHUNK_SIZE = 1 << 20         # bytes read per chunk
+
+# Bytes a "clean" chunk may contain: hex digits and whitespace only
+_CLEAN = b"0123456789abcdefABCDEF \t\r\n"
+
+
+# ============================================================
+# AI-BEGIN
+# Chunked parsing.  The file is read in large binary chunks cut at
+# a line break.  Comments, 0x prefixes (at the start of a line) and
+# underscores are removed from the whole chunk with bytes methods
+# that run in C.  If what is left is only hex digits and whitespace,
+# one token per line (checked with bytes.translate and by comparing
+# token counts with and without blanks), it cannot hold an error
+# and is converted in bulk: a single bytes.fromhex over the joined
+# tokens when every token is a full 8-digit word, otherwise
+# int(token, 16) per token.  Any other chunk is parsed line by line
+# with exactly the rules (and error messages, with file line
+# numbers) of the original loader.
+# ============================================================
+def _bulk_words(chunk: bytes) -> Optional[array]:
+    """Words of a chunk that needs no per-line handling, else None."""
+    if chunk.translate(None, _CLEAN):
+        for marker in (b"#", b"//"):
+            if marker in chunk:
+                chunk = b"\n".join([line.partition(marker)[0] for line in chunk.split(b"\n")])
+        if b"x" in chunk or b"X" in chunk:
+            chunk = (b"\n" + chunk).replace(b"\n0x", b"\n").replace(b"\n0X", b"\n")
+        chunk = chunk.replace(b"_", b"")
+        if chunk.translate(None, _CLEAN):
+            return None                 # indented prefix, bad digit, ...
+
+    tokens = chunk.split()
+    if b" " in chunk or b"\t" in chunk:
+        if len(chunk.replace(b" ", b"").replace(b"\t", b"").split()) != len(tokens):
+            return None                 # a line holds more than one token
+
+    words = array("I")
+    if set(map(len, tokens)) <= {8}:
+        words.frombytes(bytes.fromhex(b"".join(tokens).decode("ascii")))
+        if sys.byteorder == "little":
+            words.byteswap()            # hex text is most-significant byte first
+    else:
+        words.extend([int(t, 16) & 0xFFFF_FFFF for t in tokens])
+    return words
 
-            if not text:
-                continue
 
-            # ============================================================
-            # AI-BEGIN
-            # Difficult section: robust hex parsing from arbitrary text.
-            # Must detect invalid characters and provide helpful errors
-            # with line numbers to assist debugging.
-            # ============================================================
-            try:
-                value = int(text, 16)
-            except ValueError as e:
-                raise ValueError(
-                    f"Invalid hex value on line {lineno}: {line!r}"
-                ) from e
-            # AI-END
-            # ============================================================
-
-            # Force into 32-bit word range
-            value &= 0xFFFF_FFFF
+def _parse_chunk(chunk: bytes, first_lineno: int) -> array:
+    words = _bulk_words(chunk)
+    if words is not None:
+        return words
+
+    words = array("I")
+    text = chunk.decode("utf-8", "replace").replace("\r\n", "\n")
+    lines = text.split("\n")
+    last = len(lines) - 1
+    for k, line in enumerate(lines):
+        if k < last:
+            line += "\n"               # keep the newline for error messages
+        value = _parse_line(line, first_lineno + k)
+        if value is not None:
             words.append(value)
+    return words
+
+
+def iter_hex_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[array]:
+    """Yield the words of a hex program file as array('I') chunks."""
+    lineno = 1
+    rest = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            block = rest + block
+            cut = block.rfind(b"\n") + 1
+            if cut == 0:                # no complete line yet
+                rest = block
+                continue
+            chunk, rest = block[:cut], block[cut:]
+            yield _parse_chunk(chunk, lineno)
+            lineno += chunk.count(b"\n")
+    if rest:
+        yield _parse_chunk(rest, lineno)
+# AI-END
+# ============================================================
 
+
+def _store_words(mem, addr: int, words: array) -> None:
+    """Bulk-store one chunk: raw bytes for PagedMemory, words otherwise."""
+    write_bytes = getattr(mem, "write_bytes", None)
+    if write_bytes is None:
+        mem.load_program(words, addr)
+        return
+    if sys.byteorder == "big":
+        words = array("I", words)
+        words.byteswap()
+    write_bytes(addr, words.tobytes())
+
+
+def load_hex_into(path: str, mem, base_addr: int = 0, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Stream a hex program file straight into mem starting at base_addr,
+    one chunk at a time (no list of the whole program is built).
+    Returns the number of words loaded.
+    """
+    addr = base_addr
+    for words in iter_hex_chunks(path, chunk_size):
+        if words:
+            _store_words(mem, addr, words)
+            addr += 4 * len(words)
+    return (addr - base_addr) // 4
+
+
+def load_prog_hex(path: str) -> List[int]:
+    """
+    Read a hex program file and return a list of 32-bit words.
+    Handles comments, blank lines, optional '0x' prefixes,
+    and underscores for readability.
+    """
+    words: List[int] = []
+    for chunk in iter_hex_chunks(path):
+        words.extend(chunk)
     return words
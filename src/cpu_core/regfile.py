@@ -31,7 +31,10 @@ class RegFile:
 
     • x0 is permanently zero (writes to x0 are ignored)
     • All other registers store 32-bit values
-    • Internally, we use a Python list for simplicity
+    • Internally, we use a fixed 32-entry Python list (faster to
+      index than array('I'), which boxes an int on every read)
+    • read/write validate their arguments for external callers;
+      read_unchecked/write_unchecked are the datapath's fast path
     """
 
     def __init__(self) -> None:
@@ -84,6 +87,25 @@ class RegFile:
 
         self._regs[idx] = _mask32(value)
 
+    # ============================================================
+    # AI-BEGIN
+    # Trusted fast path for the datapath.  The indices come from
+    # 5-bit instruction fields and the values from 32-bit datapath
+    # results, so the range check and masking above are skipped.
+    # Every stored value is already masked, so reads need no mask.
+    # x0 is still protected: it is never written.
+    # ============================================================
+    def read_unchecked(self, idx: int) -> int:
+        """Read x[idx]; idx must be 0–31 (no validation)."""
+        return self._regs[idx]
+
+    def write_unchecked(self, idx: int, value: int) -> None:
+        """Write a 32-bit value to x[idx]; idx must be 0–31 (no validation)."""
+        if idx:
+            self._regs[idx] = value
+    # AI-END
+    # ============================================================
+
     # --------------------------------------------------------
     # Debugging helper
     # --------------------------------------------------------
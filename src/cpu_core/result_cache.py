@@ -0,0 +1,203 @@
+# src/cpu_core/result_cache.py
+import hashlib
+import os
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple
+
+from .datapath import CPU, StopConditions, StopInfo
+from .image_cache import LruDirectory, DEFAULT_MAX_BYTES, cache_home
+from .regfile import NUM_REGS
+
+
+# ----------------------------------------
+# Record format (all fields little-endian)
+#
+#   header   magic, version, flags, pc, cycle, steps, stop reason,
+#            SHA-256 of the final DMEM
+#   regs     32 × u32
+#   dmem     (FLAG_DMEM only) word count, then the zlib-compressed
+#            DMEM words
+# ----------------------------------------
+MAGIC = b"RVRES\x00\x00\x01"
+VERSION = 1
+
+FLAG_DMEM = 1 << 0          # the full final DMEM is stored
+
+_HEADER = struct.Struct("<8sHHIQQ16s32s")
+_REGS = struct.Struct(f"<{NUM_REGS}I")
+_COUNT = struct.Struct("<I")
+_ZLIB_LEVEL = 1
+
+RESULT_SUFFIX = ".rvres"
+ENV_DIR = "RVSIM_RESULT_CACHE"
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def _words_bytes(words: Sequence[int]) -> bytes:
+    data = array("I", words)
+    if _BIG_ENDIAN:
+        data.byteswap()
+    return data.tobytes()
+
+
+def dmem_digest(words: Sequence[int]) -> str:
+    """SHA-256 of the little-endian DMEM image (hex string)."""
+    return hashlib.sha256(_words_bytes(words)).hexdigest()
+
+
+def default_directory() -> str:
+    """$RVSIM_RESULT_CACHE, else <XDG cache dir>/rv-sim/results."""
+    return os.environ.get(ENV_DIR) or os.path.join(cache_home(), "results")
+
+
+def run_key(
+    prog_words: Sequence[int],
+    imem_words: int,
+    dmem_words: int,
+    max_steps: int,
+    pc_reset: int,
+    stop: Optional[StopConditions],
+) -> Optional[str]:
+    """
+    Hash of everything a fresh run depends on, or None when the run
+    is not reproducible (a wall-clock time budget is set).
+    """
+    if stop is not None and stop.time_budget is not None:
+        return None
+    if stop is None:
+        halts = "none"
+    else:
+        halts = (f"{stop.halt_on_ebreak:d}{stop.halt_on_ecall:d}"
+                 f"{stop.halt_on_self_loop:d}:{stop.target_pc}")
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"rvres-{VERSION}:{imem_words}:{dmem_words}:{max_steps}:"
+             f"{pc_reset}:{halts}\0".encode())
+    h.update(_words_bytes(prog_words))
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class RunRecord:
+    """Final architectural state of one run, as stored in the cache."""
+    pc: int
+    regs: Tuple[int, ...]
+    cycle: int
+    stop: StopInfo
+    dmem_digest: str
+    dmem: Optional[array] = None        # full final DMEM, if stored
+
+    @classmethod
+    def from_cpu(cls, cpu: CPU, with_dmem: bool = True) -> "RunRecord":
+        words = cpu.dmem.dump_words()
+        return cls(
+            pc=cpu.pc,
+            regs=tuple(cpu.regs.dump()),
+            cycle=cpu.cycle,
+            stop=cpu.last_stop,
+            dmem_digest=dmem_digest(words),
+            dmem=array("I", words) if with_dmem else None,
+        )
+
+    def apply(self, cpu: CPU) -> None:
+        """Put a freshly built CPU into the recorded final state."""
+        cpu.pc = self.pc
+        cpu.regs._regs[:] = self.regs
+        cpu.cycle = self.cycle
+        cpu.last_stop = self.stop
+        if self.dmem is not None:
+            cpu.dmem.load_program(self.dmem)
+
+
+# ============================================================
+# AI-BEGIN
+# Record encoding.  The header and registers are fixed-size
+# structs; the DMEM (when kept) is zlib-compressed at a fast
+# level, since most of a data memory is usually still zero.  A
+# record that fails to decode is reported as a miss.
+# ============================================================
+def _encode(rec: RunRecord):
+    flags = FLAG_DMEM if rec.dmem is not None else 0
+    parts = [
+        _HEADER.pack(MAGIC, VERSION, flags, rec.pc, rec.cycle, rec.stop.steps,
+                     rec.stop.reason.encode(), bytes.fromhex(rec.dmem_digest)),
+        _REGS.pack(*rec.regs),
+    ]
+    if rec.dmem is not None:
+        parts.append(_COUNT.pack(len(rec.dmem)))
+        parts.append(zlib.compress(_words_bytes(rec.dmem), _ZLIB_LEVEL))
+    return parts
+
+
+def _decode(data: bytes) -> Optional[RunRecord]:
+    if len(data) < _HEADER.size + _REGS.size:
+        return None
+    magic, version, flags, pc, cycle, steps, reason, digest = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    regs = _REGS.unpack_from(data, _HEADER.size)
+
+    dmem = None
+    if flags & FLAG_DMEM:
+        pos = _HEADER.size + _REGS.size
+        try:
+            (count,) = _COUNT.unpack_from(data, pos)
+            raw = zlib.decompress(data[pos + _COUNT.size:])
+        except (struct.error, zlib.error):
+            return None
+        if len(raw) != 4 * count:
+            return None
+        dmem = array("I")
+        dmem.frombytes(raw)
+        if _BIG_ENDIAN:
+            dmem.byteswap()
+
+    stop = StopInfo(reason.rstrip(b"\0").decode(), steps, pc)
+    return RunRecord(pc, regs, cycle, stop, digest.hex(), dmem)
+# AI-END
+# ============================================================
+
+
+class ResultCache(LruDirectory):
+    """
+    On-disk memo of finished runs, keyed by run_key(), with LRU
+    eviction (see image_cache.LruDirectory).  With store_dmem=False
+    only the DMEM digest is kept: enough for batch results, but
+    run_program needs the full DMEM to rebuild its CPU and treats
+    such records as misses.
+    """
+    suffix = RESULT_SUFFIX
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES, store_dmem: bool = True):
+        super().__init__(directory or default_directory(), max_bytes)
+        self.store_dmem = store_dmem
+
+    def get(self, key: Optional[str], need_dmem: bool = False) -> Optional[RunRecord]:
+        """Recorded result for key, or None (counted as a miss)."""
+        rec = None
+        if key is not None:
+            path = self.path_for(key)
+            try:
+                with open(path, "rb") as f:
+                    rec = _decode(f.read())
+            except OSError:
+                pass
+        if rec is None or (need_dmem and rec.dmem is None):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.touch(path)
+        return rec
+
+    def put(self, key: Optional[str], cpu: CPU) -> Optional[RunRecord]:
+        """Record the final state of cpu under key (no-op for key None)."""
+        if key is None:
+            return None
+        rec = RunRecord.from_cpu(cpu, with_dmem=self.store_dmem)
+        self._store(self.path_for(key), _encode(rec))
+        return rec
@@ -1,49 +1,157 @@
 # src/cpu_core/run_cpu.py
+import argparse
 import sys
-from typing import Optional
+from typing import List, Optional
 
-from .prog_loader import load_prog_hex
 from .memory import Memory
-from .datapath import CPU
+from .paged_memory import PagedMemory
+from .elf_loader import is_elf, load_elf
+from .datapath import CPU, StopConditions
+from .checkpoint import latest_checkpoint, load_checkpoint, run_with_checkpoints
+from .syscalls import SyscallHandler
+from .image_cache import ImageCache, load_prog_hex_cached
+from .result_cache import ResultCache, run_key
 
 
 # ------------------------------------------------------------
-# Program Runner Helper
+# Program Runner Helpers
 # ------------------------------------------------------------
-def run_program(
-    hex_path: str,
+def build_cpu(
+    prog_words: List[int],
     imem_words: int = 1024,
     dmem_words: int = 1024,
-    max_steps: int = 10_000,
     pc_reset: int = 0,
+    fuse: bool = False,
+    paged: bool = False,
 ) -> CPU:
     """
-    Load a program from a .hex file into instruction memory,
-    create a CPU, and run it for max_steps cycles.
+    Create fresh memories, load prog_words at address 0 and return the CPU.
 
-    Returns the CPU instance so callers/tests can inspect state.
+    paged=True uses PagedMemory of the same sizes instead of dense
+    Memory, so CPU.fork() and time-travel snapshots share pages
+    copy-on-write rather than copying every word.
     """
 
-    # Load program instructions as 32-bit words from the hex file
-    prog_words = load_prog_hex(hex_path)
-
     # Create instruction memory (imem) and data memory (dmem)
     # Both are word-addressable and store 32-bit values.
-    imem = Memory(imem_words)
-    dmem = Memory(dmem_words)
+    if paged:
+        imem = PagedMemory(4 * imem_words)
+        dmem = PagedMemory(4 * dmem_words)
+    else:
+        imem = Memory(imem_words)
+        dmem = Memory(dmem_words)
 
     # Load program into instruction memory at address 0
     imem.load_program(prog_words, base_addr=0)
 
     # Create CPU and reset its program counter
-    cpu = CPU(imem=imem, dmem=dmem, pc_reset=pc_reset)
+    return CPU(imem=imem, dmem=dmem, pc_reset=pc_reset, fuse=fuse)
+
+
+STACK_TOP = 0x7FFF_FFF0   # initial sp for ELF programs (see PagedMemory)
+
+
+def build_cpu_from_elf(elf_path: str, fuse: bool = False) -> CPU:
+    """
+    Load an ELF program into one sparse PagedMemory (used as both IMEM
+    and DMEM), start at its entry point and point sp at STACK_TOP.
+    """
+    mem = PagedMemory()
+    image = load_elf(elf_path, mem)
+    cpu = CPU(imem=mem, dmem=mem, pc_reset=image.entry, fuse=fuse)
+    cpu.regs.write(2, STACK_TOP)
+    return cpu
+
+
+def run_words(
+    prog_words: List[int],
+    imem_words: int = 1024,
+    dmem_words: int = 1024,
+    max_steps: int = 10_000,
+    pc_reset: int = 0,
+    stop: Optional[StopConditions] = StopConditions(),
+    fuse: bool = False,
+    results: Optional[ResultCache] = None,
+    paged: bool = False,
+) -> CPU:
+    """
+    Same as run_program, but for a program already held as a list of
+    32-bit words (loaded at address 0).
+    """
+    # A memoized run is rebuilt from its record without simulating
+    # (fused runs are not memoized: their statistics are not stored)
+    key = None
+    if results is not None:
+        key = None if fuse else run_key(prog_words, imem_words, dmem_words,
+                                        max_steps, pc_reset, stop)
+        rec = results.get(key, need_dmem=True)
+        if rec is not None:
+            cpu = build_cpu(prog_words, imem_words, dmem_words, pc_reset, paged=paged)
+            rec.apply(cpu)
+            return cpu
+
+    cpu = build_cpu(prog_words, imem_words, dmem_words, pc_reset, fuse, paged)
 
     # Run the CPU for at most max_steps instructions
-    cpu.run(max_steps=max_steps)
+    cpu.run(max_steps=max_steps, stop=stop)
 
+    if results is not None:
+        results.put(key, cpu)
     return cpu
 
 
+def run_program(
+    hex_path: str,
+    imem_words: int = 1024,
+    dmem_words: int = 1024,
+    max_steps: int = 10_000,
+    pc_reset: int = 0,
+    stop: Optional[StopConditions] = StopConditions(),
+    fuse: bool = False,
+    cache=True,
+    results: Optional[ResultCache] = None,
+    paged: bool = False,
+) -> CPU:
+    """
+    Load a program from a .hex file into instruction memory,
+    create a CPU, and run it for up to max_steps cycles.
+
+    By default the run ends early on EBREAK/ECALL or a self-loop such
+    as 'jal x0, 0'; pass stop=None to always use the full budget.
+    The reason is available as cpu.last_stop.  fuse=True enables
+    macro-op fusion (statistics in cpu.fusion).
+
+    The parsed words come from the on-disk image cache (see
+    image_cache.py) when possible; cache=False always re-parses the
+    text, and an ImageCache instance selects a specific cache.
+
+    With a ResultCache (opt-in), a run already recorded for the same
+    image, pc_reset, memory sizes, max_steps and stop conditions is
+    returned without simulating; runs with a time budget are never
+    memoized.
+
+    paged=True builds the memories as PagedMemory (see build_cpu),
+    for callers that fork the returned CPU.
+
+    Returns the CPU instance so callers/tests can inspect state.
+    """
+
+    # Load program instructions as 32-bit words from the hex file
+    prog_words = load_prog_hex_cached(hex_path, cache)
+
+    return run_words(
+        prog_words,
+        imem_words=imem_words,
+        dmem_words=dmem_words,
+        max_steps=max_steps,
+        pc_reset=pc_reset,
+        stop=stop,
+        fuse=fuse,
+        results=results,
+        paged=paged,
+    )
+
+
 # ------------------------------------------------------------
 # Pretty-print final CPU state for humans
 # ------------------------------------------------------------
@@ -63,39 +171,137 @@ def _print_summary(cpu: CPU) -> None:
         print(f"  {label} = 0x{val:08X}")
 
     print(f"Total cycles: {cpu.cycle}")
+    if cpu.last_stop is not None:
+        print(f"Stop reason: {cpu.last_stop.reason}")
+    if cpu.exit_code is not None:
+        print(f"Exit code: {cpu.exit_code}")
+    if cpu.fusion is not None:
+        kinds = ", ".join(f"{k}={v}" for k, v in sorted(cpu.fusion.executed.items()))
+        print(f"Fused pairs: {cpu.fusion.fused_count}" + (f" ({kinds})" if kinds else ""))
 
 
 # ------------------------------------------------------------
 # Command-line entry point
 # ------------------------------------------------------------
+def _parse_int(text: str) -> int:
+    """Accept decimal or 0x-prefixed integers on the command line."""
+    return int(text, 0)
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cpu_core.run_cpu",
+        description="Run an RV32I .hex or ELF program and print the final CPU state.",
+    )
+    parser.add_argument("hex_path", help="path to the .hex (or ELF) program")
+    parser.add_argument("max_steps", nargs="?", type=_parse_int,
+                        default=10_000, help="step budget (default 10000)")
+    parser.add_argument("--no-halt", action="store_true",
+                        help="ignore EBREAK/ECALL/self-loops and use the full budget")
+    parser.add_argument("--target-pc", type=_parse_int, default=None,
+                        help="stop when the PC reaches this address")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="wall-clock budget in seconds")
+    parser.add_argument("--fuse", action="store_true",
+                        help="enable macro-op fusion and report fused pairs")
+    parser.add_argument("--checkpoint-dir", default=None,
+                        help="directory for checkpoints (see --checkpoint-every, --resume)")
+    parser.add_argument("--checkpoint-every", type=_parse_int, default=None,
+                        help="write a checkpoint every N instructions")
+    parser.add_argument("--keep-checkpoints", type=int, default=2,
+                        help="how many of the newest checkpoints to keep (default 2)")
+    parser.add_argument("--compress", action="store_true",
+                        help="zlib-compress checkpoint pages")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue from the latest checkpoint in --checkpoint-dir; "
+                             "max_steps still counts from cycle 0")
+    parser.add_argument("--syscalls", action="store_true",
+                        help="service ECALLs (exit/write/read/brk/clock_gettime) on the "
+                             "host; the guest's exit status becomes the process status")
+    parser.add_argument("--no-image-cache", action="store_true",
+                        help="always re-parse the .hex text (skip the parsed-image cache)")
+    parser.add_argument("--image-cache-dir", default=None,
+                        help="directory of the parsed-image cache "
+                             "(default $RVSIM_IMAGE_CACHE or ~/.cache/rv-sim/images)")
+    parser.add_argument("--result-cache", nargs="?", const="", default=None, metavar="DIR",
+                        help="memoize the final state of plain .hex runs (default "
+                             "$RVSIM_RESULT_CACHE or ~/.cache/rv-sim/results); "
+                             "a repeated run is answered without simulating")
+    return parser
+
+
 def main(argv: Optional[list[str]] = None) -> int:
     """
     CLI usage:
-      python -m src.cpu_core.run_cpu path/to/prog.hex [max_steps]
+      python -m src.cpu_core.run_cpu path/to/prog.hex|prog.elf [max_steps]
+          [--no-halt] [--target-pc ADDR] [--timeout SECONDS] [--fuse]
+          [--checkpoint-dir DIR [--checkpoint-every N] [--resume]] [--syscalls]
+          [--no-image-cache | --image-cache-dir DIR] [--result-cache [DIR]]
     """
     if argv is None:
         argv = sys.argv[1:]
 
-    # Require at least the hex file path
-    if len(argv) < 1:
-        print("Usage: python -m src.cpu_core.run_cpu path/to/prog.hex [max_steps]")
-        return 1
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if (args.resume or args.checkpoint_every) and not args.checkpoint_dir:
+        parser.error("--resume and --checkpoint-every need --checkpoint-dir")
+
+    stop: Optional[StopConditions] = StopConditions(
+        target_pc=args.target_pc,
+        time_budget=args.timeout,
+    )
+    if args.no_halt:
+        stop = StopConditions(
+            halt_on_ebreak=False,
+            halt_on_ecall=False,
+            halt_on_self_loop=False,
+            target_pc=args.target_pc,
+            time_budget=args.timeout,
+        )
+
+    cache = True
+    if args.no_image_cache:
+        cache = False
+    elif args.image_cache_dir:
+        cache = ImageCache(args.image_cache_dir)
+
+    results = None
+    if args.result_cache is not None:
+        results = ResultCache(args.result_cache or None)
 
-    hex_path = argv[0]
+    elf = is_elf(args.hex_path)
+    if not (args.resume or args.checkpoint_every or args.syscalls or elf):
+        # Run program and print final CPU state
+        cpu = run_program(args.hex_path, max_steps=args.max_steps, stop=stop,
+                          fuse=args.fuse, cache=cache, results=results)
+        _print_summary(cpu)
+        return 0
 
-    # Default max_steps unless user overrides it
-    max_steps = 10_000
-    if len(argv) >= 2:
-        try:
-            max_steps = int(argv[1])
-        except ValueError:
-            print(f"Invalid max_steps value: {argv[1]!r}")
-            return 1
+    cpu = None
+    if args.resume:
+        latest = latest_checkpoint(args.checkpoint_dir)
+        if latest is not None:
+            cpu = load_checkpoint(latest, fuse=args.fuse)
+            print(f"Resumed from {latest} (cycle {cpu.cycle})")
+    if cpu is None and elf:
+        cpu = build_cpu_from_elf(args.hex_path, fuse=args.fuse)
+    if cpu is None:
+        cpu = build_cpu(load_prog_hex_cached(args.hex_path, cache), fuse=args.fuse)
+    if args.syscalls:
+        cpu.syscalls = SyscallHandler()
 
-    # Run program and print final CPU state
-    cpu = run_program(hex_path, max_steps=max_steps)
+    if args.checkpoint_every:
+        run_with_checkpoints(cpu, args.max_steps, args.checkpoint_dir,
+                             args.checkpoint_every, stop=stop,
+                             keep=args.keep_checkpoints, compress=args.compress)
+    else:
+        cpu.run(max_steps=max(0, args.max_steps - cpu.cycle), stop=stop)
+    if cpu.syscalls is not None:
+        cpu.syscalls.flush()        # guest output before the summary
     _print_summary(cpu)
 
+    if cpu.exit_code is not None:
+        return cpu.exit_code & 0xFF
     return 0
 
 
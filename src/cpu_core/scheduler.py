@@ -0,0 +1,209 @@
+# src/cpu_core/scheduler.py
+import heapq
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from .datapath import (
+    CPU,
+    StopConditions,
+    StopInfo,
+    STOP_MAX_STEPS,
+    STOP_TIMEOUT,
+)
+
+
+POLICY_ROUND_ROBIN = "round_robin"
+POLICY_PRIORITY = "priority"
+
+STOP_ERROR = "error"            # the CPU raised (see Task.error)
+STOP_CANCELLED = "cancelled"    # retired through Scheduler.cancel()
+
+
+# ----------------------------------------
+# One scheduled CPU instance
+# ----------------------------------------
+@dataclass
+class Task:
+    """A CPU owned by the scheduler, with its budget and progress."""
+    task_id: int
+    cpu: CPU
+    max_steps: int
+    stop: Optional[StopConditions]
+    priority: int = 0
+    name: str = ""
+    steps: int = 0                   # instructions run so far
+    quanta: int = 0                  # time slices received
+    elapsed: float = 0.0             # wall-clock seconds spent running
+    info: Optional[StopInfo] = None  # set once the task retires
+    error: Optional[Exception] = None
+
+    @property
+    def done(self) -> bool:
+        return self.info is not None
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the step budget used (1.0 once retired)."""
+        if self.done:
+            return 1.0
+        return self.steps / self.max_steps if self.max_steps else 1.0
+
+
+# ============================================================
+# AI-BEGIN
+# Cooperative time slicing.  Each quantum calls CPU.run with a
+# budget of min(quantum, remaining) steps; a StopInfo whose reason
+# is not 'max_steps' means the program halted, so the task retires.
+# Round-robin keeps a FIFO of ready tasks; priority keeps a heap of
+# (-priority, sequence) so equal priorities still rotate.
+# ============================================================
+class Scheduler:
+    """
+    Run many CPUs in one thread, K instructions at a time.
+
+    policy="round_robin" gives every ready task a quantum in turn;
+    policy="priority" always runs the highest-priority ready task
+    (ties rotate round-robin).  Tasks retire when their program halts,
+    their step budget or time budget runs out, or the CPU raises.
+    """
+
+    def __init__(
+        self,
+        quantum: int = 1000,
+        policy: str = POLICY_ROUND_ROBIN,
+        on_retire: Optional[Callable[[Task], None]] = None,
+    ) -> None:
+        if quantum <= 0:
+            raise ValueError("quantum must be positive")
+        if policy not in (POLICY_ROUND_ROBIN, POLICY_PRIORITY):
+            raise ValueError(f"Unknown scheduling policy: {policy!r}")
+        self.quantum = quantum
+        self.policy = policy
+        self.on_retire = on_retire
+        self.tasks: Dict[int, Task] = {}
+        self.retired: List[Task] = []
+        self._fifo: Deque[Task] = deque()
+        self._heap: List[Tuple[int, int, Task]] = []
+        self._next_id = 0
+        self._seq = 0
+
+    # --------------------------------------------------------
+    # Task management
+    # --------------------------------------------------------
+    def add(
+        self,
+        cpu: CPU,
+        max_steps: int = 10_000,
+        stop: Optional[StopConditions] = StopConditions(),
+        priority: int = 0,
+        name: str = "",
+    ) -> int:
+        """Schedule a CPU; returns its task id."""
+        task = Task(self._next_id, cpu, max_steps, stop, priority,
+                    name or f"task{self._next_id}")
+        self._next_id += 1
+        self.tasks[task.task_id] = task
+        if max_steps <= 0:
+            self._retire(task, StopInfo(STOP_MAX_STEPS, 0, cpu.pc))
+        else:
+            self._enqueue(task)
+        return task.task_id
+
+    def _enqueue(self, task: Task) -> None:
+        if self.policy == POLICY_ROUND_ROBIN:
+            self._fifo.append(task)
+        else:
+            heapq.heappush(self._heap, (-task.priority, self._seq, task))
+            self._seq += 1
+
+    def _next_ready(self) -> Optional[Task]:
+        # Skip tasks retired through cancel() while still queued
+        while self._fifo or self._heap:
+            if self.policy == POLICY_ROUND_ROBIN:
+                task = self._fifo.popleft()
+            else:
+                task = heapq.heappop(self._heap)[2]
+            if not task.done:
+                return task
+        return None
+
+    def _retire(self, task: Task, info: StopInfo) -> None:
+        task.info = info
+        task.cpu.last_stop = info
+        self.retired.append(task)
+        if self.on_retire is not None:
+            self.on_retire(task)
+
+    def cancel(self, task_id: int) -> None:
+        """Retire a task now, keeping the state it has reached."""
+        task = self.tasks[task_id]
+        if not task.done:
+            self._retire(task, StopInfo(STOP_CANCELLED, task.steps, task.cpu.pc))
+
+    # --------------------------------------------------------
+    # Running
+    # --------------------------------------------------------
+    def run_quantum(self) -> Optional[Task]:
+        """Give one quantum to the next ready task; returns it (None if idle)."""
+        task = self._next_ready()
+        if task is None:
+            return None
+
+        budget = min(self.quantum, task.max_steps - task.steps)
+        # The time budget covers the whole task, so it is tracked here
+        # instead of restarting inside every CPU.run call.
+        stop = task.stop
+        time_budget = None
+        if stop is not None and stop.time_budget is not None:
+            time_budget = stop.time_budget
+            stop = replace(stop, time_budget=None)
+
+        cycle_before = task.cpu.cycle
+        t0 = time.monotonic()
+        try:
+            info = task.cpu.run(max_steps=budget, stop=stop)
+        except (IndexError, ValueError) as exc:
+            task.elapsed += time.monotonic() - t0
+            task.quanta += 1
+            task.steps += task.cpu.cycle - cycle_before
+            task.error = exc
+            self._retire(task, StopInfo(STOP_ERROR, task.steps, task.cpu.pc))
+            return task
+        task.elapsed += time.monotonic() - t0
+        task.quanta += 1
+        task.steps += info.steps
+
+        if info.reason != STOP_MAX_STEPS:
+            self._retire(task, replace(info, steps=task.steps))
+        elif task.steps >= task.max_steps:
+            self._retire(task, StopInfo(STOP_MAX_STEPS, task.steps, info.pc))
+        elif time_budget is not None and task.elapsed >= time_budget:
+            self._retire(task, StopInfo(STOP_TIMEOUT, task.steps, info.pc))
+        else:
+            self._enqueue(task)
+        return task
+
+    def run(self, max_quanta: Optional[int] = None) -> int:
+        """Run quanta until every task retires (or max_quanta); returns quanta run."""
+        count = 0
+        while max_quanta is None or count < max_quanta:
+            if self.run_quantum() is None:
+                break
+            count += 1
+        return count
+
+    # --------------------------------------------------------
+    # Introspection
+    # --------------------------------------------------------
+    @property
+    def active(self) -> List[Task]:
+        """Tasks that have not retired yet, in id order."""
+        return [t for t in self.tasks.values() if not t.done]
+
+    def progress(self) -> Dict[int, float]:
+        """Map task id -> fraction of its step budget used."""
+        return {tid: t.progress for tid, t in self.tasks.items()}
+# AI-END
+# ============================================================
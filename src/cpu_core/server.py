@@ -0,0 +1,416 @@
+# src/cpu_core/server.py
+import argparse
+import asyncio
+import ipaddress
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, replace
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .batch import BatchJob, JobResult, run_job
+from .client import default_socket_path
+from .datapath import StopConditions
+from .image_cache import load_prog_hex_cached
+from .scheduler import STOP_CANCELLED
+
+
+# ----------------------------------------
+# Protocol: one JSON object per line in each direction.
+#
+#   {"op": "run", "id": "j1", "hex": "/abs/prog.hex" | "words": [...],
+#    "max_steps": N, "imem_words": N, "dmem_words": N, "pc_reset": N,
+#    "no_halt": false, "target_pc": ADDR, "timeout": SECONDS,
+#    "digest": false}
+#   {"op": "cancel", "id": "j1"}
+#   {"op": "stats"}   {"op": "shutdown"}
+#
+# Replies carry the request id and a status: "done" / "error" with
+# "result" (batch.JobResult fields) for jobs, "cancelled" (with the
+# state reached if the job had started), or "ok".  Job results are
+# sent as they finish, in any order.
+# ----------------------------------------
+_JOB_FIELDS = ("max_steps", "imem_words", "dmem_words", "pc_reset")
+_HALT_FIELDS = ("halt_on_ebreak", "halt_on_ecall", "halt_on_self_loop")
+
+WARM_IMAGES = 64        # parsed images kept per worker process
+MAX_JOBS = 1 << 16      # jobs in flight per server (one cancel flag each)
+
+
+# ============================================================
+# AI-BEGIN
+# Worker side.  Pool processes live as long as the daemon, so each
+# keeps its recently used images parsed in an LRU keyed by (path,
+# mtime, size): a repeated job skips even the mmap of the on-disk
+# image cache.  The run itself is batch.run_job, so results are
+# the same JobResult the batch runner reports.  Every job gets a
+# slot in a shared byte array of cancel flags (handed to each
+# worker when the pool starts); the run checks its flag between
+# slices of batch.CANCEL_CHECK_STEPS steps.
+# ============================================================
+_warm: "OrderedDict[Tuple[str, int, int], List[int]]" = OrderedDict()
+_cancel_flags = None
+
+
+def _init_worker(flags) -> None:
+    global _cancel_flags
+    _cancel_flags = flags
+
+
+def _warm_words(path: str) -> List[int]:
+    st = os.stat(path)
+    key = (path, st.st_mtime_ns, st.st_size)
+    words = _warm.get(key)
+    if words is not None:
+        _warm.move_to_end(key)
+        return words
+    words = load_prog_hex_cached(path)
+    _warm[key] = words
+    while len(_warm) > WARM_IMAGES:
+        _warm.popitem(last=False)
+    return words
+
+
+def _run_spec(slot: int, name: str, program, params: Dict[str, int],
+              stop: Optional[StopConditions], digest: bool, results: Optional[str]) -> JobResult:
+    if isinstance(program, str):
+        try:
+            program = _warm_words(program)
+        except OSError as exc:
+            return JobResult(0, name, 0, (), 0, None, None, f"{type(exc).__name__}: {exc}")
+        except ValueError:
+            # The parser quotes the offending line; never echo file contents
+            return JobResult(0, name, 0, (), 0, None, None,
+                             f"ValueError: {program!r} is not a valid .hex program")
+    flags = _cancel_flags
+    res = run_job(0, BatchJob(program, **params), stop, digest, results,
+                  cancelled=lambda: flags[slot] != 0)
+    return replace(res, name=name)
+# AI-END
+# ============================================================
+
+
+def parse_job(req: Dict[str, Any]) -> Tuple[str, Any, Dict[str, int], Optional[StopConditions], bool]:
+    """
+    Validate a "run" request: (name, program, BatchJob fields, stop
+    conditions, digest).  Raises ValueError on a malformed job.
+    """
+    if "hex" in req:
+        program = req["hex"]
+        if not isinstance(program, str):
+            raise ValueError("'hex' must be a path")
+        name = program
+    elif "words" in req:
+        try:
+            program = [int(w) & 0xFFFF_FFFF for w in req["words"]]
+        except (TypeError, ValueError):
+            raise ValueError("'words' must be a list of integers") from None
+        name = f"<{len(program)} words>"
+    else:
+        raise ValueError("a job needs 'hex' or 'words'")
+
+    try:
+        params = {k: int(req[k]) for k in _JOB_FIELDS if k in req}
+        target = req.get("target_pc")
+        target = None if target is None else int(target)
+        timeout = req.get("timeout")
+        timeout = None if timeout is None else float(timeout)
+    except (TypeError, ValueError):
+        raise ValueError("numeric job fields must be numbers") from None
+
+    halts = not req.get("no_halt", False)
+    flags = {k: bool(req.get(k, halts)) for k in _HALT_FIELDS}
+    stop: Optional[StopConditions] = StopConditions(**flags, target_pc=target, time_budget=timeout)
+    if not any(flags.values()) and target is None and timeout is None:
+        stop = None                     # plain step budget: fastest loop
+    return name, program, params, stop, bool(req.get("digest", False))
+
+
+# ============================================================
+# AI-BEGIN
+# Daemon.  Each connection is read line by line; every "run" is
+# queued on the pool at once and a small task writes the reply
+# when its future completes, so many jobs are in flight per
+# connection and replies stream back out of order (a lock keeps
+# whole lines from interleaving).  Cancelling a job raises its
+# cancel flag and cancels its pool future: a queued job never
+# starts, and a running one stops at its next slice boundary and
+# frees the worker.  A job's slot is only reused once its future
+# has finished.  A client that disconnects cancels all of its jobs.
+# ============================================================
+def _check_loopback(host: str) -> None:
+    """Raise ValueError unless host names a loopback address."""
+    if host == "localhost":
+        return
+    try:
+        loopback = ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        loopback = False
+    if not loopback:
+        raise ValueError(f"Refusing to listen on non-loopback address {host!r}")
+
+
+class _Job(NamedTuple):
+    future: Future
+    slot: int
+
+
+
+class SimServer:
+    """
+    Long-lived simulation server.  workers=None uses a process per
+    core, workers=0 runs jobs on one thread in this process; results
+    is an optional result-cache directory (see result_cache.py).
+    """
+
+    def __init__(self, workers: Optional[int] = None, results: Optional[str] = None):
+        flags = multiprocessing.RawArray("b", MAX_JOBS)
+        if workers == 0:
+            self._pool = ThreadPoolExecutor(max_workers=1, initializer=_init_worker,
+                                            initargs=(flags,))
+        else:
+            self._pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                             initargs=(flags,))
+        self.workers = workers if workers else (os.cpu_count() or 1)
+        self.results = results
+        self.address = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._ids = itertools.count(1)
+        self._in_flight = 0
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+        self._flags = flags
+        self._free_slots = list(range(MAX_JOBS - 1, -1, -1))
+        self._jobs: Dict[int, _Job] = {}        # slot -> job, for shutdown
+        self.counts = {"submitted": 0, "done": 0, "error": 0, "cancelled": 0}
+
+    # ----------------------------------------
+    # Lifecycle
+    # ----------------------------------------
+    async def start(self, path: Optional[str] = None, host: Optional[str] = None,
+                    port: int = 0) -> None:
+        """
+        Listen on a Unix socket at path (owner-only), or on host:port
+        (TCP; loopback addresses only, since there is no authentication).
+        """
+        self._stopping = asyncio.Event()
+        if host is None:
+            path = path or default_socket_path()
+            if os.path.exists(path):
+                os.remove(path)         # stale socket from an earlier run
+            old_umask = os.umask(0o177)     # created 0600, never briefly wider
+            try:
+                self._server = await asyncio.start_unix_server(self._handle, path=path)
+            finally:
+                os.umask(old_umask)
+            self.address = path
+        else:
+            _check_loopback(host)
+            self._server = await asyncio.start_server(self._handle, host, port)
+            self.address = self._server.sockets[0].getsockname()[:2]
+
+    async def serve_until_shutdown(self) -> None:
+        await self._stopping.wait()
+        await self.close()
+
+    async def close(self) -> None:
+        for job in list(self._jobs.values()):
+            self._cancel(job)
+        if self._server is not None:
+            self._server.close()
+            # Hang up on clients and let their handlers finish first
+            handlers = list(self._connections)
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*handlers, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.remove(self.address)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counts, in_flight=self._in_flight, workers=self.workers)
+
+    # ----------------------------------------
+    # Connections and jobs
+    # ----------------------------------------
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        jobs: Dict[Any, _Job] = {}
+        self._connections[asyncio.current_task()] = writer
+
+        async def send(msg: Dict[str, Any]) -> None:
+            try:
+                async with lock:
+                    writer.write(json.dumps(msg).encode() + b"\n")
+                    await writer.drain()
+            except (ConnectionError, RuntimeError):
+                pass                    # client went away
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    req = json.loads(line)
+                    if not isinstance(req, dict):
+                        raise ValueError("expected a JSON object")
+                except ValueError as exc:
+                    await send({"id": None, "status": "error", "error": f"Bad request: {exc}"})
+                    continue
+
+                op = req.get("op", "run")
+                jid = req.get("id")
+                if jid is not None and not isinstance(jid, (str, int)):
+                    await send({"id": None, "status": "error", "error": "id must be a string or integer"})
+                elif op == "run":
+                    if jid is None:
+                        jid = f"job-{next(self._ids)}"
+                    if jid in jobs:
+                        await send({"id": jid, "status": "error", "error": "Duplicate job id"})
+                        continue
+                    error = self._submit(jid, req, send, jobs)
+                    if error is not None:
+                        await send({"id": jid, "status": "error", "error": error})
+                elif op == "cancel":
+                    job = jobs.get(jid)
+                    if job is None:
+                        await send({"id": jid, "status": "error", "error": "No such job"})
+                    else:
+                        self._cancel(job)
+                elif op == "stats":
+                    await send({"id": jid, "status": "ok", "stats": self.stats()})
+                elif op == "shutdown":
+                    await send({"id": jid, "status": "ok"})
+                    self._stopping.set()
+                else:
+                    await send({"id": jid, "status": "error", "error": f"Unknown op {op!r}"})
+        except ConnectionError:
+            pass
+        finally:
+            for job in list(jobs.values()):
+                self._cancel(job)
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    def _cancel(self, job: _Job) -> None:
+        self._flags[job.slot] = 1       # a running job stops at its next slice
+        job.future.cancel()             # a queued one never starts
+
+    def _submit(self, jid, req: Dict[str, Any], send, jobs: Dict[Any, _Job]) -> Optional[str]:
+        """Queue one job on the pool; returns an error message instead if it is invalid."""
+        try:
+            name, program, params, stop, digest = parse_job(req)
+        except ValueError as exc:
+            self.counts["error"] += 1
+            return f"Invalid job: {exc}"
+        if not self._free_slots:
+            self.counts["error"] += 1
+            return f"Too many jobs in flight (limit {MAX_JOBS})"
+        slot = self._free_slots.pop()
+        self._flags[slot] = 0
+        future = self._pool.submit(_run_spec, slot, name, program, params,
+                                   stop, digest, self.results)
+        job = jobs[jid] = self._jobs[slot] = _Job(future, slot)
+        self.counts["submitted"] += 1
+        self._in_flight += 1
+        asyncio.create_task(self._reply(jid, job, send, jobs))
+        return None
+
+    async def _reply(self, jid, job: _Job, send, jobs: Dict[Any, _Job]) -> None:
+        try:
+            res = await asyncio.wrap_future(job.future)
+        except asyncio.CancelledError:
+            self.counts["cancelled"] += 1
+            await send({"id": jid, "status": "cancelled"})
+            return
+        except Exception as exc:        # e.g. a worker process died
+            self.counts["error"] += 1
+            await send({"id": jid, "status": "error", "error": f"{type(exc).__name__}: {exc}"})
+            return
+        finally:
+            # The pool future is done, so no worker still reads this slot
+            self._in_flight -= 1
+            jobs.pop(jid, None)
+            del self._jobs[job.slot]
+            self._free_slots.append(job.slot)
+
+        if res.stop_reason == STOP_CANCELLED:
+            self.counts["cancelled"] += 1
+            await send({"id": jid, "status": "cancelled", "result": asdict(res)})
+            return
+        status = "error" if res.error else "done"
+        self.counts[status] += 1
+        await send({"id": jid, "status": status, "result": asdict(res)})
+# AI-END
+# ============================================================
+
+
+# ------------------------------------------------------------
+# Command-line entry point
+# ------------------------------------------------------------
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cpu_core.server",
+        description="Serve RV32I simulation jobs over a local socket "
+                    "(use python -m src.cpu_core.client to submit them).",
+    )
+    parser.add_argument("--socket", default=None,
+                        help="Unix socket path (default $RVSIM_SOCKET or a per-user path)")
+    parser.add_argument("--port", type=int, default=None,
+                        help="listen on loopback TCP instead of a Unix socket")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="loopback TCP address with --port (default 127.0.0.1)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="pool size (default: all cores; 0 = one in-process thread)")
+    parser.add_argument("--result-cache", metavar="DIR", default=None,
+                        help="memoize finished runs in DIR (see result_cache.py)")
+    return parser
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = SimServer(workers=args.workers, results=args.result_cache)
+    if args.port is None:
+        await server.start(path=args.socket)
+    else:
+        await server.start(host=args.host, port=args.port)
+    print(f"Listening on {server.address}", flush=True)
+    try:
+        await server.serve_until_shutdown()
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    CLI usage:
+      python -m src.cpu_core.server [--socket PATH | --port N [--host ADDR]]
+          [--workers N] [--result-cache DIR]
+
+    Runs until a client sends {"op": "shutdown"} or the process is
+    interrupted.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+    if args.port is not None:
+        try:
+            _check_loopback(args.host)
+        except ValueError as exc:
+            parser.error(str(exc))
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,235 @@
+# src/cpu_core/shm_memory.py
+import sys
+import time
+from array import array
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; only the NumPy views need it
+    np = None
+
+from .array_memory import ArrayMemory, _WORD_TYPECODE
+
+
+# ----------------------------------------
+# Segment layout
+#
+#   0   magic      8 bytes
+#   8   num_words  u64
+#   16  sequence   u64, odd while the simulator is writing
+#   24  reserved   up to HEADER_BYTES
+#   64  words      num_words × u32 (native byte order)
+# ----------------------------------------
+MAGIC = b"RVSHM\x00\x00\x01"
+HEADER_BYTES = 64
+_H_NUM_WORDS = 1     # header index in 64-bit units
+_H_SEQ = 2
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Open an existing segment without letting this process unlink it on exit."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 every attach registers the segment with this process's
+    # resource tracker, which would destroy it when the reader exits
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+# ============================================================
+# AI-BEGIN
+# Writer side.  The words live in a shared_memory segment, exposed
+# to the inherited ArrayMemory code as a memoryview cast to 'I', so
+# every Memory/ArrayMemory operation works unchanged.  Each write
+# is bracketed by a seqlock: the sequence counter is made odd
+# before the write and even after it.  Readers never block the
+# simulator; they retry if the counter was odd or moved while they
+# copied.  Bulk operations bump the counter once for the whole range.
+# ============================================================
+class SharedArrayMemory(ArrayMemory):
+    """
+    ArrayMemory whose storage is a named shared memory segment, so
+    other processes can inspect it live with SharedMemoryReader.
+
+    The creating process owns the segment: close() it when done and
+    unlink() it to free the name.
+    """
+
+    def __init__(self, num_words: int, name: Optional[str] = None) -> None:
+        if num_words <= 0:
+            raise ValueError("num_words must be positive")
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=True, size=HEADER_BYTES + 4 * num_words
+        )
+        buf = self._shm.buf
+        buf[:HEADER_BYTES] = bytes(HEADER_BYTES)
+        buf[:8] = MAGIC
+        self._hdr = buf[:HEADER_BYTES].cast("Q")
+        self._hdr[_H_NUM_WORDS] = num_words
+        self._data = buf[HEADER_BYTES:HEADER_BYTES + 4 * num_words].cast(_WORD_TYPECODE)
+        self._size = num_words
+        self._write_hooks = []
+
+    @property
+    def name(self) -> str:
+        """Segment name to pass to SharedMemoryReader."""
+        return self._shm.name
+
+    @property
+    def sequence(self) -> int:
+        return self._hdr[_H_SEQ]
+
+    def close(self) -> None:
+        """Detach from the segment (the memory is unusable afterwards)."""
+        if self._data is None:
+            return
+        self._data.release()
+        self._hdr.release()
+        self._data = self._hdr = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Destroy the segment once every process has closed it."""
+        self._shm.unlink()
+
+    # ----------------------------------------
+    # Seqlock-bracketed writes
+    # ----------------------------------------
+    def store_word(self, addr: int, value: int) -> None:
+        hdr = self._hdr
+        hdr[_H_SEQ] += 1
+        try:
+            super().store_word(addr, value)
+        finally:
+            hdr[_H_SEQ] += 1
+
+    def _store_part(self, addr: int, value: int, mask: int) -> None:
+        hdr = self._hdr
+        hdr[_H_SEQ] += 1
+        try:
+            super()._store_part(addr, value, mask)
+        finally:
+            hdr[_H_SEQ] += 1
+
+    def store_words(self, addr: int, values) -> None:
+        hdr = self._hdr
+        hdr[_H_SEQ] += 1
+        try:
+            super().store_words(addr, values)
+        finally:
+            hdr[_H_SEQ] += 1
+
+    def fill(self, addr: int, num_words: int, value: int = 0) -> None:
+        hdr = self._hdr
+        hdr[_H_SEQ] += 1
+        try:
+            super().fill(addr, num_words, value)
+        finally:
+            hdr[_H_SEQ] += 1
+
+    def copy_within(self, dst_addr: int, src_addr: int, num_words: int) -> None:
+        hdr = self._hdr
+        hdr[_H_SEQ] += 1
+        try:
+            super().copy_within(dst_addr, src_addr, num_words)
+        finally:
+            hdr[_H_SEQ] += 1
+
+    def restore(self, snapshot) -> None:
+        hdr = self._hdr
+        hdr[_H_SEQ] += 1
+        try:
+            super().restore(snapshot)
+        finally:
+            hdr[_H_SEQ] += 1
+
+    def fork(self) -> ArrayMemory:
+        """Private (non-shared) ArrayMemory copy of the current contents."""
+        child = ArrayMemory(self._size)
+        child._data = array(_WORD_TYPECODE)
+        child._data.frombytes(self._data.cast("B"))
+        return child
+# AI-END
+# ============================================================
+
+
+# ============================================================
+# AI-BEGIN
+# Reader side (any process).  view()/as_numpy() are zero-copy and
+# may observe a write in progress; snapshot()/read_words() copy
+# under the seqlock and retry until the copy is consistent.
+# ============================================================
+class SharedMemoryReader:
+    """Attach to a SharedArrayMemory segment by name (read-only access)."""
+
+    def __init__(self, name: str) -> None:
+        self._shm = _attach(name)
+        buf = self._shm.buf
+        if bytes(buf[:8]) != MAGIC:
+            self._shm.close()
+            raise ValueError(f"Shared memory segment {name!r} is not a simulator memory")
+        self._hdr = buf[:HEADER_BYTES].cast("Q")
+        self.num_words = self._hdr[_H_NUM_WORDS]
+        self._words = buf[HEADER_BYTES:HEADER_BYTES + 4 * self.num_words].cast(_WORD_TYPECODE)
+
+    @property
+    def sequence(self) -> int:
+        """Current write sequence (odd while a write is in progress)."""
+        return self._hdr[_H_SEQ]
+
+    def view(self) -> memoryview:
+        """Read-only zero-copy view of all words (may tear during writes)."""
+        return self._words.toreadonly()
+
+    def as_numpy(self):
+        """Read-only zero-copy uint32 NumPy view of all words."""
+        if np is None:
+            raise ImportError("as_numpy requires numpy (pip install numpy)")
+        arr = np.frombuffer(self._words, dtype=np.uint32)
+        arr.flags.writeable = False
+        return arr
+
+    def _consistent(self, copy, max_retries: int):
+        hdr = self._hdr
+        for _ in range(max_retries):
+            before = hdr[_H_SEQ]
+            if not before & 1:
+                data = copy()
+                if hdr[_H_SEQ] == before:
+                    return before, data
+            time.sleep(0)       # let the writer finish
+        raise RuntimeError(f"No consistent read after {max_retries} attempts")
+
+    def snapshot(self, max_retries: int = 1000) -> Tuple[int, object]:
+        """
+        Consistent copy of all words as (sequence, uint32 NumPy array).
+        Never blocks the writer; retries while a write is in progress.
+        """
+        if np is None:
+            raise ImportError("snapshot requires numpy (pip install numpy)")
+        words = np.frombuffer(self._words, dtype=np.uint32)
+        return self._consistent(words.copy, max_retries)
+
+    def read_words(self, addr: int, num_words: int, max_retries: int = 1000) -> List[int]:
+        """Consistent copy of num_words words starting at the aligned addr."""
+        if addr % 4 or addr < 0 or addr // 4 + num_words > self.num_words:
+            raise IndexError(f"Cannot read {num_words} words at 0x{addr:08X}")
+        start = addr // 4
+        return self._consistent(
+            lambda: self._words[start:start + num_words].tolist(), max_retries
+        )[1]
+
+    def close(self) -> None:
+        """Detach (drop any views from view()/as_numpy() first)."""
+        self._words.release()
+        self._hdr.release()
+        self._shm.close()
+# AI-END
+# ============================================================
@@ -0,0 +1,231 @@
+# src/cpu_core/syscalls.py
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+
+# ----------------------------------------
+# Linux RISC-V system call numbers (the subset newlib/libgloss uses)
+# ----------------------------------------
+SYS_READ = 63
+SYS_WRITE = 64
+SYS_EXIT = 93
+SYS_EXIT_GROUP = 94
+SYS_CLOCK_GETTIME = 113
+SYS_BRK = 214
+SYS_CLOCK_GETTIME64 = 403
+
+# errno values returned to the guest as -errno in a0
+EBADF = 9
+ENOMEM = 12
+EFAULT = 14
+EINVAL = 22
+ENOSYS = 38
+
+CLOCK_REALTIME = 0
+CLOCK_MONOTONIC = 1
+
+# Argument / result registers
+A0, A7 = 10, 17
+M = 0xFFFF_FFFF
+
+# A syscall implementation: fn(cpu, a0, a1, a2, a3, a4, a5) -> result
+SyscallFn = Callable[..., int]
+
+
+class GuestExit(Exception):
+    """
+    Raised inside the fast engines when the guest calls exit, so they
+    can stop without checking a flag per instruction.  Carries the PC
+    after the ECALL and the instructions retired in the current chunk.
+    """
+
+    def __init__(self, pc: int, steps: int) -> None:
+        super().__init__(pc, steps)
+        self.pc = pc
+        self.steps = steps
+
+
+# ----------------------------------------
+# Guest memory helpers (faults become -EFAULT)
+# ----------------------------------------
+def _read_guest(mem, addr: int, n: int) -> bytes:
+    """Copy n bytes out of guest memory, a word at a time where aligned."""
+    out = bytearray()
+    while n and addr & 3:
+        out.append(mem.load_byte(addr))
+        addr, n = addr + 1, n - 1
+    while n >= 4:
+        out += mem.load_word(addr).to_bytes(4, "little")
+        addr, n = addr + 4, n - 4
+    while n:
+        out.append(mem.load_byte(addr))
+        addr, n = addr + 1, n - 1
+    return bytes(out)
+
+
+def _write_guest(mem, addr: int, data: bytes) -> None:
+    """Copy data into guest memory, a word at a time where aligned."""
+    i, n = 0, len(data)
+    while i < n and (addr + i) & 3:
+        mem.store_byte(addr + i, data[i])
+        i += 1
+    while n - i >= 4:
+        mem.store_word(addr + i, int.from_bytes(data[i:i + 4], "little"))
+        i += 4
+    while i < n:
+        mem.store_byte(addr + i, data[i])
+        i += 1
+
+
+# ============================================================
+# AI-BEGIN
+# ECALL proxy.  CPU.step() (and the fast engines) call ecall(cpu)
+# for every ECALL while cpu.syscalls is set.  The syscall number is
+# in a7, arguments in a0-a5, and the result goes back in a0 with
+# errors as -errno, following the Linux RISC-V ABI that newlib's
+# libgloss targets.  Guest output is collected per file descriptor
+# and written to the host stream in one call once it reaches
+# flush_threshold (or on flush()/exit/read), not once per write.
+# ============================================================
+class SyscallHandler:
+    """
+    Host side of a small Linux-style syscall set: exit, write, read,
+    brk and clock_gettime.  Attach with cpu.syscalls = SyscallHandler().
+
+    Streams are binary (None = the process's stdin/stdout/stderr).
+    The heap handed out by brk runs from heap_start (default: the
+    middle of DMEM) to heap_limit (default: the end of DMEM).  Other
+    numbers can be added with register(); unknown ones return -ENOSYS.
+    """
+
+    def __init__(
+        self,
+        stdout=None,
+        stderr=None,
+        stdin=None,
+        heap_start: Optional[int] = None,
+        heap_limit: Optional[int] = None,
+        flush_threshold: int = 4096,
+    ) -> None:
+        self._streams = {1: stdout, 2: stderr}
+        self._stdin = stdin
+        self._out: Dict[int, bytearray] = {1: bytearray(), 2: bytearray()}
+        self.flush_threshold = flush_threshold
+        self.heap_start = heap_start
+        self.heap_limit = heap_limit
+        self._brk: Optional[int] = None
+        self.calls = 0
+        self.table: Dict[int, SyscallFn] = {
+            SYS_EXIT: self.sys_exit,
+            SYS_EXIT_GROUP: self.sys_exit,
+            SYS_WRITE: self.sys_write,
+            SYS_READ: self.sys_read,
+            SYS_BRK: self.sys_brk,
+            SYS_CLOCK_GETTIME: self.sys_clock_gettime,
+            SYS_CLOCK_GETTIME64: self.sys_clock_gettime,
+        }
+
+    def register(self, number: int, fn: SyscallFn) -> None:
+        """Handle syscall 'number' with fn(cpu, a0, ..., a5) -> a0."""
+        self.table[number] = fn
+
+    def ecall(self, cpu) -> bool:
+        """Service the ECALL just executed by cpu.  True if the guest exited."""
+        x = cpu.regs._regs
+        self.calls += 1
+        fn = self.table.get(x[A7])
+        if fn is None:
+            result = -ENOSYS
+        else:
+            result = fn(cpu, *x[A0:A0 + 6])
+        if cpu.exit_code is not None:
+            return True
+        x[A0] = result & M
+        return False
+
+    # ----------------------------------------
+    # Host output buffering
+    # ----------------------------------------
+    def output(self, fd: int) -> bytes:
+        """Bytes written to fd that have not been flushed yet."""
+        return bytes(self._out[fd])
+
+    def flush(self) -> None:
+        """Write all buffered guest output to the host streams."""
+        for fd, buf in self._out.items():
+            if not buf:
+                continue
+            stream = self._streams[fd]
+            if stream is None:
+                text = sys.stdout if fd == 1 else sys.stderr
+                text.flush()            # keep ordering with print() output
+                stream = text.buffer
+            stream.write(bytes(buf))
+            stream.flush()
+            buf.clear()
+
+    # ----------------------------------------
+    # System calls
+    # ----------------------------------------
+    def sys_exit(self, cpu, status: int, *_) -> int:
+        self.flush()
+        cpu.exit_code = ((status & M) ^ 0x8000_0000) - 0x8000_0000
+        return 0
+
+    def sys_write(self, cpu, fd: int, buf: int, count: int, *_) -> int:
+        out = self._out.get(fd)
+        if out is None:
+            return -EBADF
+        try:
+            out += _read_guest(cpu.dmem, buf, count)
+        except (IndexError, ValueError):
+            return -EFAULT
+        if len(out) >= self.flush_threshold:
+            self.flush()
+        return count
+
+    def sys_read(self, cpu, fd: int, buf: int, count: int, *_) -> int:
+        if fd != 0:
+            return -EBADF
+        self.flush()                    # show any prompt before blocking
+        stream = self._stdin if self._stdin is not None else sys.stdin.buffer
+        data = stream.read(count) if count else b""
+        try:
+            _write_guest(cpu.dmem, buf, data)
+        except (IndexError, ValueError):
+            return -EFAULT
+        return len(data)
+
+    def sys_brk(self, cpu, addr: int, *_) -> int:
+        if self._brk is None:
+            size = getattr(cpu.dmem, "size_bytes", None)
+            if self.heap_start is None:
+                if size is None:
+                    return -ENOMEM
+                self.heap_start = (size // 2) & ~0xF
+            if self.heap_limit is None:
+                self.heap_limit = size if size is not None else self.heap_start
+            self._brk = self.heap_start
+        # Linux semantics: an invalid request leaves the break unchanged
+        if self.heap_start <= addr <= self.heap_limit:
+            self._brk = addr
+        return self._brk
+
+    def sys_clock_gettime(self, cpu, clock_id: int, tp: int, *_) -> int:
+        if clock_id == CLOCK_REALTIME:
+            ns = time.time_ns()
+        elif clock_id == CLOCK_MONOTONIC:
+            ns = time.monotonic_ns()
+        else:
+            return -EINVAL
+        sec, nsec = divmod(ns, 1_000_000_000)
+        # struct timespec with a 64-bit time_t, as on rv32 newlib/glibc
+        try:
+            _write_guest(cpu.dmem, tp, sec.to_bytes(8, "little")
+                         + nsec.to_bytes(4, "little") + bytes(4))
+        except (IndexError, ValueError):
+            return -EFAULT
+        return 0
+# AI-END
+# ============================================================
@@ -0,0 +1,277 @@
+# src/cpu_core/timetravel.py
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from .datapath import CPU
+from .isa import INSTR_ECALL
+from .syscalls import A0
+
+
+# One undo record per executed step:
+#   (pc before the step, rd written or 0, old rd value,
+#    word address stored to or -1, old word at that address,
+#    exit code before the step)
+UndoEntry = Tuple[int, int, int, int, int, Optional[int]]
+
+# ECALL outcomes by the cycle they ran at: (a0 after, exit code after)
+SyscallLog = Dict[int, Tuple[int, Optional[int]]]
+
+
+@dataclass
+class Snapshot:
+    """Full architectural state at one cycle (memories are forks)."""
+    cycle: int
+    pc: int
+    regs: List[int]
+    imem: object
+    dmem: object
+    exit_code: Optional[int] = None
+
+    def make_cpu(self) -> CPU:
+        """Independent CPU starting from this snapshot (the snapshot is not modified)."""
+        imem = self.imem.fork()
+        dmem = imem if self.dmem is self.imem else self.dmem.fork()
+        cpu = CPU(imem, dmem, pc_reset=self.pc)
+        cpu.regs._regs[:] = self.regs
+        cpu.cycle = self.cycle
+        cpu.exit_code = self.exit_code
+        return cpu
+
+
+class _ReplaySyscalls:
+    """
+    Stands in for cpu.syscalls while history is replayed: each ECALL
+    gets back the a0 and exit code it produced when it first ran,
+    without touching the host.  ECALLs that ran with no handler
+    attached are not in the log and stay no-ops.
+    """
+
+    def __init__(self, log: SyscallLog) -> None:
+        self.log = log
+
+    def ecall(self, cpu: CPU) -> bool:
+        outcome = self.log.get(cpu.cycle)
+        if outcome is None:
+            return False
+        cpu.regs._regs[A0], cpu.exit_code = outcome
+        return outcome[1] is not None
+
+
+# ============================================================
+# AI-BEGIN
+# Reverse execution.  CPU.step() reports, before it commits, which
+# register and memory word it will overwrite; the old values go on
+# an undo journal, so stepping back n instructions is n cheap undo
+# operations.  The journal is bounded: when it grows past
+# max_journal its oldest half is dropped.  Periodic snapshots
+# (copy-on-write forks for PagedMemory) cover the dropped history:
+# going back further restores the nearest earlier snapshot and
+# replays forward from there, never from reset.  Snapshots are
+# thinned too - once there are more than max_snapshots, every
+# other one in the older half is dropped, so old history becomes
+# sparser but stays reachable back to the first snapshot.
+# Replays never repeat host I/O: the outcome of every ECALL is
+# logged as it runs (one small entry per ECALL, kept as long as
+# the history) and handed back by _ReplaySyscalls instead.
+# ============================================================
+class TimeTravel:
+    """
+    Undo journal + snapshots attached to one CPU (cpu.timetravel).
+
+    Only execution through CPU.step()/run() is recorded (run_fast and
+    run_blocks fall back to run() while attached, and fusion is
+    bypassed).  Direct writes to registers or memory from outside the
+    CPU are not journaled, nor are buffers a syscall handler fills
+    (a0 and the exit code are, and replays reuse them instead of
+    calling the handler again; a buffer filled by read() is not
+    refilled).
+    """
+
+    def __init__(
+        self,
+        cpu: CPU,
+        snapshot_every: int = 10_000,
+        max_journal: int = 1_000_000,
+        max_snapshots: int = 32,
+    ) -> None:
+        if snapshot_every <= 0 or max_journal <= 0 or max_snapshots < 2:
+            raise ValueError("snapshot_every and max_journal must be positive, "
+                             "max_snapshots at least 2")
+        self.cpu = cpu
+        self.snapshot_every = snapshot_every
+        self.max_journal = max_journal
+        self.max_snapshots = max_snapshots
+        self._journal: List[UndoEntry] = []
+        self._base = cpu.cycle                 # cycle of the oldest journal entry
+        self._snaps: List[Snapshot] = []
+        self._syscall_log: SyscallLog = {}
+        self._take_snapshot()                  # raises early if memory can't fork
+        cpu.timetravel = self
+
+    def detach(self) -> None:
+        """Stop recording and drop all history."""
+        if self.cpu.timetravel is self:
+            self.cpu.timetravel = None
+        self._journal.clear()
+        self._snaps.clear()
+        self._syscall_log.clear()
+
+    # ----------------------------------------
+    # Recording (called by CPU.step)
+    # ----------------------------------------
+    def before_step(self, pc: int, rd: int, store_addr: int) -> UndoEntry:
+        cpu = self.cpu
+        old_word = 0
+        if store_addr >= 0:
+            store_addr &= ~3
+            try:
+                old_word = cpu.dmem.load_word(store_addr)
+            except (IndexError, ValueError):
+                store_addr = -1         # the store itself will raise
+        return (pc, rd, cpu.regs._regs[rd], store_addr, old_word, cpu.exit_code)
+
+    def after_step(self, entry: UndoEntry) -> None:
+        cpu = self.cpu
+        handler = cpu.syscalls
+        if (cpu.last_instr == INSTR_ECALL and handler is not None
+                and not isinstance(handler, _ReplaySyscalls)):
+            self._syscall_log[cpu.cycle - 1] = (cpu.regs._regs[A0], cpu.exit_code)
+        journal = self._journal
+        journal.append(entry)
+        if self.cpu.cycle >= self._next_snap:
+            self._take_snapshot()
+        if len(journal) > self.max_journal:
+            drop = len(journal) - self.max_journal // 2
+            del journal[:drop]
+            self._base += drop
+
+    def _take_snapshot(self) -> None:
+        cpu = self.cpu
+        imem = cpu.imem.fork()
+        dmem = imem if cpu.dmem is cpu.imem else cpu.dmem.fork()
+        self._snaps.append(Snapshot(cpu.cycle, cpu.pc, cpu.regs._regs[:], imem, dmem,
+                                    cpu.exit_code))
+        self._next_snap = cpu.cycle + self.snapshot_every
+        if len(self._snaps) > self.max_snapshots:
+            half = self.max_snapshots // 2
+            self._snaps = self._snaps[:-half][::2] + self._snaps[-half:]
+
+    # ----------------------------------------
+    # History bounds
+    # ----------------------------------------
+    @property
+    def oldest_cycle(self) -> int:
+        """Earliest cycle that can still be reached."""
+        return self._snaps[0].cycle if self._snaps else self._base
+
+    @property
+    def journal_length(self) -> int:
+        """Steps that can be undone without replaying."""
+        return len(self._journal)
+
+    @property
+    def snapshots(self) -> Tuple[Snapshot, ...]:
+        return tuple(self._snaps)
+
+    # ----------------------------------------
+    # Going back
+    # ----------------------------------------
+    def _undo(self, n: int) -> None:
+        cpu = self.cpu
+        regs = cpu.regs._regs
+        journal = self._journal
+        for _ in range(n):
+            pc, rd, old_rd, addr, old_word, exit_code = journal.pop()
+            if addr >= 0:
+                cpu.dmem.store_word(addr, old_word)
+            regs[rd] = old_rd
+            cpu.pc = pc
+            cpu.exit_code = exit_code
+        cpu.cycle -= n
+
+    def _drop_snapshots_after(self, cycle: int) -> None:
+        while self._snaps and self._snaps[-1].cycle > cycle:
+            self._snaps.pop()
+        last = self._snaps[-1].cycle if self._snaps else cycle
+        self._next_snap = last + self.snapshot_every
+
+    def goto_cycle(self, cycle: int) -> None:
+        """Rewind the CPU to the state it had at an earlier cycle."""
+        cpu = self.cpu
+        if cycle > cpu.cycle:
+            raise ValueError(f"Cycle {cycle} is in the future (now {cpu.cycle}); use run()")
+        if cycle < self.oldest_cycle:
+            raise ValueError(f"Cycle {cycle} is older than the recorded history "
+                             f"(oldest {self.oldest_cycle})")
+
+        # ECALLs from cycle on will run (and be logged) again
+        log = self._syscall_log
+        for k in [k for k in log if k >= cycle]:
+            del log[k]
+
+        if cycle >= self._base:
+            self._undo(cpu.cycle - cycle)
+            self._drop_snapshots_after(cycle)
+            return
+
+        # Beyond the journal: restore the nearest snapshot, then replay
+        snap = next(s for s in reversed(self._snaps) if s.cycle <= cycle)
+        self._drop_snapshots_after(snap.cycle)
+        cpu.imem.restore(snap.imem)
+        if cpu.dmem is not cpu.imem:
+            cpu.dmem.restore(snap.dmem)
+        cpu.regs._regs[:] = snap.regs
+        cpu.pc = snap.pc
+        cpu.cycle = snap.cycle
+        cpu.exit_code = snap.exit_code
+        self._journal.clear()
+        self._base = snap.cycle
+        handler = cpu.syscalls
+        cpu.syscalls = _ReplaySyscalls(log)
+        try:
+            for _ in range(cycle - snap.cycle):
+                cpu.step()
+        finally:
+            cpu.syscalls = handler
+
+    def step_back(self, n: int = 1) -> None:
+        """Undo the last n executed instructions."""
+        self.goto_cycle(self.cpu.cycle - n)
+
+    def run_back_to(self, pc: int) -> bool:
+        """
+        Rewind to the most recent earlier point where the CPU was about
+        to execute the instruction at pc.  Returns False (and leaves the
+        CPU unchanged) if pc does not occur in the recorded history.
+        """
+        journal = self._journal
+        for i in range(len(journal) - 1, -1, -1):
+            if journal[i][0] == pc:
+                self.goto_cycle(self._base + i)
+                return True
+
+        # Older history: replay each snapshot interval, newest first
+        end = self._base
+        for snap in reversed(self._snaps):
+            if snap.cycle >= end:
+                continue
+            found = self._last_visit(snap, end, pc, self._syscall_log)
+            if found is not None:
+                self.goto_cycle(found)
+                return True
+            end = snap.cycle
+        return False
+
+    @staticmethod
+    def _last_visit(snap: Snapshot, end: int, pc: int, log: SyscallLog) -> Optional[int]:
+        """Last cycle in [snap.cycle, end) at which the PC was pc."""
+        scratch = snap.make_cpu()
+        scratch.syscalls = _ReplaySyscalls(log)
+        found = None
+        while scratch.cycle < end:
+            if scratch.pc == pc:
+                found = scratch.cycle
+            scratch.step()
+        return found
+# AI-END
+# ============================================================
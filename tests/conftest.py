@@ -0,0 +1,14 @@
+# tests/conftest.py
+import pytest
+
+
+# ------------------------------------------------------------
+# Keep the on-disk caches inside each test's tmp dir
+# ------------------------------------------------------------
+@pytest.fixture(autouse=True)
+def _isolated_caches(tmp_path, monkeypatch):
+    cache_home = tmp_path / "cache-home"
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    monkeypatch.setenv("RVSIM_IMAGE_CACHE", str(cache_home / "rv-sim" / "images"))
+    monkeypatch.setenv("RVSIM_RESULT_CACHE", str(cache_home / "rv-sim" / "results"))
+    monkeypatch.delenv("RVSIM_NO_IMAGE_CACHE", raising=False)
@@ -0,0 +1,94 @@
+# tests/test_array_memory.py
+from pathlib import Path
+
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.array_memory import ArrayMemory
+from src.cpu_core.datapath import CPU
+from src.cpu_core.prog_loader import load_prog_hex
+
+
+# ------------------------------------------------------------
+# Helper: resolve path to programs/*.hex
+# ------------------------------------------------------------
+def _hex_path(name: str) -> Path:
+    return Path(__file__).parent / "programs" / name
+
+
+# ------------------------------------------------------------
+# Test 1 — ranged bulk operations
+# ------------------------------------------------------------
+def test_bulk_load_store_fill_copy():
+    mem = ArrayMemory(16)
+    mem.store_words(8, [1, 2, 3, -1, 1 << 33])
+    assert mem.load_words(8, 5) == [1, 2, 3, 0xFFFF_FFFF, 0]
+    assert mem.load_word(20) == 0xFFFF_FFFF
+
+    mem.fill(32, 4, 0xAB)
+    assert mem.load_words(28, 6) == [0, 0xAB, 0xAB, 0xAB, 0xAB, 0]
+
+    # Overlapping copies behave like memmove in both directions
+    mem.copy_within(12, 8, 4)
+    assert mem.load_words(8, 5) == [1, 1, 2, 3, 0xFFFF_FFFF]
+    mem.copy_within(8, 12, 4)
+    assert mem.load_words(8, 5) == [1, 2, 3, 0xFFFF_FFFF, 0xFFFF_FFFF]
+
+    with pytest.raises(IndexError):
+        mem.load_words(60, 2)
+    with pytest.raises(IndexError):
+        mem.store_words(0, [0] * 17)
+    with pytest.raises(ValueError):
+        mem.fill(2, 1)
+
+    mem.reset(7)
+    assert mem.dump_words() == [7] * 16
+
+
+# ------------------------------------------------------------
+# Test 2 — views are zero-copy and read-only
+# ------------------------------------------------------------
+def test_zero_copy_views():
+    mem = ArrayMemory(8)
+    view = mem.view()
+    mem.store_word(4, 0x1234)
+    mem.reset(5)                       # in place: the view stays valid
+    mem.store_word(0, 9)
+    assert view.tolist() == [9] + [5] * 7
+    assert view.readonly
+
+    np = pytest.importorskip("numpy")
+    arr = mem.as_numpy()
+    assert arr.dtype == np.uint32 and arr.tolist() == view.tolist()
+    mem.store_word(28, 0xFFFF_FFFF)
+    assert int(arr[7]) == 0xFFFF_FFFF
+    with pytest.raises(ValueError):
+        arr[0] = 1
+
+
+# ------------------------------------------------------------
+# Test 3 — drop-in for Memory on every engine
+# ------------------------------------------------------------
+@pytest.mark.parametrize("engine", ["run", "run_fast", "run_blocks"])
+def test_cpu_on_array_memory(engine):
+    words = load_prog_hex(str(_hex_path("prog.hex")))
+    cpus = []
+    for mem_cls in (Memory, ArrayMemory):
+        imem = mem_cls(256)
+        imem.load_program(words)
+        cpu = CPU(imem, mem_cls(256))
+        getattr(cpu, engine)(max_steps=50)
+        cpus.append(cpu)
+    ref, arr = cpus
+    assert arr.get_state() == ref.get_state()
+    assert arr.dmem.dump_words() == ref.dmem.dump_words()
+
+    # Bulk writes still invalidate the predecode cache
+    imem = ArrayMemory(16)
+    imem.store_words(0, [0x00500093])           # addi x1, x0, 5
+    cpu = CPU(imem, ArrayMemory(16), predecode=True)
+    cpu.step()
+    imem.store_words(0, [0x00700093])           # addi x1, x0, 7
+    cpu.pc = 0
+    cpu.step()
+    assert cpu.regs.read(1) == 7
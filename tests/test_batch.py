@@ -0,0 +1,89 @@
+# tests/test_batch.py
+import json
+from pathlib import Path
+
+from src.cpu_core.datapath import STOP_MAX_STEPS, STOP_SELF_LOOP
+from src.cpu_core.run_cpu import run_program, run_words
+from src.cpu_core.batch import BatchJob, dmem_digest, run_batch, main
+
+
+# ------------------------------------------------------------
+# Helper: resolve path to programs/*.hex
+# ------------------------------------------------------------
+def _hex_path(name: str) -> Path:
+    return Path(__file__).parent / "programs" / name
+
+
+# addi x1, x0, 5 ; sw x1, 8(x0) ; jal x0, 0
+STORE_PROG = [0x00500093, 0x00102423, 0x0000006F]
+
+
+# ------------------------------------------------------------
+# Test 1 — pool results match run_program / run_words per job
+# ------------------------------------------------------------
+def test_run_batch_matches_single_runs():
+    prog = str(_hex_path("prog.hex"))
+    jobs = [
+        prog,
+        BatchJob(prog, max_steps=3),
+        STORE_PROG,
+        BatchJob(STORE_PROG, dmem_words=16),
+    ] * 3
+
+    results = list(run_batch(jobs, workers=2, chunksize=2, digest=True))
+    assert sorted(r.index for r in results) == list(range(len(jobs)))
+
+    expected = [
+        run_program(prog),
+        run_program(prog, max_steps=3),
+        run_words(STORE_PROG),
+        run_words(STORE_PROG, dmem_words=16),
+    ]
+    for res in results:
+        cpu = expected[res.index % 4]
+        assert res.error is None
+        assert res.pc == cpu.pc
+        assert list(res.regs) == cpu.regs.dump()
+        assert res.cycle == cpu.cycle
+        assert res.stop_reason == cpu.last_stop.reason
+        assert res.dmem_digest == dmem_digest(cpu.dmem.dump_words())
+
+    by_index = {r.index: r for r in results}
+    assert by_index[0].stop_reason == STOP_SELF_LOOP
+    assert by_index[1].stop_reason == STOP_MAX_STEPS
+    assert by_index[2].dmem_digest != by_index[3].dmem_digest
+
+
+# ------------------------------------------------------------
+# Test 2 — errors are reported per job, not raised
+# ------------------------------------------------------------
+def test_run_batch_reports_errors_in_process():
+    jobs = [
+        "does/not/exist.hex",
+        [0x00102083],            # lw x1, 1(x0)  -> unaligned
+        STORE_PROG,
+    ]
+    results = sorted(run_batch(jobs, workers=0), key=lambda r: r.index)
+
+    assert results[0].error.startswith("FileNotFoundError")
+    assert results[0].regs == ()
+    assert results[1].error.startswith("ValueError: Unaligned")
+    assert (results[1].pc, results[1].cycle, results[1].stop_reason) == (0, 0, None)
+    assert results[2].error is None and results[2].regs[1] == 5
+
+
+# ------------------------------------------------------------
+# Test 3 — CLI with a jobs file and JSON output
+# ------------------------------------------------------------
+def test_batch_cli_jobs_file(tmp_path, capsys):
+    jobs_file = tmp_path / "jobs.jsonl"
+    jobs_file.write_text(
+        json.dumps({"hex": str(_hex_path("prog.hex")), "max_steps": 2}) + "\n"
+        + json.dumps({"words": STORE_PROG}) + "\n"
+    )
+    rc = main(["--jobs", str(jobs_file), "--workers", "0", "--json", "--digest"])
+    assert rc == 0
+
+    lines = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert [l["cycle"] for l in lines] == [2, 3]
+    assert lines[1]["regs"][1] == 5 and len(lines[1]["dmem_digest"]) == 64
@@ -0,0 +1,72 @@
+# tests/test_bulk_decode.py
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.cpu_core.isa import OPCODES, decode
+from src.cpu_core.memory import Memory
+from src.cpu_core.predecode import predecode_word
+from src.cpu_core.bulk_decode import (
+    CLASS_OF_OPCODE,
+    CLS_INVALID,
+    CLS_JAL,
+    CLS_SYSTEM,
+    decode_image,
+    decode_memory,
+)
+
+
+def _random_words(n: int, seed: int) -> list[int]:
+    """Half fully random words, half random words with a valid opcode."""
+    rng = random.Random(seed)
+    opcodes = list(OPCODES.values())
+    words = []
+    for i in range(n):
+        w = rng.getrandbits(32)
+        if i % 2:
+            w = (w & ~0x7F) | rng.choice(opcodes)
+        words.append(w)
+    return words
+
+
+# ------------------------------------------------------------
+# Test 1 — every field matches the scalar decoder
+# ------------------------------------------------------------
+def test_bulk_decode_matches_scalar():
+    words = _random_words(5000, seed=6)
+    img = decode_image(words)
+    assert len(img) == len(words)
+
+    for i, w in enumerate(words):
+        di = decode(w)
+        assert int(img.words[i]) == w
+        assert int(img.opcode[i]) == di.opcode
+        assert int(img.rd[i]) == di.rd
+        assert int(img.rs1[i]) == di.rs1
+        assert int(img.rs2[i]) == di.rs2
+        assert int(img.funct3[i]) == di.funct3
+        assert int(img.funct7[i]) == di.funct7
+        assert int(img.imm[i]) == predecode_word(w).imm
+        assert int(img.iclass[i]) == CLASS_OF_OPCODE.get(di.opcode, CLS_INVALID)
+
+
+# ------------------------------------------------------------
+# Test 2 — edge immediates and decoding straight from Memory
+# ------------------------------------------------------------
+def test_decode_memory_edge_immediates():
+    mem = Memory(5)
+    mem.load_program([
+        0xFFFFF0B7,   # lui  x1, 0xFFFFF      -> imm_u = 0xFFFFF000
+        0x800000EF,   # jal  x1, -1048576     -> most negative J imm
+        0xFFF00093,   # addi x1, x0, -1
+        0x00100073,   # ebreak                -> SYSTEM, no immediate
+    ])
+    img = decode_memory(mem)
+
+    assert img.imm.tolist() == [0xFFFFF000, -(1 << 20), -1, 0, 0]
+    assert int(img.iclass[1]) == CLS_JAL
+    assert int(img.iclass[3]) == CLS_SYSTEM
+    assert int(img.iclass[4]) == CLS_INVALID
+    assert img.rd.dtype == np.uint8 and img.imm.dtype == np.int64
@@ -0,0 +1,200 @@
+# tests/test_bus.py
+import io
+import struct
+
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.paged_memory import PagedMemory
+from src.cpu_core.datapath import CPU, StopConditions, STOP_EBREAK
+from src.cpu_core.timetravel import TimeTravel
+from src.cpu_core.bus import (
+    Bus,
+    Device,
+    UART,
+    BlockDevice,
+    UART_STATUS,
+    UART_RX,
+    UART_TX_READY,
+    UART_RX_AVAIL,
+    BLK_BUFFER,
+    BLK_STATUS,
+    BLK_COUNT,
+    BLK_ERROR,
+    SECTOR_SIZE,
+)
+
+
+UART_BASE = 0x1000_0000
+BLK_BASE = 0x1000_1000
+
+# Print the NUL-terminated string at 0x100 to the UART, then EBREAK
+PUTS_PROG = [
+    0x100000B7,   # 0x00: lui  x1, 0x10000
+    0x10000113,   # 0x04: addi x2, x0, 0x100
+    0x00014183,   # 0x08: lbu  x3, 0(x2)
+    0x00018863,   # 0x0C: beq  x3, x0, +16
+    0x00308023,   # 0x10: sb   x3, 0(x1)
+    0x00110113,   # 0x14: addi x2, x2, 1
+    0xFF1FF06F,   # 0x18: jal  x0, -16
+    0x00100073,   # 0x1C: ebreak
+]
+
+
+def _string_words(text: bytes):
+    text += bytes(-len(text) % 4 or 4)
+    return list(struct.unpack(f"<{len(text) // 4}I", text))
+
+
+def _make_bus(uart: UART) -> Bus:
+    bus = Bus(ram=PagedMemory())
+    bus.map(UART_BASE, uart)
+    bus.map(BLK_BASE, BlockDevice(num_sectors=4))
+    bus.load_program(PUTS_PROG)
+    bus.load_program(_string_words(b"Hello, bus!\n"), base_addr=0x100)
+    return bus
+
+
+# ------------------------------------------------------------
+# Test 1 — firmware prints through the UART; output is batched
+# ------------------------------------------------------------
+@pytest.mark.parametrize("engine", ["run", "run_fast", "run_blocks"])
+def test_uart_output_is_batched(engine):
+    out = io.BytesIO()
+    uart = UART(out)
+    bus = _make_bus(uart)
+    cpu = CPU(bus, bus)
+    if engine == "run":
+        cpu.run(max_steps=500, stop=StopConditions())
+        assert cpu.last_stop.reason == STOP_EBREAK
+    else:
+        getattr(cpu, engine)(2 + 5 * 12 + 3)    # up to and including the EBREAK
+        assert cpu.pc == 0x20
+    assert out.getvalue() == b""                # nothing written per character
+    bus.flush()
+    assert out.getvalue() == b"Hello, bus!\n"
+    assert (uart.flushes, uart.bytes_sent) == (1, 12)
+
+    # A small threshold flushes in chunks of that size
+    out = io.BytesIO()
+    uart = UART(out, flush_threshold=5)
+    bus = _make_bus(uart)
+    CPU(bus, bus).run(max_steps=500, stop=StopConditions())
+    assert (out.getvalue(), uart.flushes) == (b"Hello, bus", 2)
+
+
+# ------------------------------------------------------------
+# Test 2 — UART input and block device registers
+# ------------------------------------------------------------
+def test_uart_input_and_block_device():
+    bus = _make_bus(UART(io.BytesIO()))
+    uart, _ = bus.device_at(UART_BASE)
+    disk, _ = bus.device_at(BLK_BASE)
+    disk.image[SECTOR_SIZE:SECTOR_SIZE + 4] = b"\x78\x56\x34\x12"
+
+    assert bus.load_word(UART_BASE + UART_STATUS) == UART_TX_READY
+    uart.feed(b"ok")
+    assert bus.load_word(UART_BASE + UART_STATUS) == UART_TX_READY | UART_RX_AVAIL
+    assert [bus.load_byte(UART_BASE + UART_RX) for _ in range(3)] == [ord("o"), ord("k"), 0]
+
+    # Read sector 1, copy its first word to the second, write it back to sector 1
+    words = [
+        0x100010B7,   # 0x00: lui  x1, 0x10001
+        0x00100113,   # 0x04: addi x2, x0, 1
+        0x0020A023,   # 0x08: sw   x2, 0(x1)       BLK_SECTOR = 1
+        0x0020A223,   # 0x0C: sw   x2, 4(x1)       BLK_CMD = read
+        0x2000A283,   # 0x10: lw   x5, 0x200(x1)
+        0x0080A303,   # 0x14: lw   x6, 8(x1)       BLK_STATUS
+        0x2050A223,   # 0x18: sw   x5, 0x204(x1)
+        0x00200113,   # 0x1C: addi x2, x0, 2
+        0x0020A223,   # 0x20: sw   x2, 4(x1)       BLK_CMD = write
+        0x00100073,   # 0x24: ebreak
+    ]
+    bus.load_program(words)
+    cpu = CPU(bus, bus)
+    cpu.run(max_steps=100, stop=StopConditions())
+    assert (cpu.regs.read(5), cpu.regs.read(6)) == (0x1234_5678, 0)
+    assert disk.image[SECTOR_SIZE:SECTOR_SIZE + 8] == b"\x78\x56\x34\x12" * 2
+
+    assert bus.load_word(BLK_BASE + BLK_COUNT) == 4
+    bus.store_word(BLK_BASE, 99)                # no such sector
+    bus.store_word(BLK_BASE + 4, 1)
+    assert bus.load_word(BLK_BASE + BLK_STATUS) == BLK_ERROR
+    assert bus.load_half(BLK_BASE + BLK_BUFFER + 2) == 0x1234
+
+
+# ------------------------------------------------------------
+# Test 3 — mapping rules, bus errors and write-hook forwarding
+# ------------------------------------------------------------
+def test_bus_mapping_and_write_hooks():
+    with pytest.raises(TypeError, match="abstract"):
+        Device()                                 # read/write must be implemented
+
+    bus = Bus()
+    rom = bus.map(0x0, Memory(64))
+    ram = bus.map(0x8000_0000, Memory(1024))
+    with pytest.raises(ValueError, match="overlaps"):
+        bus.map(0x8000_0000, UART())
+    with pytest.raises(ValueError, match="page-aligned"):
+        bus.map(0x2000_0010, UART())
+    with pytest.raises(IndexError, match="no device"):
+        bus.load_word(0x4000_0000)
+    with pytest.raises(ValueError, match="Unaligned"):
+        bus.load_word(0x8000_0002)
+
+    bus.store_word(0x8000_0010, 7)
+    assert ram.load_word(0x10) == 7
+
+    # Self-modifying code in mapped RAM reaches the predecode cache
+    rom.load_program([0x00100093, 0x00100073])   # addi x1, x0, 1; ebreak
+    seen = []
+    bus.add_write_hook(lambda addr, n: seen.append((addr, n)))
+    cpu = CPU(bus, bus, predecode=True)
+    cpu.run(max_steps=10, stop=StopConditions())
+    assert cpu.regs.read(1) == 1
+    bus.store_word(0x0, 0x00200093)              # addi x1, x0, 2
+    bus.store_byte(0x8000_0004, 1)
+    assert seen == [(0x0, 1), (0x8000_0004, 1)]
+    cpu.reset()
+    cpu.run(max_steps=10, stop=StopConditions())
+    assert cpu.regs.read(1) == 2
+
+    # Like a Memory, the bus can be dumped without arguments
+    assert bus.dump_words() == rom.dump_words()
+    assert bus.dump_words(0x8000_0004) == ram.dump_words()[1:]
+    assert bus.dump_words(0x8000_0010, 1) == [7]
+
+    bus.unmap(0x8000_0000)
+    with pytest.raises(IndexError):
+        bus.load_word(0x8000_0000)
+    assert [base for base, _ in bus.devices] == [0x0]
+
+
+# ------------------------------------------------------------
+# Test 4 — forks and time travel fork RAM and share devices
+# ------------------------------------------------------------
+def test_bus_fork_and_time_travel():
+    out = io.BytesIO()
+    uart = UART(out, flush_threshold=1)
+    bus = _make_bus(uart)
+    scratch = bus.map(0x2000_0000, Memory(16))
+    cpu = CPU(bus, bus, predecode=True)
+    cpu.run(max_steps=7, stop=StopConditions())          # first byte sent
+
+    child = cpu.fork()
+    assert child.dmem is child.imem and child.dmem is not bus
+    assert child.dmem.device_at(UART_BASE)[0] is uart
+    child.dmem.store_word(0x100, 0x00216948)             # "Hi!" (H already sent)
+    scratch.store_word(0, 5)
+    child.run(max_steps=500, stop=StopConditions())
+    assert out.getvalue() == b"Hi!"
+    assert bus.load_word(0x100) == struct.unpack("<I", b"Hell")[0]
+    assert child.dmem.load_word(0x2000_0000) == 0
+
+    tt = TimeTravel(cpu, snapshot_every=8, max_journal=4)
+    cpu.run(max_steps=500, stop=StopConditions())
+    bus.store_word(0x2000_0000, 9)                       # not journaled
+    tt.goto_cycle(cpu.cycle - 40)                        # restores a snapshot
+    assert bus.load_word(0x2000_0000) == 5
+    with pytest.raises(ValueError, match="mappings"):
+        bus.restore(Bus())
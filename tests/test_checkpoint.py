@@ -0,0 +1,176 @@
+# tests/test_checkpoint.py
+import struct
+
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.array_memory import ArrayMemory
+from src.cpu_core.paged_memory import PagedMemory, MAP_COPY
+from src.cpu_core.datapath import CPU, StopConditions, STOP_EBREAK, STOP_EXIT, STOP_MAX_STEPS
+from src.cpu_core.syscalls import SyscallHandler
+from src.cpu_core.checkpoint import (
+    save_checkpoint,
+    load_checkpoint,
+    run_with_checkpoints,
+    list_checkpoints,
+    latest_checkpoint,
+)
+from src.cpu_core import run_cpu
+
+
+# Store a running sum to 2000 consecutive words from 0x100 (spans
+# several 4 KiB pages), then EBREAK.  10003 instructions in total.
+FILL_PROG = [
+    0x7D000513,   # 0x00: addi x10, x0, 2000
+    0x10000613,   # 0x04: addi x12, x0, 0x100
+    0x00A585B3,   # 0x08: add  x11, x11, x10
+    0x00B62023,   # 0x0C: sw   x11, 0(x12)
+    0x00460613,   # 0x10: addi x12, x12, 4
+    0xFFF50513,   # 0x14: addi x10, x10, -1
+    0xFE0518E3,   # 0x18: bne  x10, x0, -16
+    0x00100073,   # 0x1C: ebreak
+]
+TOTAL_STEPS = 10_003
+
+
+def _make_cpu(mem_factory) -> CPU:
+    imem = mem_factory()
+    imem.load_program(FILL_PROG)
+    return CPU(imem, mem_factory())
+
+
+def _final(cpu: CPU):
+    return cpu.get_state(), cpu.cycle, [cpu.dmem.load_word(4 * k) for k in range(4096)]
+
+
+# ------------------------------------------------------------
+# Test 1 — save mid-run, restore, finish: same result as one run
+# ------------------------------------------------------------
+@pytest.mark.parametrize("compress", [False, True])
+@pytest.mark.parametrize("mem_factory", [
+    lambda: Memory(8192),
+    lambda: ArrayMemory(8192),
+    lambda: PagedMemory(1 << 20),
+])
+def test_checkpoint_round_trip(tmp_path, mem_factory, compress):
+    stop = StopConditions()
+    reference = _make_cpu(mem_factory)
+    reference.run(max_steps=TOTAL_STEPS, stop=stop)
+
+    cpu = _make_cpu(mem_factory)
+    cpu.run(max_steps=6000, stop=stop)
+    path = tmp_path / "mid.rvck"
+    stored = cpu.save_checkpoint(str(path), compress=compress)
+    # IMEM page 0 plus the DMEM pages written so far; untouched pages are skipped
+    assert stored == 1 + 2
+
+    restored = CPU.load_checkpoint(str(path))
+    assert type(restored.dmem) is type(cpu.dmem)
+    assert (restored.get_state(), restored.cycle) == (cpu.get_state(), cpu.cycle)
+    restored.run(max_steps=TOTAL_STEPS, stop=stop)
+    assert restored.last_stop.reason == STOP_EBREAK
+    assert _final(restored) == _final(reference)
+
+
+# ------------------------------------------------------------
+# Test 2 — paged restore: fill pattern, mapped files, file untouched
+# ------------------------------------------------------------
+def test_paged_checkpoint_is_copy_on_write(tmp_path):
+    data = tmp_path / "data.bin"
+    data.write_bytes(struct.pack("<2I", 7, 8))
+    mem = PagedMemory()
+    mem.reset(0xAAAA_AAAA)
+    mem.map_file(str(data), 0x4000, mode=MAP_COPY)
+    mem.store_word(0x4004, 9)
+    mem.store_word(0x8000_0000, 1)
+    cpu = CPU(mem, mem, pc_reset=0x40)
+    cpu.regs.write(5, 0x1234)
+
+    path = tmp_path / "paged.rvck"
+    assert save_checkpoint(cpu, str(path)) == 2
+    saved = path.read_bytes()
+    mem.close()
+
+    restored = load_checkpoint(str(path))
+    rmem = restored.dmem
+    assert restored.imem is rmem and restored.pc == 0x40
+    assert restored.regs.read(5) == 0x1234
+    assert rmem.dump_words(0x4000, 3) == [7, 9, 0xAAAA_AAAA]
+    assert rmem.load_word(0x8000_0000) == 1
+    assert rmem.load_word(0x9000_0000) == 0xAAAA_AAAA
+
+    rmem.store_word(0x4000, 0)                   # copies the mapped page
+    assert rmem.load_word(0x4000) == 0
+    assert path.read_bytes() == saved
+
+    # The restored memory owns the file mapping; close() releases it
+    (mapping,) = rmem._backing
+    fork = rmem.fork()
+    rmem.close()
+    assert not mapping._mm.closed                # the fork still views it
+    fork.close()
+    assert mapping._mm.closed
+    assert rmem.load_word(0x8000_0000) == fork.load_word(0x8000_0000) == 1
+
+
+# ------------------------------------------------------------
+# Test 3 — periodic checkpoints and resume (API and CLI)
+# ------------------------------------------------------------
+def test_run_with_checkpoints_and_resume(tmp_path, capsys):
+    stop = StopConditions()
+    reference = _make_cpu(lambda: Memory(8192))
+    reference.run(max_steps=TOTAL_STEPS, stop=stop)
+
+    ckpt_dir = tmp_path / "ckpts"
+    cpu = _make_cpu(lambda: Memory(8192))
+    info = run_with_checkpoints(cpu, 4500, str(ckpt_dir), every=1000, stop=stop, keep=3)
+    assert info.reason == STOP_MAX_STEPS and info.steps == 4500
+    assert [p.rsplit("-", 1)[1] for p in list_checkpoints(str(ckpt_dir))] == [
+        "000000002000.rvck", "000000003000.rvck", "000000004000.rvck",
+    ]
+
+    resumed = load_checkpoint(latest_checkpoint(str(ckpt_dir)))
+    assert resumed.cycle == 4000
+    info = run_with_checkpoints(resumed, 20_000, str(ckpt_dir), every=1000, stop=stop)
+    assert info.reason == STOP_EBREAK and info.steps == TOTAL_STEPS - 4000
+    assert _final(resumed) == _final(reference)
+
+    # CLI (default 1024-word DMEM): 900 iterations, 4503 instructions
+    hex_path = tmp_path / "fill.hex"
+    words = [0x38400513] + FILL_PROG[1:]          # addi x10, x0, 900
+    hex_path.write_text("\n".join(f"{w:08X}" for w in words) + "\n")
+    cli_dir = tmp_path / "cli"
+    argv = [str(hex_path), "3500", "--checkpoint-dir", str(cli_dir),
+            "--checkpoint-every", "1000", "--compress"]
+    assert run_cpu.main(argv) == 0
+    assert "Total cycles: 3500" in capsys.readouterr().out
+
+    assert run_cpu.main([str(hex_path), "20000", "--checkpoint-dir", str(cli_dir),
+                         "--resume"]) == 0
+    out = capsys.readouterr().out
+    assert "Resumed from" in out and "(cycle 3000)" in out
+    assert "Total cycles: 4503" in out
+    assert f"x11 = 0x{sum(range(901)):08X}" in out
+
+
+# ------------------------------------------------------------
+# Test 4 — an exited guest stays exited after a restore
+# ------------------------------------------------------------
+def test_checkpoint_keeps_exit_code(tmp_path):
+    imem = Memory(16)
+    # addi a7, x0, 93 ; addi a0, x0, -3 ; ecall ; addi x5, x0, 1
+    imem.load_program([0x05D00893, 0xFFD00513, 0x00000073, 0x00100293])
+    cpu = CPU(imem, Memory(16))
+    cpu.syscalls = SyscallHandler()
+    assert cpu.run(max_steps=10, stop=StopConditions()).reason == STOP_EXIT
+    path = tmp_path / "exited.rvck"
+    save_checkpoint(cpu, str(path), compress=True)
+
+    restored = load_checkpoint(str(path))
+    assert restored.exit_code == -3
+    assert restored.run(max_steps=10).reason == STOP_EXIT
+    assert restored.cycle == 3 and restored.regs.read(5) == 0
+
+    cpu.exit_code = None                         # a running guest has none
+    save_checkpoint(cpu, str(path))
+    assert load_checkpoint(str(path)).exit_code is None
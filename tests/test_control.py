@@ -0,0 +1,61 @@
+# tests/test_control.py
+import dataclasses
+
+import pytest
+
+from src.cpu_core.isa import decode
+from src.cpu_core.control import (
+    ALU_ADD,
+    ALU_SUB,
+    ALU_NAMES,
+    BR_NONE,
+    BR_LTU,
+    BR_NAMES,
+    ControlSignals,
+    _compute_control,
+    control_for_word,
+    decode_control,
+)
+
+
+# ------------------------------------------------------------
+# Test 1 — the table agrees with the reference logic everywhere
+# ------------------------------------------------------------
+def test_table_matches_reference_for_every_key():
+    for opc in range(128):
+        for f3 in range(8):
+            for f7 in range(128):
+                word = opc | (f3 << 12) | (f7 << 25)
+                expected = _compute_control(opc, f3, f7)
+                assert control_for_word(word) == expected
+                if f7 in (0b0000000, 0b0100000, 0b1111111):
+                    # register fields must not affect the result
+                    assert decode_control(decode(word | 0x01FF_8F80)) == expected
+
+
+# ------------------------------------------------------------
+# Test 2 — bundles are shared, immutable and slotted
+# ------------------------------------------------------------
+def test_bundles_are_interned_and_immutable():
+    add_a = decode_control(decode(0x002081B3))   # add x3, x1, x2
+    add_b = decode_control(decode(0x007302B3))   # add x5, x6, x7
+    addi = decode_control(decode(0x00500093))    # addi x1, x0, 5
+    assert add_a is add_b
+    assert add_a is not addi
+
+    assert not hasattr(add_a, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        add_a.reg_write = False
+
+
+# ------------------------------------------------------------
+# Test 3 — ALU ops / branch conditions are small int codes
+# ------------------------------------------------------------
+def test_codes_are_small_ints():
+    sub = decode_control(decode(0x40110233))     # sub x4, x2, x1
+    bltu = decode_control(decode(0x0020E463))    # bltu x1, x2, +8
+    assert sub.alu_op == ALU_SUB and ALU_NAMES[sub.alu_op] == "SUB"
+    assert bltu.branch_cond == BR_LTU and BR_NAMES[bltu.branch_cond] == "LTU"
+    assert sub.branch_cond == BR_NONE
+    assert isinstance(ControlSignals.__slots__, tuple)
+    assert ALU_ADD == 0
@@ -1,6 +1,6 @@
 # tests/test_cpu_arith.py
 import pytest
-from src.cpu_core.datapath import SingleCycleCPU
+from src.cpu_core.datapath import SingleCycleCPU, StopConditions
 from src.cpu_core.memory import Memory
 
 
@@ -62,14 +62,8 @@ def run_hex_program(hex_text: str, max_steps: int = 200):
     # Instantiate the CPU
     cpu = SingleCycleCPU(imem, dmem)
 
-    # Execute instructions
-    for _ in range(max_steps):
-        cpu.step()
-
-        # Stop when EBREAK (0x00100073) is about to be fetched
-        if imem.load_word(cpu.pc) == 0x00100073:
-            cpu.step()  # Execute the EBREAK itself
-            break
+    # Execute instructions (the EBREAK itself is executed, then we stop)
+    cpu.run(max_steps=max_steps, stop=StopConditions())
 
     return cpu, imem, dmem
 
@@ -1,7 +1,7 @@
 # tests/test_cpu_arith_logic.py
 import pytest
 from src.cpu_core.memory import Memory
-from src.cpu_core.datapath import SingleCycleCPU
+from src.cpu_core.datapath import SingleCycleCPU, StopConditions
 
 
 # ------------------------------------------------------------
@@ -65,14 +65,8 @@ def run_hex_program(hex_text: str, max_steps: int = 200):
     # Create CPU instance
     cpu = SingleCycleCPU(imem, dmem)
 
-    # Execute instructions
-    for _ in range(max_steps):
-        cpu.step()
-
-        # Stop early if we hit ECALL (0x00100073)
-        if imem.load_word(cpu.pc) == 0x00100073:
-            cpu.step()   # Execute the ECALL itself
-            break
+    # Execute instructions, stopping once the EBREAK has executed
+    cpu.run(max_steps=max_steps, stop=StopConditions())
 
     return cpu, imem, dmem
 
@@ -0,0 +1,111 @@
+# tests/test_cpu_block_compiler.py
+import random
+
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import CPU
+
+
+# ------------------------------------------------------------
+# Loop program: sum 10..1 into x2, store it, load it back.
+# ------------------------------------------------------------
+LOOP_PROG = [
+    0x00A00093,   # 0x00: addi x1, x0, 10
+    0x00000113,   # 0x04: addi x2, x0, 0
+    0x00110133,   # 0x08: add  x2, x2, x1
+    0xFFF08093,   # 0x0C: addi x1, x1, -1
+    0xFE009CE3,   # 0x10: bne  x1, x0, -8
+    0x00202023,   # 0x14: sw   x2, 0(x0)
+    0x00002183,   # 0x18: lw   x3, 0(x0)
+    0x0000006F,   # 0x1C: jal  x0, 0
+]
+
+
+def _make_pair(words):
+    """Build two identical CPUs: one for run(), one for run_blocks()."""
+    cpus = []
+    for _ in range(2):
+        imem = Memory(256)
+        dmem = Memory(256)
+        imem.load_program(words)
+        cpus.append(CPU(imem, dmem))
+    return cpus
+
+
+def _assert_same(ref: CPU, blk: CPU) -> None:
+    assert blk.get_state() == ref.get_state()
+    assert blk.cycle == ref.cycle
+    assert blk.dmem.dump_words() == ref.dmem.dump_words()
+
+
+# ------------------------------------------------------------
+# Test 1 — loop program matches the interpreter at every budget
+# ------------------------------------------------------------
+@pytest.mark.parametrize("steps", [1, 3, 7, 20, 38, 100])
+def test_loop_matches_interpreter(steps):
+    ref, blk = _make_pair(LOOP_PROG)
+    ref.run(max_steps=steps)
+    blk.run_blocks(max_steps=steps)
+    _assert_same(ref, blk)
+
+    if steps == 100:
+        assert blk.regs.read(2) == 55
+        assert blk.regs.read(3) == 55
+
+
+# ------------------------------------------------------------
+# Test 2 — random straight-line ALU code is bit-exact
+# ------------------------------------------------------------
+def _random_alu_word(rng: random.Random) -> int:
+    opcode = rng.choice([0x33, 0x13, 0x37, 0x17])
+    funct7 = rng.choice([0x00, 0x20, rng.getrandbits(7)])
+    word = rng.getrandbits(32) & ~0x7F | opcode
+    if opcode in (0x33, 0x13):
+        word = (word & 0x01FF_FFFF) | (funct7 << 25)
+    return word
+
+
+def test_random_alu_blocks_bit_exact():
+    rng = random.Random(440)
+    for _ in range(20):
+        prog = [_random_alu_word(rng) for _ in range(100)]
+        ref, blk = _make_pair(prog)
+        ref.run(max_steps=100)
+        blk.run_blocks(max_steps=100)
+        _assert_same(ref, blk)
+
+
+# ------------------------------------------------------------
+# Test 3 — a faulting load leaves PC/cycle where step() would
+# ------------------------------------------------------------
+def test_faulting_load_state_matches():
+    prog = [
+        0x00100093,   # addi x1, x0, 1
+        0x00200113,   # addi x2, x0, 2
+        0x0000A183,   # lw   x3, 0(x1)   -> unaligned
+    ]
+    ref, blk = _make_pair(prog)
+    with pytest.raises(ValueError):
+        ref.run(max_steps=10)
+    with pytest.raises(ValueError):
+        blk.run_blocks(max_steps=10)
+    _assert_same(ref, blk)
+    assert blk.pc == 8 and blk.cycle == 2
+
+
+# ------------------------------------------------------------
+# Test 4 — IMEM writes invalidate compiled blocks
+# ------------------------------------------------------------
+def test_imem_write_invalidates_block():
+    _, blk = _make_pair([0x00500093, 0x0000006F])   # addi x1,x0,5 ; jal x0,0
+    blk.run_blocks(max_steps=2)
+    assert blk.regs.read(1) == 5
+    assert len(blk._blocks) == 1
+
+    blk.imem.store_word(0, 0x00700093)              # addi x1, x0, 7
+    assert len(blk._blocks) == 0
+
+    blk.reset()
+    blk.run_blocks(max_steps=2)
+    assert blk.regs.read(1) == 7
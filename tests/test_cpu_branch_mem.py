@@ -1,7 +1,7 @@
 # tests/test_cpu_branch_mem.py
 import pytest
 from src.cpu_core.memory import Memory
-from src.cpu_core.datapath import SingleCycleCPU
+from src.cpu_core.datapath import SingleCycleCPU, StopConditions
 
 
 # ------------------------------------------------------------
@@ -64,14 +64,8 @@ def run_hex_program(hex_text: str, max_steps: int = 200):
     # Instantiate CPU
     cpu = SingleCycleCPU(imem, dmem)
 
-    # Execute instructions
-    for _ in range(max_steps):
-        cpu.step()
-
-        # Stop when we encounter EBREAK
-        if imem.load_word(cpu.pc) == 0x00100073:
-            cpu.step()     # Execute EBREAK
-            break
+    # Execute instructions until EBREAK has executed
+    cpu.run(max_steps=max_steps, stop=StopConditions())
 
     return cpu, imem, dmem
 
@@ -0,0 +1,130 @@
+# tests/test_cpu_fork.py
+import struct
+
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.array_memory import ArrayMemory
+from src.cpu_core.datapath import CPU, StopConditions
+from src.cpu_core.paged_memory import PagedMemory, MAP_COPY, MAP_WRITEBACK
+from src.cpu_core.run_cpu import run_words
+
+
+# x10 = input; loop: x11 += x10, x10 -= 1 until zero; sw x11, 0(x12); ebreak
+SUM_PROG = [
+    0x00050863,   # 0x00: beq  x10, x0, +16
+    0x00A585B3,   # 0x04: add  x11, x11, x10
+    0xFFF50513,   # 0x08: addi x10, x10, -1
+    0xFF5FF06F,   # 0x0C: jal  x0, -12
+    0x00B62023,   # 0x10: sw   x11, 0(x12)
+    0x00100073,   # 0x14: ebreak
+]
+
+
+def _make_cpu(words, mem_factory) -> CPU:
+    imem = mem_factory()
+    imem.load_program(words)
+    return CPU(imem, mem_factory(), predecode=True)
+
+
+# ------------------------------------------------------------
+# Test 1 — pages are shared until the first write on either side
+# ------------------------------------------------------------
+def test_paged_fork_is_copy_on_write():
+    parent = PagedMemory()
+    parent.store_word(0x1000, 1)
+    parent.store_word(0x8000_0000, 2)
+    parent.load_word(0x1000)                     # warm the page caches
+
+    child = parent.fork()
+    assert child._pages[1] is parent._pages[1]   # nothing copied yet
+
+    child.store_word(0x1004, 3)
+    parent.store_word(0x1000, 4)
+    assert (parent.load_word(0x1000), parent.load_word(0x1004)) == (4, 0)
+    assert (child.load_word(0x1000), child.load_word(0x1004)) == (1, 3)
+    assert child._pages[0x80000] is parent._pages[0x80000]
+
+    grandchild = child.fork()
+    grandchild.store_byte(0x8000_0000, 0xFF)
+    assert child.load_word(0x8000_0000) == 2
+    assert grandchild.load_word(0x8000_0000) == 0xFF
+
+
+# ------------------------------------------------------------
+# Test 2 — what-if runs from a forked CPU match fresh runs
+# ------------------------------------------------------------
+@pytest.mark.parametrize("mem_factory", [
+    lambda: Memory(64),
+    lambda: ArrayMemory(64),
+    lambda: PagedMemory(1 << 16),
+])
+def test_cpu_fork_explores_variants(mem_factory):
+    stop = StopConditions()
+    parent = _make_cpu(SUM_PROG, mem_factory)
+    parent.regs.write(10, 5)
+    parent.regs.write(12, 0x40)
+    parent.run(max_steps=7, stop=stop)           # part-way through the loop
+    snapshot = (parent.get_state(), parent.cycle)
+
+    results = []
+    for extra in (0, 100, 1000):
+        child = parent.fork()
+        child.regs.write(11, child.regs.read(11) + extra)
+        child.run(max_steps=100, stop=stop)
+        results.append(child.dmem.load_word(0x40))
+        assert child.cycle > snapshot[1]
+
+    assert results == [15, 115, 1015]
+    assert (parent.get_state(), parent.cycle) == snapshot
+    assert parent.dmem.load_word(0x40) == 0
+
+    # The parent can still finish on its own
+    parent.run(max_steps=100, stop=stop)
+    assert parent.dmem.load_word(0x40) == 15
+
+
+# ------------------------------------------------------------
+# Test 3 — forks of file mappings stay private
+# ------------------------------------------------------------
+def test_fork_with_cow_mapping(tmp_path):
+    data = tmp_path / "data.bin"
+    data.write_bytes(struct.pack("<3I", 10, 20, 30))
+
+    parent = PagedMemory()
+    parent.map_file(str(data), 0x4000, mode=MAP_COPY)
+    parent.store_word(0x4000, 11)                # before the fork: in the mapping
+
+    child = parent.fork()
+    child.store_word(0x4004, 21)
+    parent.store_word(0x4008, 31)
+    assert parent.dump_words(0x4000, 3) == [11, 20, 31]
+    assert child.dump_words(0x4000, 3) == [11, 21, 30]
+
+    child.close()                                # parent's mapping stays open
+    assert parent.load_word(0x4004) == 20
+    parent.close()
+    assert struct.unpack("<3I", data.read_bytes()) == (10, 20, 30)
+
+    wb = PagedMemory()
+    wb.map_file(str(data), 0, mode=MAP_WRITEBACK)
+    with pytest.raises(ValueError, match="writeback"):
+        wb.fork()
+    wb.close()
+
+
+# ------------------------------------------------------------
+# Test 4 — run_words(paged=True) builds CPUs that fork copy-on-write
+# ------------------------------------------------------------
+def test_paged_runner_forks_cheaply():
+    prog = [0x00500513, 0x04000613] + SUM_PROG     # x10 = 5, x12 = 0x40
+    dense = run_words(prog, dmem_words=64)
+    paged = run_words(prog, dmem_words=64, paged=True)
+    assert isinstance(paged.dmem, PagedMemory) and paged.dmem.size_bytes == 256
+    assert (paged.pc, paged.regs.dump(), paged.cycle) == (dense.pc, dense.regs.dump(), dense.cycle)
+    assert paged.dmem.dump_words(0, 64) == dense.dmem.dump_words()
+
+    child = paged.fork()
+    assert child.dmem._pages[0] is paged.dmem._pages[0]
+    with pytest.raises(IndexError):
+        paged.dmem.load_word(256)                   # same bounds as the dense run
@@ -0,0 +1,119 @@
+# tests/test_cpu_fusion.py
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import CPU, StopConditions, STOP_EBREAK
+from src.cpu_core.fusion import (
+    FUSE_LUI_ADDI,
+    FUSE_AUIPC_JALR,
+    FUSE_AUIPC_LW,
+    FUSE_CMP_BRANCH,
+)
+
+
+# ------------------------------------------------------------
+# Program containing one of each fusable idiom
+# ------------------------------------------------------------
+IDIOMS = [
+    0x123452B7,   # 0x00: lui   x5, 0x12345
+    0x67828293,   # 0x04: addi  x5, x5, 0x678
+    0x00000317,   # 0x08: auipc x6, 0
+    0x02032383,   # 0x0C: lw    x7, 0x20(x6)      (DMEM 0x28)
+    0x00500513,   # 0x10: addi  x10, x0, 5
+    0x00000593,   # 0x14: addi  x11, x0, 0
+    0x00158593,   # 0x18: addi  x11, x11, 1
+    0x00A5A633,   # 0x1C: slt   x12, x11, x10
+    0xFE061CE3,   # 0x20: bne   x12, x0, -8
+    0x00000697,   # 0x24: auipc x13, 0
+    0x00C680E7,   # 0x28: jalr  x1, 12(x13)       (-> 0x30)
+    0x06300713,   # 0x2C: addi  x14, x0, 99       (skipped)
+    0x00100073,   # 0x30: ebreak
+]
+
+SUB_LOOP = [
+    0x00300093,   # 0x00: addi x1, x0, 3
+    0xFFF08093,   # 0x04: addi x1, x1, -1
+    0x40008133,   # 0x08: sub  x2, x1, x0
+    0x00010463,   # 0x0C: beq  x2, x0, +8
+    0xFF5FF06F,   # 0x10: jal  x0, -12
+    0x00100073,   # 0x14: ebreak
+]
+
+
+def _make_cpu(words, fuse: bool) -> CPU:
+    imem = Memory(256)
+    dmem = Memory(256)
+    imem.load_program(words)
+    dmem.store_word(0x28, 0xCAFEF00D)
+    return CPU(imem, dmem, fuse=fuse)
+
+
+def _assert_same(ref: CPU, fused: CPU) -> None:
+    assert fused.get_state() == ref.get_state()
+    assert fused.cycle == ref.cycle
+
+
+# ------------------------------------------------------------
+# Test 1 — every idiom fuses and the final state is identical
+# ------------------------------------------------------------
+def test_idioms_fuse_with_identical_state():
+    ref = _make_cpu(IDIOMS, fuse=False)
+    fused = _make_cpu(IDIOMS, fuse=True)
+    ref_info = ref.run(max_steps=100, stop=StopConditions())
+    info = fused.run(max_steps=100, stop=StopConditions())
+
+    _assert_same(ref, fused)
+    assert info == ref_info
+    assert info.reason == STOP_EBREAK
+    assert fused.regs.read(5) == 0x12345678
+    assert fused.regs.read(7) == 0xCAFEF00D
+    assert fused.regs.read(14) == 0
+
+    stats = fused.fusion.executed
+    assert stats[FUSE_LUI_ADDI] == 1
+    assert stats[FUSE_AUIPC_LW] == 1
+    assert stats[FUSE_AUIPC_JALR] == 1
+    assert stats[FUSE_CMP_BRANCH] == 5     # one per loop iteration
+    assert fused.fusion.fused_count == 8
+
+
+# ------------------------------------------------------------
+# Test 2 — sub+beq loop, compared at every step budget
+# ------------------------------------------------------------
+@pytest.mark.parametrize("steps", range(1, 16))
+def test_sub_branch_every_budget(steps):
+    ref = _make_cpu(SUB_LOOP, fuse=False)
+    fused = _make_cpu(SUB_LOOP, fuse=True)
+    ref.run(max_steps=steps)
+    info = fused.run(max_steps=steps)
+
+    _assert_same(ref, fused)
+    assert info.steps == steps
+
+
+# ------------------------------------------------------------
+# Test 3 — a target PC between the pair disables fusion there
+# ------------------------------------------------------------
+def test_target_pc_inside_pair():
+    fused = _make_cpu(IDIOMS, fuse=True)
+    info = fused.run(max_steps=100, stop=StopConditions(target_pc=0x04))
+    assert info.pc == 0x04 and info.steps == 1
+    assert fused.regs.read(5) == 0x12345000
+
+
+# ------------------------------------------------------------
+# Test 4 — faulting load inside auipc+lw matches step()
+# ------------------------------------------------------------
+def test_fused_load_fault_matches_step():
+    prog = [
+        0x00000317,   # auipc x6, 0
+        0x00232383,   # lw    x7, 2(x6)   -> unaligned
+    ]
+    ref = _make_cpu(prog, fuse=False)
+    fused = _make_cpu(prog, fuse=True)
+    with pytest.raises(ValueError):
+        ref.run(max_steps=10)
+    with pytest.raises(ValueError):
+        fused.run(max_steps=10)
+    _assert_same(ref, fused)
+    assert fused.pc == 4 and fused.cycle == 1
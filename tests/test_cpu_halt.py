@@ -0,0 +1,97 @@
+# tests/test_cpu_halt.py
+from pathlib import Path
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import (
+    CPU,
+    StopConditions,
+    STOP_EBREAK,
+    STOP_ECALL,
+    STOP_MAX_STEPS,
+    STOP_SELF_LOOP,
+    STOP_TARGET_PC,
+    STOP_TIMEOUT,
+)
+from src.cpu_core.run_cpu import run_program
+
+
+# ------------------------------------------------------------
+# Helper: resolve path to programs/*.hex
+# ------------------------------------------------------------
+def _hex_path(name: str) -> Path:
+    return Path(__file__).parent / "programs" / name
+
+
+def _make_cpu(words) -> CPU:
+    imem = Memory(256)
+    imem.load_program(words)
+    return CPU(imem, Memory(256))
+
+
+# ------------------------------------------------------------
+# Test 1 — EBREAK and ECALL halt after executing
+# ------------------------------------------------------------
+def test_ebreak_and_ecall_halt():
+    cpu = _make_cpu([0x00500093, 0x00100073, 0x00700093])
+    info = cpu.run(max_steps=100, stop=StopConditions())
+    assert (info.reason, info.steps, info.pc) == (STOP_EBREAK, 2, 8)
+    assert cpu.regs.read(1) == 5
+    assert cpu.last_stop is info
+
+    cpu = _make_cpu([0x00500093, 0x00000073, 0x00700093])
+    info = cpu.run(max_steps=100, stop=StopConditions())
+    assert (info.reason, info.steps) == (STOP_ECALL, 2)
+
+    # Disabled conditions run straight through
+    cpu = _make_cpu([0x00100073] * 4)
+    info = cpu.run(max_steps=3, stop=StopConditions(halt_on_ebreak=False))
+    assert (info.reason, info.steps, cpu.cycle) == (STOP_MAX_STEPS, 3, 3)
+
+
+# ------------------------------------------------------------
+# Test 2 — prog.hex stops at its final 'jal x0, 0'
+# ------------------------------------------------------------
+def test_run_program_stops_on_self_loop():
+    cpu = run_program(str(_hex_path("prog.hex")))
+    assert cpu.last_stop.reason == STOP_SELF_LOOP
+    assert cpu.cycle == 6
+    assert cpu.pc == 0x14
+    assert cpu.regs.read(4) == 43
+
+    # stop=None restores the old "burn the whole budget" behaviour
+    cpu = run_program(str(_hex_path("prog.hex")), max_steps=40, stop=None)
+    assert cpu.cycle == 40
+    assert cpu.last_stop.reason == STOP_MAX_STEPS
+
+
+# ------------------------------------------------------------
+# Test 3 — jalr that rewrites its own base is not a self-loop
+# ------------------------------------------------------------
+def test_jalr_rewriting_base_is_not_self_loop():
+    cpu = _make_cpu([
+        0x00400093,   # 0x00: addi x1, x0, 4
+        0x000080E7,   # 0x04: jalr x1, 0(x1)   -> jumps to 4, x1 = 8
+        0x00100073,   # 0x08: ebreak
+    ])
+    info = cpu.run(max_steps=10, stop=StopConditions())
+    assert info.reason == STOP_EBREAK
+    assert cpu.cycle == 4
+
+
+# ------------------------------------------------------------
+# Test 4 — target PC and wall-clock budget
+# ------------------------------------------------------------
+def test_target_pc_and_timeout():
+    cpu = _make_cpu([0x00100093, 0x00200113, 0x00300193, 0x0000006F])
+    info = cpu.run(max_steps=100, stop=StopConditions(target_pc=8))
+    assert (info.reason, info.steps, cpu.pc) == (STOP_TARGET_PC, 2, 8)
+    assert cpu.regs.read(3) == 0
+
+    spin = _make_cpu([0x0000006F])    # jal x0, 0 forever
+    info = spin.run(
+        max_steps=10_000_000,
+        stop=StopConditions(halt_on_self_loop=False, time_budget=0.0,
+                            check_every=64),
+    )
+    assert info.reason == STOP_TIMEOUT
+    assert info.steps == 64
@@ -0,0 +1,91 @@
+# tests/test_cpu_predecode.py
+from pathlib import Path
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import CPU
+from src.cpu_core.prog_loader import load_prog_hex
+
+
+# ------------------------------------------------------------
+# Helper: resolve path to programs/*.hex
+# ------------------------------------------------------------
+def _hex_path(name: str) -> Path:
+    return Path(__file__).parent / "programs" / name
+
+
+def _make_cpu(words, predecode: bool):
+    imem = Memory(256)
+    dmem = Memory(256)
+    imem.load_program(words)
+    return CPU(imem, dmem, predecode=predecode), imem
+
+
+# ------------------------------------------------------------
+# Test 1 — cached and uncached runs reach the same state
+# ------------------------------------------------------------
+def test_predecode_matches_plain_step():
+    words = load_prog_hex(str(_hex_path("prog.hex")))
+
+    plain, _ = _make_cpu(words, predecode=False)
+    cached, _ = _make_cpu(words, predecode=True)
+    plain.run(max_steps=50)
+    cached.run(max_steps=50)
+
+    assert cached.get_state() == plain.get_state()
+    assert cached.cycle == plain.cycle == 50
+
+    # Six distinct instruction words, each decoded exactly once
+    assert cached.icache.misses == len(words)
+    assert len(cached.icache) == len(words)
+
+
+# ------------------------------------------------------------
+# Test 2 — store_word into IMEM invalidates the cached entry
+# ------------------------------------------------------------
+def test_store_word_invalidates_entry():
+    cpu, imem = _make_cpu([0x00500093], predecode=True)  # addi x1, x0, 5
+    cpu.step()
+    assert cpu.regs.read(1) == 5
+
+    imem.store_word(0, 0x00700093)                          # addi x1, x0, 7
+    cpu.reset()
+    cpu.step()
+    assert cpu.regs.read(1) == 7
+
+
+# ------------------------------------------------------------
+# Test 3 — load_program over cached words invalidates them
+# ------------------------------------------------------------
+def test_load_program_invalidates_entries():
+    cpu, imem = _make_cpu([0x00500093, 0x00600113], predecode=True)
+    cpu.run(max_steps=2)
+    assert len(cpu.icache) == 2
+
+    imem.load_program([0x00100093, 0x00200113])
+    assert len(cpu.icache) == 0
+
+    cpu.reset()
+    cpu.run(max_steps=2)
+    assert cpu.regs.read(1) == 1
+    assert cpu.regs.read(2) == 2
+
+
+# ------------------------------------------------------------
+# Test 4 — self-modifying code when IMEM and DMEM are shared
+# ------------------------------------------------------------
+def test_self_modifying_store_is_seen():
+    mem = Memory(256)
+    mem.load_program([
+        0x00100093,   # 0x00: addi x1, x0, 1
+        0x00C02103,   # 0x04: lw   x2, 12(x0)     (x2 = addi x1, x0, 9)
+        0x00202423,   # 0x08: sw   x2, 8(x0)      (overwrites this sw)
+        0x00900093,   # 0x0C: addi x1, x0, 9
+    ])
+    cpu = CPU(mem, mem, predecode=True)
+    cpu.run(max_steps=3)
+    assert mem.load_word(8) == 0x00900093
+
+    # Re-run the patched word: it must execute as addi x1, x0, 9
+    cpu.pc = 8
+    cpu.step()
+    assert cpu.regs.read(1) == 9
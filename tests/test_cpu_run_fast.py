@@ -0,0 +1,120 @@
+# tests/test_cpu_run_fast.py
+import random
+from pathlib import Path
+
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import CPU
+from src.cpu_core.prog_loader import load_prog_hex
+
+
+# ------------------------------------------------------------
+# Helper: resolve path to programs/*.hex
+# ------------------------------------------------------------
+def _hex_path(name: str) -> Path:
+    return Path(__file__).parent / "programs" / name
+
+
+def _make_pair(words, dmem_words: int = 256):
+    """Build two identical CPUs: one for run(), one for run_fast()."""
+    cpus = []
+    for _ in range(2):
+        imem = Memory(256)
+        dmem = Memory(dmem_words)
+        imem.load_program(words)
+        cpus.append(CPU(imem, dmem))
+    return cpus
+
+
+def _assert_same(ref: CPU, fast: CPU) -> None:
+    assert fast.get_state() == ref.get_state()
+    assert fast.cycle == ref.cycle
+    assert fast.last_instr == ref.last_instr
+    assert fast.dmem.dump_words() == ref.dmem.dump_words()
+
+
+# ------------------------------------------------------------
+# Test 1 — prog.hex reaches the same final state
+# ------------------------------------------------------------
+def test_prog_hex_matches_run():
+    words = load_prog_hex(str(_hex_path("prog.hex")))
+    ref, fast = _make_pair(words)
+    ref.run(max_steps=50)
+    fast.run_fast(max_steps=50)
+    _assert_same(ref, fast)
+    assert fast.regs.read(4) == 43
+
+
+# ------------------------------------------------------------
+# Test 2 — random ALU / load / store / branch mix is bit-exact
+# ------------------------------------------------------------
+def _random_word(rng: random.Random) -> int:
+    kind = rng.choice(["op", "opimm", "lui", "auipc", "lw", "sw", "br"])
+    rd = rng.randrange(32)
+    rs1 = rng.randrange(32)
+    rs2 = rng.randrange(32)
+    f3 = rng.randrange(8)
+    if kind == "op":
+        f7 = rng.choice([0x00, 0x20])
+        return (f7 << 25) | (rs2 << 20) | (rs1 << 15) | (f3 << 12) | (rd << 7) | 0x33
+    if kind == "opimm":
+        return (rng.getrandbits(12) << 20) | (rs1 << 15) | (f3 << 12) | (rd << 7) | 0x13
+    if kind == "lui":
+        return (rng.getrandbits(20) << 12) | (rd << 7) | 0x37
+    if kind == "auipc":
+        return (rng.getrandbits(20) << 12) | (rd << 7) | 0x17
+    if kind == "lw":   # lw rd, off(x0) with an aligned in-range offset
+        return ((rng.randrange(64) * 4) << 20) | (0b010 << 12) | (rd << 7) | 0x03
+    if kind == "sw":   # sw rs2, off(x0)
+        off = rng.randrange(64) * 4
+        return ((off >> 5) << 25) | (rs2 << 20) | (0b010 << 12) | ((off & 0x1F) << 7) | 0x23
+    # forward branch over one instruction: imm = +8
+    return (rs2 << 20) | (rs1 << 15) | (rng.choice([0, 1, 4, 5, 6, 7]) << 12) | (8 << 7) | 0x63
+
+
+def test_random_program_bit_exact():
+    rng = random.Random(2024)
+    for _ in range(20):
+        prog = [_random_word(rng) for _ in range(200)] + [0x0000006F]
+        ref, fast = _make_pair(prog)
+        ref.run(max_steps=250)
+        fast.run_fast(max_steps=250)
+        _assert_same(ref, fast)
+
+
+# ------------------------------------------------------------
+# Test 3 — access faults raise the same errors and keep state
+# ------------------------------------------------------------
+@pytest.mark.parametrize("word, exc", [
+    (0x0020A183, ValueError),    # lw x3, 2(x1)     -> unaligned
+    (0x0000A023, IndexError),    # sw x0, 0(x1)     -> x1 = 0x7FC past DMEM
+])
+def test_access_faults_match(word, exc):
+    prog = [
+        0x7FC00093,   # addi x1, x0, 0x7FC
+        0x00500113,   # addi x2, x0, 5
+        word,
+    ]
+    ref, fast = _make_pair(prog)
+    with pytest.raises(exc) as ref_err:
+        ref.run(max_steps=10)
+    with pytest.raises(exc) as fast_err:
+        fast.run_fast(max_steps=10)
+
+    assert str(fast_err.value) == str(ref_err.value)
+    _assert_same(ref, fast)
+    assert fast.pc == 8 and fast.cycle == 2
+
+
+# ------------------------------------------------------------
+# Test 4 — running off the end of IMEM faults like run()
+# ------------------------------------------------------------
+def test_fetch_past_imem_raises():
+    imem = Memory(2)
+    imem.load_program([0x00100093, 0x00200113])
+    cpu = CPU(imem, Memory(4))
+    with pytest.raises(IndexError):
+        cpu.run_fast(max_steps=5)
+    assert cpu.pc == 8 and cpu.cycle == 2
+    assert cpu.regs.read(2) == 2 and cpu.last_instr == 0x00200113
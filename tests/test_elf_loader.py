@@ -0,0 +1,158 @@
+# tests/test_elf_loader.py
+import struct
+
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.array_memory import ArrayMemory
+from src.cpu_core.paged_memory import PagedMemory
+from src.cpu_core.datapath import CPU, StopConditions, STOP_EBREAK
+from src.cpu_core.elf_loader import load_elf, parse_elf, read_elf, PF_R, PF_W, PF_X, STT_FUNC
+from src.cpu_core import run_cpu
+
+
+# Loads a word from the data segment one page above the code, adds
+# the first .bss word (must read as 0) and stores the sum after it.
+TEXT = [
+    0x00001297,   # 0x00: auipc x5, 1             # x5 = data segment
+    0x0002A303,   # 0x04: lw   x6, 0(x5)
+    0x0042A383,   # 0x08: lw   x7, 4(x5)          # .bss
+    0x00730433,   # 0x0C: add  x8, x6, x7
+    0x0082A423,   # 0x10: sw   x8, 8(x5)
+    0x00100073,   # 0x14: ebreak
+]
+BASE = 0x8000_0000
+
+
+def _make_elf(segments, entry, symbols=(), machine=243, ident_class=1, ident_data=1):
+    """
+    Build a minimal ELF32 file.  segments: (vaddr, data, memsz, flags);
+    symbols: (name, value, size, type).
+    """
+    phoff = 52
+    offset = phoff + 32 * len(segments)
+    phdrs, bodies = b"", b""
+    for vaddr, data, memsz, flags in segments:
+        phdrs += struct.pack("<8I", 1, offset + len(bodies), vaddr, vaddr,
+                             len(data), memsz, flags, 4)
+        bodies += data
+
+    strtab = b"\0"
+    symtab = bytes(16)                              # index 0: null symbol
+    for name, value, size, kind in symbols:
+        symtab += struct.pack("<IIIBBH", len(strtab), value, size, 0x10 | kind, 0, 1)
+        strtab += name.encode() + b"\0"
+
+    strtab_off = offset + len(bodies)
+    symtab_off = strtab_off + len(strtab)
+    shoff = symtab_off + len(symtab)
+    shdrs = bytes(40)
+    shdrs += struct.pack("<10I", 0, 2, 0, 0, symtab_off, len(symtab), 2, 1, 4, 16)
+    shdrs += struct.pack("<10I", 0, 3, 0, 0, strtab_off, len(strtab), 0, 0, 1, 0)
+
+    ident = b"\x7fELF" + bytes([ident_class, ident_data, 1]) + bytes(9)
+    ehdr = struct.pack("<16sHHIIIIIHHHHHH", ident, 2, machine, 1, entry,
+                       phoff, shoff, 0, 52, 32, len(segments), 40, 3, 0)
+    return ehdr + phdrs + bodies + strtab + symtab + shdrs
+
+
+def _program_elf(tmp_path, name="prog.elf", **kwargs):
+    text = struct.pack(f"<{len(TEXT)}I", *TEXT)
+    data = struct.pack("<I", 0x1122_3344)
+    path = tmp_path / name
+    path.write_bytes(_make_elf(
+        [(BASE, text, len(text), PF_R | PF_X), (BASE + 0x1000, data, 16, PF_R | PF_W)],
+        entry=BASE,
+        symbols=[("_start", BASE, len(text), STT_FUNC), ("value", BASE + 0x1000, 4, 1)],
+        **kwargs,
+    ))
+    return path
+
+
+# ------------------------------------------------------------
+# Test 1 — segments land at their addresses, .bss is zeroed, runs
+# ------------------------------------------------------------
+def test_load_and_run_unified(tmp_path):
+    path = _program_elf(tmp_path)
+    mem = PagedMemory()
+    mem.reset(0xAAAA_AAAA)                          # .bss must not inherit this
+    image = load_elf(str(path), mem)
+
+    assert image.entry == BASE
+    assert mem.dump_words(BASE, len(TEXT)) == TEXT
+    assert mem.dump_words(BASE + 0x1000, 5) == [0x1122_3344, 0, 0, 0, 0xAAAA_AAAA]
+
+    cpu = CPU(mem, mem, pc_reset=image.entry)
+    assert cpu.run(max_steps=100, stop=StopConditions()).reason == STOP_EBREAK
+    assert mem.load_word(BASE + 0x1008) == 0x1122_3344
+
+    # A large .bss allocates no pages, but still clears earlier data
+    big = tmp_path / "bss.elf"
+    big.write_bytes(_make_elf([(BASE, b"\x01\x02", 64 << 20, PF_R | PF_W)], entry=BASE))
+    mem = PagedMemory()
+    mem.store_word(BASE + (32 << 20), 5)
+    load_elf(str(big), mem)
+    assert mem.num_pages == 2
+    assert mem.load_word(BASE) == 0x0201 and mem.load_word(BASE + (32 << 20)) == 0
+
+
+# ------------------------------------------------------------
+# Test 2 — separate word memories, unaligned segment edges
+# ------------------------------------------------------------
+@pytest.mark.parametrize("dmem_factory", [Memory, ArrayMemory])
+def test_load_harvard_unaligned(tmp_path, dmem_factory):
+    code = struct.pack("<2I", 0x0050_0093, 0x0010_0073)
+    path = tmp_path / "harvard.elf"
+    path.write_bytes(_make_elf(
+        [(0x0, code, 8, PF_R | PF_X), (0x102, b"\x01\x02\x03", 5, PF_R | PF_W)],
+        entry=0,
+    ))
+    imem, dmem = Memory(128), dmem_factory(128)
+    dmem.reset(0xFFFF_FFFF)
+    load_elf(str(path), imem, dmem)
+
+    # Code goes to both memories, data only to DMEM; neighbours survive
+    assert [imem.load_word(0), imem.load_word(4), imem.load_word(0x100)] == [0x0050_0093, 0x0010_0073, 0]
+    assert [dmem.load_word(a) for a in (0x0, 0x100, 0x104, 0x108)] == [
+        0x0050_0093, 0x0201_FFFF, 0xFF00_0003, 0xFFFF_FFFF,
+    ]
+
+
+# ------------------------------------------------------------
+# Test 3 — symbol table and rejected files
+# ------------------------------------------------------------
+def test_symbols_and_errors(tmp_path):
+    image = read_elf(str(_program_elf(tmp_path)))
+    assert image.symbols["_start"].value == BASE
+    assert image.symbols["_start"].type == STT_FUNC
+    assert image.symbols["value"].size == 4
+    assert image.symbol_at(BASE + 0xC).name == "_start"
+    assert image.symbol_at(BASE + 0x1002).name == "value"
+    assert image.symbol_at(BASE + 0x800) is None
+
+    for kwargs, message in [
+        (dict(machine=62), "not RISC-V"),
+        (dict(ident_class=2), "32-bit"),
+        (dict(ident_data=2), "little-endian"),
+    ]:
+        data = _program_elf(tmp_path, "bad.elf", **kwargs).read_bytes()
+        with pytest.raises(ValueError, match=message):
+            parse_elf(data)
+    with pytest.raises(ValueError, match="Not an ELF"):
+        parse_elf(b"00500093\n")
+    good = _program_elf(tmp_path).read_bytes()
+    with pytest.raises(ValueError, match="Truncated"):
+        parse_elf(good[:100])
+
+
+# ------------------------------------------------------------
+# Test 4 — CLI detects ELF files and starts at the entry point
+# ------------------------------------------------------------
+def test_cli_runs_elf(tmp_path, capsys):
+    path = _program_elf(tmp_path)
+    assert run_cpu.main([str(path)]) == 0
+    out = capsys.readouterr().out
+    assert "Stop reason: ebreak" in out
+    assert "x08 = 0x11223344" in out
+    assert "x02 = 0x7FFFFFF0" in out
+    assert f"Final PC  = 0x{BASE + 0x18:08X}" in out
@@ -0,0 +1,141 @@
+# tests/test_image_cache.py
+import os
+
+import pytest
+
+from src.cpu_core.image_cache import ImageCache, IMAGE_SUFFIX, default_cache
+from src.cpu_core.prog_loader import load_prog_hex
+from src.cpu_core import run_cpu
+
+
+PROGRAM_HEX = """\
+# x1 = 5, x2 = 10, x3 = x1 + x2
+0x0050_0093   // addi x1, x0, 5
+00A00113
+002081B3
+00100073      # ebreak
+"""
+
+
+def _write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+# ------------------------------------------------------------
+# Test 1 — miss, hit, edited file and damaged entry
+# ------------------------------------------------------------
+def test_hit_miss_and_invalidation(tmp_path):
+    path = _write(tmp_path, "prog.hex", PROGRAM_HEX)
+    cache = ImageCache(str(tmp_path / "cache"))
+    expected = load_prog_hex(path)
+
+    assert cache.load_words(path) == expected
+    assert (cache.hits, cache.misses) == (0, 1)
+    image = cache.load(path)
+    assert image.words.tolist() == expected and image.words.readonly
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Same content under another name is the same entry
+    copy = _write(tmp_path, "copy.hex", PROGRAM_HEX)
+    assert cache.load_words(copy) == expected
+    assert cache.hits == 2 and len(cache.entries()) == 1
+
+    # Edited contents get a new key
+    _write(tmp_path, "prog.hex", PROGRAM_HEX + "0000006F\n")
+    assert cache.load_words(path) == expected + [0x6F]
+    assert cache.misses == 2 and len(cache.entries()) == 2
+
+    # A truncated entry is re-parsed and rewritten
+    entry = cache.path_for(image.key)
+    with open(entry, "r+b") as f:
+        f.truncate(70)
+    assert cache.load_words(copy) == expected
+    assert cache.misses == 3
+    assert cache.load_words(copy) == expected and cache.hits == 3
+
+    # Parse errors are not cached
+    bad = _write(tmp_path, "bad.hex", "12G4\n")
+    with pytest.raises(ValueError, match="line 1"):
+        cache.load_words(bad)
+    assert len(cache.entries()) == 2
+
+
+# ------------------------------------------------------------
+# Test 2 — size cap evicts the least recently used image
+# ------------------------------------------------------------
+def test_lru_eviction(tmp_path):
+    cache = ImageCache(str(tmp_path / "cache"))
+    paths = [_write(tmp_path, f"p{k}.hex", f"{k:08X}\n" * 100) for k in range(3)]
+    first = cache.path_for(cache.load(paths[0]).key)
+    cache.max_bytes = 2 * os.path.getsize(first)
+
+    second = cache.path_for(cache.load(paths[1]).key)
+    os.utime(first, ns=(1, 1))                        # p0 written first ...
+    os.utime(second, ns=(2, 2))
+    cache.load(paths[0])                              # ... but used most recently
+    cache.load(paths[2])                              # so p1 is evicted
+
+    assert not os.path.exists(second) and os.path.exists(first)
+    assert len(cache.entries()) == 2
+    assert cache.size_bytes() <= cache.max_bytes
+    hits = cache.hits
+    cache.load(paths[0])
+    assert cache.hits == hits + 1
+    cache.load(paths[1])
+    assert cache.misses == 4
+
+
+# ------------------------------------------------------------
+# Test 3 — predecoded fields map back as NumPy views
+# ------------------------------------------------------------
+def test_decoded_fields(tmp_path):
+    np = pytest.importorskip("numpy")
+    from src.cpu_core.bulk_decode import decode_image
+
+    path = _write(tmp_path, "prog.hex", PROGRAM_HEX)
+    cache = ImageCache(str(tmp_path / "cache"))
+    cache.load(path)                                  # words only
+    image = cache.load(path, decoded=True)            # upgraded entry
+    assert cache.misses == 2
+
+    again = ImageCache(cache.directory).load(path, decoded=True)
+    ref = decode_image(load_prog_hex(path))
+    for name in ("words", "opcode", "rd", "rs1", "rs2", "funct3", "funct7", "imm", "iclass"):
+        got = getattr(again.decoded, name)
+        assert got.dtype == getattr(ref, name).dtype
+        assert np.array_equal(got, getattr(ref, name))
+    assert not again.decoded.imm.flags.writeable
+    assert image.words.tolist() == again.words.tolist()
+
+
+# ------------------------------------------------------------
+# Test 4 — run_program / CLI use the cache unless told not to
+# ------------------------------------------------------------
+def test_run_program_and_cli(tmp_path, monkeypatch, capsys):
+    path = _write(tmp_path, "prog.hex", PROGRAM_HEX)
+    monkeypatch.setenv("RVSIM_IMAGE_CACHE", str(tmp_path / "default"))
+
+    cpu = run_cpu.run_program(path)
+    assert cpu.regs.read(3) == 15
+    assert default_cache().misses == 1
+    cpu = run_cpu.run_program(path)
+    assert cpu.regs.read(3) == 15
+    assert default_cache().hits == 1
+
+    assert run_cpu.run_program(path, cache=False).regs.read(3) == 15
+    assert default_cache().hits == 1
+
+    cli_dir = tmp_path / "cli"
+    assert run_cpu.main([path, "--image-cache-dir", str(cli_dir)]) == 0
+    assert [p.suffix for p in cli_dir.iterdir()] == [IMAGE_SUFFIX]
+    assert "x03 = 0x0000000F" in capsys.readouterr().out
+
+    monkeypatch.setenv("RVSIM_NO_IMAGE_CACHE", "1")
+    assert default_cache() is None
+    other = tmp_path / "unused"
+    monkeypatch.setenv("RVSIM_IMAGE_CACHE", str(other))
+    assert run_cpu.main([path, "--no-image-cache"]) == 0
+    assert run_cpu.run_program(path).regs.read(3) == 15
+    assert not other.exists()
@@ -0,0 +1,153 @@
+# tests/test_lockstep.py
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import (
+    CPU,
+    StopConditions,
+    STOP_EBREAK,
+    STOP_MAX_STEPS,
+    STOP_SELF_LOOP,
+)
+from src.cpu_core.lockstep import LockstepCPU, STOP_FAULT
+
+
+# Sum n + (n-1) + ... + 1 onto x11, then store / reload / shift it.
+# The loop count depends on x10, so instances diverge by input.
+SUM_PROG = [
+    0x00050863,   # 0x00: beq  x10, x0, +16
+    0x00A585B3,   # 0x04: add  x11, x11, x10
+    0xFFF50513,   # 0x08: addi x10, x10, -1
+    0xFF5FF06F,   # 0x0C: jal  x0, -12
+    0x00B62023,   # 0x10: sw   x11, 0(x12)
+    0x00062683,   # 0x14: lw   x13, 0(x12)
+    0x0006C463,   # 0x18: blt  x13, x0, +8
+    0x4016D733,   # 0x1C: sra  x14, x13, x1
+    0x00D737B3,   # 0x20: sltu x15, x14, x13
+    0x00100073,   # 0x24: ebreak
+]
+
+DMEM_WORDS = 64
+
+
+def _make_imem(words) -> Memory:
+    imem = Memory(256)
+    imem.load_program(words)
+    return imem
+
+
+def _reference(words, inputs, max_steps):
+    """Run one reference CPU; return (cpu, exception or None)."""
+    cpu = CPU(_make_imem(words), Memory(DMEM_WORDS))
+    for idx, val in inputs.items():
+        cpu.regs.write(idx, val)
+    try:
+        cpu.run(max_steps=max_steps, stop=StopConditions())
+    except (IndexError, ValueError) as exc:
+        return cpu, exc
+    return cpu, None
+
+
+# ------------------------------------------------------------
+# Test 1 — diverging instances match the reference CPU one by one
+# ------------------------------------------------------------
+def test_lockstep_matches_reference_per_instance():
+    rng = random.Random(8)
+    n = 200
+    inputs = {
+        10: [rng.randrange(0, 20) for _ in range(n)],
+        11: [rng.getrandbits(32) for _ in range(n)],
+        # Mostly valid addresses, some misaligned or out of range
+        12: [rng.choice([4 * rng.randrange(DMEM_WORDS), rng.getrandbits(32)])
+             for _ in range(n)],
+        1: [rng.getrandbits(32) for _ in range(n)],
+    }
+
+    batch = LockstepCPU(_make_imem(SUM_PROG), n, DMEM_WORDS)
+    for idx, vals in inputs.items():
+        batch.set_reg(idx, vals)
+    batch.run(max_steps=500, stop=StopConditions())
+
+    reasons = set()
+    for k in range(n):
+        cpu, exc = _reference(SUM_PROG, {r: v[k] for r, v in inputs.items()}, 500)
+        state = batch.get_state(k)
+        assert state.pc == cpu.pc
+        assert state.regs == cpu.regs.dump()
+        assert int(batch.cycle[k]) == cpu.cycle
+        assert batch.dmem[k].tolist() == cpu.dmem.dump_words()
+        if exc is None:
+            assert batch.stop_reason[k] == cpu.last_stop.reason
+        else:
+            assert batch.stop_reason[k] == STOP_FAULT
+            assert type(batch.faults[k]) is type(exc)
+            assert str(batch.faults[k]) == str(exc)
+        reasons.add(batch.stop_reason[k])
+
+    assert reasons == {STOP_EBREAK, STOP_FAULT}
+
+
+# ------------------------------------------------------------
+# Test 2 — step budget, self-loop halts and per-instance DMEM
+# ------------------------------------------------------------
+def test_lockstep_budget_and_self_loop():
+    prog = [
+        0x00052083,   # 0x00: lw   x1, 0(x10)
+        0x00008463,   # 0x04: beq  x1, x0, +8
+        0x0000006F,   # 0x08: jal  x0, 0
+        0x00000063,   # 0x0C: beq  x0, x0, 0
+    ]
+    batch = LockstepCPU(_make_imem(prog), 3, DMEM_WORDS)
+    batch.set_reg(10, [8, 8, 8])
+    batch.load_dmem(1, [7], base_addr=8)
+    batch.run(max_steps=10, stop=StopConditions())
+
+    assert batch.stop_reason[0] == STOP_SELF_LOOP and int(batch.pc[0]) == 0x0C
+    assert batch.stop_reason[1] == STOP_SELF_LOOP and int(batch.pc[1]) == 0x08
+    assert int(batch.regs[1, 1]) == 7
+
+    # Without stop conditions every instance uses the full budget
+    batch = LockstepCPU(_make_imem(prog), 2, DMEM_WORDS)
+    steps = batch.run(max_steps=10)
+    assert steps == 10
+    assert batch.cycle.tolist() == [10, 10]
+    assert batch.stop_reason == [STOP_MAX_STEPS, STOP_MAX_STEPS]
+
+
+# ------------------------------------------------------------
+# Test 3 — byte/halfword loads and stores per instance
+# ------------------------------------------------------------
+def test_lockstep_subword_access():
+    prog = [
+        0x0020A023,   # 0x00: sw   x2, 0(x1)
+        0x00008183,   # 0x04: lb   x3, 0(x1)
+        0x0020D203,   # 0x08: lhu  x4, 2(x1)
+        0x002082A3,   # 0x0C: sb   x2, 5(x1)
+        0x00209323,   # 0x10: sh   x2, 6(x1)
+        0x00609283,   # 0x14: lh   x5, 6(x1)
+        0x0050C303,   # 0x18: lbu  x6, 5(x1)
+        0x00100073,   # 0x1C: ebreak
+    ]
+    rng = random.Random(11)
+    # Valid bases plus a misaligned word and a sub-word past the end
+    bases = [0x0, 0x40, 0xF0, 0x42, 0xFC, 0x80]
+    values = [rng.getrandbits(32) for _ in bases]
+
+    batch = LockstepCPU(_make_imem(prog), len(bases), DMEM_WORDS)
+    batch.set_reg(1, bases)
+    batch.set_reg(2, values)
+    batch.run(max_steps=100, stop=StopConditions())
+
+    for k in range(len(bases)):
+        cpu, exc = _reference(prog, {1: bases[k], 2: values[k]}, 100)
+        assert batch.get_state(k) == cpu.get_state()
+        assert batch.dmem[k].tolist() == cpu.dmem.dump_words()
+        if exc is None:
+            assert batch.stop_reason[k] == STOP_EBREAK
+        else:
+            assert str(batch.faults[k]) == str(exc)
+    assert batch.stop_reason.count(STOP_FAULT) == 2
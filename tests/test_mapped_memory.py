@@ -0,0 +1,94 @@
+# tests/test_mapped_memory.py
+import struct
+
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import CPU, StopConditions, STOP_SELF_LOOP
+from src.cpu_core.paged_memory import (
+    PagedMemory,
+    PAGE_SIZE,
+    MAP_COPY,
+    MAP_READONLY,
+    MAP_WRITEBACK,
+)
+
+
+def _write_words(path, words) -> None:
+    path.write_bytes(struct.pack(f"<{len(words)}I", *words))
+
+
+# ------------------------------------------------------------
+# Test 1 — copy-on-write mapping never touches the file
+# ------------------------------------------------------------
+def test_cow_mapping_reads_file_and_keeps_it_intact(tmp_path):
+    data = tmp_path / "data.bin"
+    words = list(range(PAGE_SIZE // 4 + 3))      # one full page + a partial one
+    _write_words(data, words)
+    original = data.read_bytes()
+
+    mem = PagedMemory()
+    region = mem.map_file(str(data), 0x1000_0000, mode=MAP_COPY)
+    assert region.length == len(original)
+    assert mem.load_word(0x1000_0000 + 4 * 1000) == 1000
+    assert mem.load_word(0x1000_0000 + 4 * (len(words) - 1)) == len(words) - 1
+    assert mem.load_word(0x1000_0000 + 4 * len(words)) == 0   # tail padding
+    assert mem.num_pages == 0                                  # no private copies
+
+    mem.store_word(0x1000_0000, 0xDEAD_BEEF)
+    mem.store_byte(0x1000_0000 + 4 * len(words) - 1, 0x7F)
+    assert mem.load_word(0x1000_0000) == 0xDEAD_BEEF
+    mem.close()
+    assert data.read_bytes() == original
+
+
+# ------------------------------------------------------------
+# Test 2 — read-only and writeback modes, placement errors
+# ------------------------------------------------------------
+def test_readonly_and_writeback_modes(tmp_path):
+    data = tmp_path / "data.bin"
+    _write_words(data, [1, 2, 3])                # 12 bytes: tail page only
+
+    mem = PagedMemory()
+    mem.map_file(str(data), 0x2000, mode=MAP_READONLY)
+    assert mem.read_bytes(0x2000, 12) == data.read_bytes()
+    with pytest.raises(ValueError, match="read-only"):
+        mem.store_word(0x2004, 9)
+    with pytest.raises(ValueError, match="overlaps"):
+        mem.map_file(str(data), 0x2000)
+    with pytest.raises(ValueError, match="page-aligned"):
+        mem.map_file(str(data), 0x3004)
+    with pytest.raises(IndexError):
+        PagedMemory(PAGE_SIZE).map_file(str(data), PAGE_SIZE)
+
+    # Unmapping restores the fill pattern underneath
+    mem.unmap(mem.regions[0])
+    assert mem.load_word(0x2004) == 0
+
+    region = mem.map_file(str(data), 0x2000, mode=MAP_WRITEBACK, offset=4)
+    assert mem.load_word(0x2000) == 2
+    mem.store_word(0x2004, 0xCAFE)
+    mem.flush()
+    assert struct.unpack("<3I", data.read_bytes()) == (1, 2, 0xCAFE)
+    mem.unmap(region)
+
+
+# ------------------------------------------------------------
+# Test 3 — run code straight out of a mapped image
+# ------------------------------------------------------------
+def test_cpu_runs_mapped_program(tmp_path):
+    image = tmp_path / "prog.bin"
+    _write_words(image, [
+        0x00500093,   # addi x1, x0, 5
+        0x00108113,   # addi x2, x1, 1
+        0x0000006F,   # jal  x0, 0
+    ])
+    imem = PagedMemory()
+    imem.map_file(str(image), 0x8000_0000, mode=MAP_READONLY)
+    cpu = CPU(imem, Memory(16), pc_reset=0x8000_0000, predecode=True)
+
+    info = cpu.run(max_steps=100, stop=StopConditions())
+    assert info.reason == STOP_SELF_LOOP
+    assert (cpu.regs.read(1), cpu.regs.read(2)) == (5, 6)
+    assert cpu.pc == 0x8000_0008
+    imem.close()
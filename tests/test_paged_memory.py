@@ -0,0 +1,114 @@
+# tests/test_paged_memory.py
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import CPU, StopConditions, STOP_EBREAK
+from src.cpu_core.paged_memory import PagedMemory, PAGE_SIZE
+
+
+# Byte/halfword program; x1 is the data base address.
+SUBWORD_PROG = [
+    0x800000B7,   # 0x00: lui  x1, 0x80000        # x1 = 0x8000_0000
+    0x12345137,   # 0x04: lui  x2, 0x12345
+    0x6F810113,   # 0x08: addi x2, x2, 0x6F8       # x2 = 0x1234_56F8
+    0x0020A023,   # 0x0C: sw   x2, 0(x1)
+    0x00008183,   # 0x10: lb   x3, 0(x1)           # 0xFFFF_FFF8
+    0x0000C203,   # 0x14: lbu  x4, 0(x1)           # 0xF8
+    0x00209283,   # 0x18: lh   x5, 2(x1)           # 0x1234
+    0x0000D303,   # 0x1C: lhu  x6, 0(x1)           # 0x56F8
+    0xFFF00393,   # 0x20: addi x7, x0, -1
+    0x007080A3,   # 0x24: sb   x7, 1(x1)           # word = 0x1234_FFF8
+    0x00709323,   # 0x28: sh   x7, 6(x1)           # word@4 = 0xFFFF_0000
+    0x00009403,   # 0x2C: lh   x8, 0(x1)           # 0xFFFF_FFF8
+    0x0040A483,   # 0x30: lw   x9, 4(x1)
+    0xFFF08503,   # 0x34: lb   x10, -1(x1)         # untouched page -> 0
+    0xFE208FA3,   # 0x38: sb   x2, -1(x1)          # 0x7FFF_FFFF = 0xF8
+    0xFFF0C583,   # 0x3C: lbu  x11, -1(x1)
+    0x00100073,   # 0x40: ebreak
+]
+
+EXPECTED = {3: 0xFFFF_FFF8, 4: 0xF8, 5: 0x1234, 6: 0x56F8, 8: 0xFFFF_FFF8,
+            9: 0xFFFF_0000, 10: 0, 11: 0xF8}
+
+
+def _make_cpu(words, dmem) -> CPU:
+    imem = Memory(256)
+    imem.load_program(words)
+    return CPU(imem, dmem)
+
+
+# ------------------------------------------------------------
+# Test 1 — little-endian access, lazy pages and error checks
+# ------------------------------------------------------------
+def test_paged_memory_access_and_lazy_pages():
+    mem = PagedMemory()
+    assert mem.load_word(0x7FFF_FFF0) == 0
+    assert mem.num_pages == 0                 # reads never allocate
+
+    mem.store_word(0x8000_0000, 0x1122_3344)
+    mem.store_byte(0x7FFF_FFFF, 0xAB)
+    assert mem.num_pages == 2
+    assert [mem.load_byte(0x8000_0000 + k) for k in range(4)] == [0x44, 0x33, 0x22, 0x11]
+    assert mem.load_half(0x8000_0002) == 0x1122
+
+    # Byte ranges cross page boundaries
+    assert mem.read_bytes(0x7FFF_FFFE, 4) == b"\x00\xab\x44\x33"
+    mem.write_bytes(PAGE_SIZE - 2, b"\x01\x02\x03\x04")
+    assert mem.load_word(PAGE_SIZE - 4) == 0x0201_0000
+    assert mem.load_half(PAGE_SIZE) == 0x0403
+
+    with pytest.raises(ValueError):
+        mem.load_word(0x8000_0002)
+    with pytest.raises(ValueError):
+        mem.store_half(0x8000_0001, 0)
+    with pytest.raises(IndexError):
+        PagedMemory(64).load_byte(64)
+
+    mem.reset(0xDEAD_BEEF)
+    assert mem.num_pages == 0
+    assert mem.load_word(0x1234_5670) == 0xDEAD_BEEF
+
+
+# ------------------------------------------------------------
+# Test 2 — LB/LH/LBU/LHU/SB/SH on every engine, paged and dense
+# ------------------------------------------------------------
+@pytest.mark.parametrize("engine", ["run", "run_fast", "run_blocks"])
+def test_subword_instructions(engine):
+    cpu = _make_cpu(SUBWORD_PROG, PagedMemory())
+    if engine == "run":
+        info = cpu.run(max_steps=100, stop=StopConditions())
+        assert info.reason == STOP_EBREAK
+    else:
+        getattr(cpu, engine)(max_steps=len(SUBWORD_PROG))
+
+    for idx, val in EXPECTED.items():
+        assert cpu.regs.read(idx) == val, f"x{idx}"
+    assert cpu.dmem.load_word(0x8000_0000) == 0x1234_FFF8
+    assert cpu.dmem.load_byte(0x7FFF_FFFF) == 0xF8
+    assert cpu.dmem.num_pages == 2
+
+    # Same program on dense Memory with the data at 0x100
+    dense = _make_cpu([0x10000093] + SUBWORD_PROG[1:], Memory(256))
+    getattr(dense, engine)(max_steps=len(SUBWORD_PROG))
+    for idx, val in EXPECTED.items():
+        assert dense.regs.read(idx) == val, f"x{idx}"
+    assert dense.dmem.load_word(0x100) == 0x1234_FFF8
+    assert dense.dmem.load_word(0xFC) == 0xF800_0000
+
+
+# ------------------------------------------------------------
+# Test 3 — sub-word faults match across engines
+# ------------------------------------------------------------
+@pytest.mark.parametrize("engine", ["run", "run_fast", "run_blocks"])
+def test_subword_faults(engine):
+    # addi x1, x0, 1 ; lh x2, 0(x1)   -> unaligned halfword
+    cpu = _make_cpu([0x00100093, 0x00009103], Memory(16))
+    with pytest.raises(ValueError, match="halfword"):
+        getattr(cpu, engine)(max_steps=2)
+    assert (cpu.pc, cpu.cycle) == (4, 1)
+
+    # addi x1, x0, 64 ; sb x1, 0(x1)   -> past the end of 16 words
+    cpu = _make_cpu([0x04000093, 0x00108023], Memory(16))
+    with pytest.raises(IndexError):
+        getattr(cpu, engine)(max_steps=2)
+    assert (cpu.pc, cpu.cycle) == (4, 1)
@@ -0,0 +1,68 @@
+# tests/test_prog_loader.py
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.array_memory import ArrayMemory
+from src.cpu_core.paged_memory import PagedMemory
+from src.cpu_core.prog_loader import load_prog_hex, load_hex_into, iter_hex_chunks
+
+
+MIXED_HEX = """\
+# header comment
+00500093
+0x00A0_0113   // prefix, underscores, comment
+  002081B3  # indented
+0X13
+
+DEADBEEF\r
+123456789     # wider than 32 bits: masked
+"""
+MIXED_WORDS = [0x0050_0093, 0x00A0_0113, 0x0020_81B3, 0x13, 0xDEAD_BEEF, 0x2345_6789]
+
+
+# ------------------------------------------------------------
+# Test 1 — every formatting rule, any chunk size
+# ------------------------------------------------------------
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_mixed_formatting(tmp_path, chunk_size):
+    path = tmp_path / "mixed.hex"
+    path.write_bytes(MIXED_HEX.encode())
+    assert load_prog_hex(str(path)) == MIXED_WORDS
+    chunks = list(iter_hex_chunks(str(path), chunk_size))
+    assert [w for c in chunks for w in c] == MIXED_WORDS
+
+
+# ------------------------------------------------------------
+# Test 2 — streamed into each memory type, no list in between
+# ------------------------------------------------------------
+@pytest.mark.parametrize("mem_factory", [
+    lambda: Memory(4096),
+    lambda: ArrayMemory(4096),
+    lambda: PagedMemory(1 << 20),
+])
+def test_load_hex_into(tmp_path, mem_factory):
+    words = [(0x9E37_79B9 * k) & 0xFFFF_FFFF for k in range(3000)]
+    path = tmp_path / "big.hex"
+    path.write_text("\n".join(f"{w:08x}" for w in words))      # no final newline
+    mem = mem_factory()
+    mem.store_word(0x40, 0x1234)
+    assert load_hex_into(str(path), mem, base_addr=0x44, chunk_size=4096) == 3000
+    assert mem.load_word(0x40) == 0x1234
+    assert [mem.load_word(0x44 + 4 * k) for k in range(3000)] == words
+    assert mem.load_word(0x44 + 4 * 3000) == 0
+
+
+# ------------------------------------------------------------
+# Test 3 — errors still name the file line, wherever the chunk cut is
+# ------------------------------------------------------------
+@pytest.mark.parametrize("chunk_size", [5, 1 << 20])
+def test_error_line_numbers(tmp_path, chunk_size):
+    lines = ["00500093"] * 40 + ["0x12G4  # typo"] + ["00500093"] * 5
+    path = tmp_path / "bad.hex"
+    path.write_text("\n".join(lines) + "\n")
+    with pytest.raises(ValueError, match=r"line 41: '0x12G4  # typo\\n'"):
+        load_hex_into(str(path), ArrayMemory(64), chunk_size=chunk_size)
+
+    path.write_text("00500093\n12 34\n")
+    with pytest.raises(ValueError, match="line 2"):
+        load_prog_hex(str(path))
@@ -0,0 +1,54 @@
+# tests/test_regfile.py
+import pytest
+
+from src.cpu_core.regfile import RegFile
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import CPU
+
+
+# ------------------------------------------------------------
+# Test 1 — validated API: range checks, masking, write-enable, x0
+# ------------------------------------------------------------
+def test_checked_api_unchanged():
+    regs = RegFile()
+    regs.write(5, 0x1_2345_6789)
+    assert regs.read(5) == 0x2345_6789
+    regs.write(6, -1)
+    assert regs.read(6) == 0xFFFF_FFFF
+    regs.write(7, 1, we=False)
+    regs.write(0, 99)
+    assert regs.read(7) == 0 and regs.read(0) == 0
+
+    for bad in (-1, 32):
+        with pytest.raises(IndexError):
+            regs.read(bad)
+        with pytest.raises(IndexError):
+            regs.write(bad, 1)
+
+
+# ------------------------------------------------------------
+# Test 2 — unchecked path shares storage and keeps x0 at zero
+# ------------------------------------------------------------
+def test_unchecked_path():
+    regs = RegFile()
+    for i in range(32):
+        regs.write_unchecked(i, 0x100 + i)
+    assert regs.read_unchecked(0) == 0
+    assert regs.dump() == [0] + [0x100 + i for i in range(1, 32)]
+    assert all(regs.read(i) == regs.read_unchecked(i) for i in range(32))
+
+
+# ------------------------------------------------------------
+# Test 3 — datapath writes through the fast path: x0 stays zero
+# ------------------------------------------------------------
+def test_datapath_x0_stays_zero():
+    imem = Memory(16)
+    imem.load_program([
+        0x00500013,   # addi x0, x0, 5
+        0xFFF00093,   # addi x1, x0, -1
+        0x0000006F,   # jal  x0, 0
+    ])
+    cpu = CPU(imem, Memory(16))
+    cpu.run(max_steps=3)
+    assert cpu.regs.read(0) == 0
+    assert cpu.regs.read(1) == 0xFFFF_FFFF
@@ -0,0 +1,90 @@
+# tests/test_result_cache.py
+from src.cpu_core.datapath import CPU, StopConditions, STOP_SELF_LOOP
+from src.cpu_core.result_cache import ResultCache, dmem_digest, run_key
+from src.cpu_core.run_cpu import run_program, run_words
+from src.cpu_core.batch import run_batch, BatchJob
+
+
+# addi x1, x0, 5 ; sw x1, 8(x0) ; addi x2, x1, 1 ; sw x2, 12(x0) ; jal x0, 0
+STORE_PROG = [0x00500093, 0x00102423, 0x00108113, 0x00202623, 0x0000006F]
+
+
+def _no_simulation(self, *args, **kwargs):
+    raise AssertionError("memoized run should not simulate")
+
+
+# ------------------------------------------------------------
+# Test 1 — a hit rebuilds the same final CPU without running
+# ------------------------------------------------------------
+def test_hit_matches_fresh_run(tmp_path, monkeypatch):
+    results = ResultCache(str(tmp_path / "results"))
+    fresh = run_words(STORE_PROG, dmem_words=64, results=results)
+    assert (results.hits, results.misses) == (0, 1)
+
+    with monkeypatch.context() as m:
+        m.setattr(CPU, "run", _no_simulation)
+        memo = run_words(STORE_PROG, dmem_words=64, results=results)
+    assert (results.hits, results.misses) == (1, 1)
+
+    assert memo.pc == fresh.pc
+    assert memo.regs.dump() == fresh.regs.dump()
+    assert memo.cycle == fresh.cycle
+    assert memo.last_stop == fresh.last_stop
+    assert memo.last_stop.reason == STOP_SELF_LOOP
+    assert memo.dmem.dump_words() == fresh.dmem.dump_words()
+    assert memo.dmem.load_word(12) == 6
+
+    # Every input is part of the key
+    run_words(STORE_PROG, dmem_words=64, max_steps=3, results=results)
+    run_words(STORE_PROG, dmem_words=128, results=results)
+    run_words(STORE_PROG, dmem_words=64, stop=None, results=results)
+    assert results.misses == 4 and len(results.entries()) == 4
+
+
+# ------------------------------------------------------------
+# Test 2 — what is never memoized, damaged records, default directory
+# ------------------------------------------------------------
+def test_uncacheable_and_damaged(tmp_path, monkeypatch):
+    results = ResultCache(str(tmp_path / "results"))
+    timed = StopConditions(time_budget=10.0)
+    assert run_key(STORE_PROG, 16, 16, 100, 0, timed) is None
+    run_words(STORE_PROG, stop=timed, results=results)
+    run_words(STORE_PROG, fuse=True, results=results)
+    assert results.entries() == [] and results.misses == 2
+
+    run_words(STORE_PROG, results=results)
+    (entry,) = results.entries()
+    with open(entry, "r+b") as f:
+        f.truncate(200)
+    assert run_words(STORE_PROG, results=results).regs.read(2) == 6
+    assert results.misses == 4
+    run_words(STORE_PROG, results=results)
+    assert results.hits == 1
+
+    # The default directory does not follow the image cache's override
+    monkeypatch.delenv("RVSIM_RESULT_CACHE")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    monkeypatch.setenv("RVSIM_IMAGE_CACHE", str(tmp_path / "imgs"))
+    assert ResultCache().directory == str(tmp_path / "xdg" / "rv-sim" / "results")
+
+
+# ------------------------------------------------------------
+# Test 3 — run_program and batch share a store; digest-only records
+# ------------------------------------------------------------
+def test_run_program_and_batch(tmp_path):
+    path = tmp_path / "store.hex"
+    path.write_text("\n".join(f"{w:08X}" for w in STORE_PROG) + "\n")
+    store = str(tmp_path / "results")
+
+    first = list(run_batch([str(path)], workers=0, digest=True, results=store))
+    again = list(run_batch([BatchJob(str(path))], workers=0, digest=True, results=store))
+    assert first == again
+    assert first[0].error is None and first[0].regs[2] == 6
+
+    # Batch keeps only the digest, so run_program must simulate once
+    results = ResultCache(store)
+    cpu = run_program(str(path), results=results)
+    assert results.misses == 1
+    assert dmem_digest(cpu.dmem.dump_words()) == first[0].dmem_digest
+    cpu = run_program(str(path), results=results)
+    assert results.hits == 1 and cpu.dmem.load_word(8) == 5
@@ -0,0 +1,87 @@
+# tests/test_scheduler.py
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import (
+    CPU,
+    StopConditions,
+    STOP_EBREAK,
+    STOP_MAX_STEPS,
+    STOP_SELF_LOOP,
+)
+from src.cpu_core.scheduler import (
+    Scheduler,
+    POLICY_PRIORITY,
+    STOP_ERROR,
+    STOP_CANCELLED,
+)
+
+
+# addi x1, x1, 1 ; jal x0, -4   (counts forever)
+COUNT_PROG = [0x00108093, 0xFFDFF06F]
+# addi x1, x0, 5 ; ebreak
+SHORT_PROG = [0x00500093, 0x00100073]
+
+
+def _make_cpu(words) -> CPU:
+    imem = Memory(256)
+    imem.load_program(words)
+    return CPU(imem, Memory(256))
+
+
+# ------------------------------------------------------------
+# Test 1 — round-robin: short jobs finish early, long ones keep
+#          their budget, and state matches an uninterrupted run
+# ------------------------------------------------------------
+def test_round_robin_retires_and_matches_plain_run():
+    retired = []
+    sched = Scheduler(quantum=7, on_retire=lambda t: retired.append(t.name))
+    long_id = sched.add(_make_cpu(COUNT_PROG), max_steps=100, name="long")
+    short_id = sched.add(_make_cpu(SHORT_PROG), name="short")
+    loop_id = sched.add(_make_cpu([0x0000006F]), name="loop")   # jal x0, 0
+
+    sched.run(max_quanta=2)
+    assert retired == ["short"]
+    assert sched.tasks[long_id].steps == 7
+    assert 0 < sched.progress()[long_id] < 1
+
+    sched.run()
+    assert retired == ["short", "loop", "long"]
+    assert sched.active == []
+
+    long_task = sched.tasks[long_id]
+    ref = _make_cpu(COUNT_PROG)
+    ref.run(max_steps=100)
+    assert long_task.cpu.get_state() == ref.get_state()
+    assert (long_task.info.reason, long_task.info.steps) == (STOP_MAX_STEPS, 100)
+    assert long_task.quanta == 15              # 14 x 7 + 1 x 2
+    assert sched.tasks[short_id].info.reason == STOP_EBREAK
+    assert sched.tasks[short_id].cpu.regs.read(1) == 5
+    assert sched.tasks[loop_id].info.reason == STOP_SELF_LOOP
+
+
+# ------------------------------------------------------------
+# Test 2 — priority order, cancel and faulting CPUs
+# ------------------------------------------------------------
+def test_priority_cancel_and_errors():
+    sched = Scheduler(quantum=10, policy=POLICY_PRIORITY)
+    low = sched.add(_make_cpu(COUNT_PROG), max_steps=30, priority=0)
+    high = sched.add(_make_cpu(COUNT_PROG), max_steps=30, priority=5)
+    bad = sched.add(_make_cpu([0x00102083]), priority=9)   # lw x1, 1(x0)
+
+    order = [sched.run_quantum().task_id for _ in range(5)]
+    assert order == [bad, high, high, high, low]
+
+    bad_task = sched.tasks[bad]
+    assert bad_task.info.reason == STOP_ERROR
+    assert isinstance(bad_task.error, ValueError)
+
+    sched.cancel(low)
+    assert sched.run() == 0
+    assert sched.tasks[low].steps == 10 and sched.tasks[low].done
+    assert sched.tasks[low].info.reason == STOP_CANCELLED
+    assert sched.tasks[low].cpu.last_stop.reason == STOP_CANCELLED
+    assert sched.tasks[high].info.reason == STOP_MAX_STEPS
+
+    with pytest.raises(ValueError):
+        Scheduler(policy="fifo")
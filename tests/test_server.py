@@ -0,0 +1,174 @@
+# tests/test_server.py
+import asyncio
+import json
+import os
+import stat
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from src.cpu_core import client, server
+from src.cpu_core.client import SimClient
+from src.cpu_core.server import SimServer
+from src.cpu_core.run_cpu import run_program, run_words, main as run_cpu_main
+
+
+PROG = str(Path(__file__).parent / "programs" / "prog.hex")
+
+# addi x1, x0, 5 ; sw x1, 8(x0) ; jal x0, 0
+STORE_PROG = [0x00500093, 0x00102423, 0x0000006F]
+SPIN = [0x0000006F]                                 # jal x0, 0
+
+
+# ------------------------------------------------------------
+# Helper: server on a Unix socket, event loop in a background thread
+# ------------------------------------------------------------
+@pytest.fixture
+def sock(tmp_path):
+    path = str(tmp_path / "sim.sock")
+    srv = SimServer(workers=0)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+
+    def serve():
+        loop.run_until_complete(srv.start(path=path))
+        ready.set()
+        loop.run_until_complete(srv.serve_until_shutdown())
+        loop.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    yield SimpleNamespace(path=path, thread=thread)
+    if thread.is_alive():
+        with SimClient(path) as c:
+            c.shutdown()
+        thread.join(5)
+
+
+# ------------------------------------------------------------
+# Test 1 — results match local runs; bad requests get error replies
+# ------------------------------------------------------------
+def test_jobs_match_local_runs(sock):
+    with SimClient(sock.path, timeout=10) as c:
+        ids = [
+            c.submit(PROG),
+            c.submit(STORE_PROG, max_steps=2, digest=True),
+            c.submit(PROG, no_halt=True, max_steps=50),
+            c.submit("missing.hex"),
+        ]
+        replies = {r["id"]: r for r in (c.wait(i) for i in reversed(ids))}
+
+        expected = [
+            run_program(PROG),
+            run_words(STORE_PROG, max_steps=2),
+            run_program(PROG, max_steps=50, stop=None),
+        ]
+        for job_id, cpu in zip(ids, expected):
+            res = replies[job_id]["result"]
+            assert replies[job_id]["status"] == "done"
+            assert (res["pc"], res["regs"], res["cycle"]) == (cpu.pc, cpu.regs.dump(), cpu.cycle)
+            assert res["stop_reason"] == cpu.last_stop.reason
+        assert replies[ids[1]]["result"]["dmem_digest"]
+        assert replies[ids[3]]["status"] == "error"
+        assert "FileNotFoundError" in replies[ids[3]]["result"]["error"]
+
+        secret = Path(sock.path).with_name("secret.txt")
+        secret.write_text("top secret line\n")
+        reply = c.run(str(secret))
+        assert reply["status"] == "error"
+        assert "not a valid .hex program" in reply["result"]["error"]
+        assert "top secret" not in json.dumps(reply)
+
+        c.send({"op": "run", "id": "bad", "words": "nope"})
+        assert "Invalid job" in c.wait("bad")["error"]
+        c.send({"op": "frobnicate", "id": 7})
+        assert "Unknown op" in c.wait(7)["error"]
+        c._sock.sendall(b"not json\n")
+        assert "Bad request" in next(c.replies())["error"]
+
+        stats = c.stats()
+        assert stats["done"] == 3 and stats["error"] == 3 and stats["in_flight"] == 0
+
+    assert stat.S_IMODE(os.stat(sock.path).st_mode) == 0o600
+    with pytest.raises(ValueError, match="non-loopback"):
+        asyncio.run(SimServer(workers=0).start(host="0.0.0.0", port=0))
+
+
+# ------------------------------------------------------------
+# Test 2 — per-job timeout and cancelling a queued job
+# ------------------------------------------------------------
+def test_timeout_and_cancel(sock):
+    with SimClient(sock.path, timeout=10) as c:
+        slow = c.submit(SPIN, no_halt=True, max_steps=10**9, timeout=0.3)
+        queued = c.submit(STORE_PROG)                  # one worker: waits behind slow
+        c.cancel(queued)
+        first = next(c.replies())
+        assert first == {"id": queued, "status": "cancelled"}
+
+        reply = c.wait(slow)
+        assert reply["status"] == "done"
+        assert reply["result"]["stop_reason"] == "timeout"
+        assert 0 < reply["result"]["cycle"] < 10**9
+
+        c.cancel("no-such-job")
+        assert c.wait("no-such-job")["status"] == "error"
+        assert c.stats()["cancelled"] == 1
+
+
+# ------------------------------------------------------------
+# Test 3 — cancelling a running job frees its worker
+# ------------------------------------------------------------
+def test_cancel_running_job(sock):
+    with SimClient(sock.path, timeout=10) as c:
+        spin = c.submit(SPIN, no_halt=True, max_steps=10**9)   # no timeout
+        time.sleep(0.2)
+        assert c.stats()["in_flight"] == 1                     # it is running
+        c.cancel(spin)
+        reply = c.wait(spin)
+        assert reply["status"] == "cancelled"
+        assert reply["result"]["stop_reason"] == "cancelled"
+        assert 0 < reply["result"]["cycle"] < 10**9
+
+        # The single worker is free again, and the slot is reusable
+        after = c.run(STORE_PROG)
+        assert after["status"] == "done" and after["result"]["regs"][1] == 5
+        stats = c.stats()
+        assert stats["cancelled"] == 1 and stats["in_flight"] == 0
+
+
+# ------------------------------------------------------------
+# Test 4 — client CLI prints what run_cpu prints
+# ------------------------------------------------------------
+def test_client_cli(sock, tmp_path, capsys):
+    assert run_cpu_main([PROG, "25"]) == 0
+    local = capsys.readouterr().out
+
+    assert client.main([PROG, "25", "--socket", sock.path]) == 0
+    assert capsys.readouterr().out == local
+
+    assert client.main([str(tmp_path / "missing.hex"), "--socket", sock.path]) == 1
+    assert "FileNotFoundError" in capsys.readouterr().err
+
+    assert client.main(["--stats", "--shutdown", "--socket", sock.path]) == 0
+    assert '"done": 1' in capsys.readouterr().out
+    sock.thread.join(5)                             # server fully stopped
+    assert not sock.thread.is_alive()
+    assert client.main(["--stats", "--socket", sock.path]) == 2
+    assert "Cannot reach" in capsys.readouterr().err
+
+
+# ------------------------------------------------------------
+# Test 5 — workers keep parsed images warm until the file changes
+# ------------------------------------------------------------
+def test_warm_images(tmp_path):
+    path = tmp_path / "warm.hex"
+    path.write_text("00500093\n")
+    first = server._warm_words(str(path))
+    assert server._warm_words(str(path)) is first
+
+    path.write_text("00500093\n00A00113\n")
+    assert server._warm_words(str(path)) == [0x0050_0093, 0x00A0_0113]
@@ -0,0 +1,101 @@
+# tests/test_shm_memory.py
+import subprocess
+import sys
+import textwrap
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.array_memory import ArrayMemory
+from src.cpu_core.datapath import CPU, StopConditions
+from src.cpu_core.shm_memory import SharedArrayMemory, SharedMemoryReader
+
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# sw x2, 0(x1); sb x2, 5(x1); sh x2, 10(x1); ebreak
+STORE_PROG = [0x0020A023, 0x002082A3, 0x00209523, 0x00100073]
+
+
+# ------------------------------------------------------------
+# Test 1 — a CPU writes shared DMEM; a reader sees it by name
+# ------------------------------------------------------------
+def test_cpu_writes_visible_to_reader():
+    imem = Memory(16)
+    imem.load_program(STORE_PROG)
+    dmem = SharedArrayMemory(64)
+    reader = SharedMemoryReader(dmem.name)
+    try:
+        live = reader.view()                    # zero-copy: no re-read needed
+        cpu = CPU(imem, dmem)
+        cpu.regs.write(1, 0x20)
+        cpu.regs.write(2, 0x1234_5678)
+        cpu.run(max_steps=10, stop=StopConditions())
+
+        assert reader.num_words == 64
+        assert live[8:11].tolist() == [0x1234_5678, 0x0000_7800, 0x5678_0000]
+        assert reader.read_words(0x20, 3) == dmem.load_words(0x20, 3)
+        assert reader.sequence == dmem.sequence == 2 * 3   # even: no write in progress
+
+        private = dmem.fork()
+        assert type(private) is ArrayMemory
+        private.store_word(0x20, 0)
+        assert live[8] == 0x1234_5678
+        with pytest.raises(IndexError):
+            reader.read_words(0x100, 1)
+        live.release()
+    finally:
+        reader.close()
+        dmem.close()
+        dmem.unlink()
+
+
+# ------------------------------------------------------------
+# Test 2 — snapshots from another process are never torn
+# ------------------------------------------------------------
+def test_reader_process_gets_consistent_snapshots():
+    pytest.importorskip("numpy")
+    mem = SharedArrayMemory(4096)
+    script = textwrap.dedent(f"""
+        import time
+        from src.cpu_core.shm_memory import SharedMemoryReader
+        reader = SharedMemoryReader({mem.name!r})
+        assert reader.as_numpy().shape == (4096,)
+        seqs = set()
+        deadline = time.monotonic() + 5
+        while len(seqs) < 20 and time.monotonic() < deadline:
+            seq, words = reader.snapshot()
+            assert seq % 2 == 0
+            assert (words == words[0]).all(), "torn snapshot"
+            seqs.add(seq)
+        reader.close()
+        print(len(seqs))
+    """)
+    try:
+        proc = subprocess.Popen([sys.executable, "-c", script], cwd=REPO_ROOT,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        k = 0
+        while proc.poll() is None:              # keep writing while it reads
+            k += 1
+            mem.fill(0, 4096, k)
+        out, err = proc.communicate()
+        assert proc.returncode == 0, err
+        assert int(out) == 20                   # it saw the memory change
+    finally:
+        mem.close()
+        mem.unlink()
+
+
+# ------------------------------------------------------------
+# Test 3 — readers refuse segments that are not simulator memories
+# ------------------------------------------------------------
+def test_reader_rejects_foreign_segment():
+    other = shared_memory.SharedMemory(create=True, size=128)
+    try:
+        with pytest.raises(ValueError, match="not a simulator memory"):
+            SharedMemoryReader(other.name)
+    finally:
+        other.close()
+        other.unlink()
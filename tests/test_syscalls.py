@@ -0,0 +1,159 @@
+# tests/test_syscalls.py
+import io
+import time
+
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.datapath import CPU, StopConditions, STOP_ECALL, STOP_EXIT
+from src.cpu_core.syscalls import SyscallHandler, ENOSYS
+from src.cpu_core import run_cpu
+
+
+# write(1, "hi\n", 3), then exit(3 + 4).  11 instructions retire;
+# the addi/ebreak after the exit must never run.
+HELLO_PROG = [
+    0x000A72B7,   # 0x00: lui  x5, 0xA7
+    0x96828293,   # 0x04: addi x5, x5, -1688      # x5 = "hi\n"
+    0x10502023,   # 0x08: sw   x5, 0x100(x0)
+    0x00100513,   # 0x0C: addi a0, x0, 1          # fd = stdout
+    0x10000593,   # 0x10: addi a1, x0, 0x100
+    0x00300613,   # 0x14: addi a2, x0, 3
+    0x04000893,   # 0x18: addi a7, x0, 64         # write
+    0x00000073,   # 0x1C: ecall
+    0x00450513,   # 0x20: addi a0, a0, 4          # 3 bytes written + 4
+    0x05D00893,   # 0x24: addi a7, x0, 93         # exit
+    0x00000073,   # 0x28: ecall
+    0x00100313,   # 0x2C: addi x6, x0, 1          # never reached
+    0x00100073,   # 0x30: ebreak
+]
+
+# brk, clock_gettime, read into an unaligned buffer, an unknown
+# syscall, then exit(-1).  Results are kept in x20..x24.
+MISC_PROG = [
+    0x0D600893,   # 0x00: addi a7, x0, 214        # brk(0)
+    0x00000513,   # 0x04: addi a0, x0, 0
+    0x00000073,   # 0x08: ecall
+    0x00050A13,   # 0x0C: addi x20, a0, 0
+    0x04050513,   # 0x10: addi a0, a0, 64         # brk(start + 64)
+    0x00000073,   # 0x14: ecall
+    0x00050A93,   # 0x18: addi x21, a0, 0
+    0x00100513,   # 0x1C: addi a0, x0, 1          # CLOCK_MONOTONIC
+    0x20000593,   # 0x20: addi a1, x0, 0x200
+    0x07100893,   # 0x24: addi a7, x0, 113        # clock_gettime
+    0x00000073,   # 0x28: ecall
+    0x00050B13,   # 0x2C: addi x22, a0, 0
+    0x00000513,   # 0x30: addi a0, x0, 0          # fd = stdin
+    0x30100593,   # 0x34: addi a1, x0, 0x301      # unaligned buffer
+    0x00800613,   # 0x38: addi a2, x0, 8
+    0x03F00893,   # 0x3C: addi a7, x0, 63         # read
+    0x00000073,   # 0x40: ecall
+    0x00050B93,   # 0x44: addi x23, a0, 0
+    0x1F400893,   # 0x48: addi a7, x0, 500        # custom / unknown
+    0x00000073,   # 0x4C: ecall
+    0x00050C13,   # 0x50: addi x24, a0, 0
+    0xFFF00513,   # 0x54: addi a0, x0, -1
+    0x05D00893,   # 0x58: addi a7, x0, 93         # exit(-1)
+    0x00000073,   # 0x5C: ecall
+]
+
+
+def _make_cpu(prog, **kwargs) -> CPU:
+    imem = Memory(256)
+    imem.load_program(prog)
+    return CPU(imem, Memory(1024), **kwargs)
+
+
+# ------------------------------------------------------------
+# Test 1 — write is buffered, exit stops the run at once
+# ------------------------------------------------------------
+@pytest.mark.parametrize("engine", ["run", "run_stop", "fuse", "run_fast", "run_blocks"])
+def test_write_and_exit(engine):
+    cpu = _make_cpu(HELLO_PROG, fuse=engine == "fuse")
+    out = io.BytesIO()
+    cpu.syscalls = SyscallHandler(stdout=out)
+
+    if engine in ("run_fast", "run_blocks"):
+        getattr(cpu, engine)(1000)
+    else:
+        info = cpu.run(max_steps=1000, stop=StopConditions() if engine == "run_stop" else None)
+        assert (info.reason, info.steps) == (STOP_EXIT, 11)
+
+    assert out.getvalue() == b"hi\n"
+    assert cpu.exit_code == 7
+    assert (cpu.cycle, cpu.pc) == (11, 0x2C)
+    assert cpu.regs.read(6) == 0
+
+    # An exited CPU stays stopped
+    assert cpu.run(max_steps=1000).reason == STOP_EXIT
+    cpu.run_fast(1000)
+    cpu.run_blocks(1000)
+    assert cpu.cycle == 11
+
+
+# ------------------------------------------------------------
+# Test 2 — output is held until the threshold, exit or flush()
+# ------------------------------------------------------------
+def test_output_buffering():
+    out = io.BytesIO()
+    handler = SyscallHandler(stdout=out)
+    cpu = _make_cpu(HELLO_PROG)
+    cpu.syscalls = handler
+    cpu.run(max_steps=8)                        # up to and including the write
+    assert out.getvalue() == b"" and handler.output(1) == b"hi\n"
+    assert cpu.regs.read(10) == 3
+    cpu.run(max_steps=1000)
+    assert out.getvalue() == b"hi\n" and handler.output(1) == b""
+
+    # A threshold of 1 writes straight through
+    out = io.BytesIO()
+    cpu = _make_cpu(HELLO_PROG)
+    cpu.syscalls = SyscallHandler(stdout=out, flush_threshold=1)
+    cpu.run(max_steps=8)
+    assert out.getvalue() == b"hi\n"
+
+
+# ------------------------------------------------------------
+# Test 3 — brk, clock_gettime, read and custom syscalls
+# ------------------------------------------------------------
+def test_brk_clock_read_and_register():
+    cpu = _make_cpu(MISC_PROG)
+    handler = SyscallHandler(stdin=io.BytesIO(b"abcdef"))
+    cpu.syscalls = handler
+    before = time.monotonic_ns()
+    assert cpu.run(max_steps=1000).reason == STOP_EXIT
+    after = time.monotonic_ns()
+
+    x = cpu.regs.dump()
+    assert x[20] == 2048                        # middle of the 4 KiB DMEM
+    assert x[21] == 2048 + 64
+    assert x[22] == 0
+    sec = cpu.dmem.load_word(0x200) | (cpu.dmem.load_word(0x204) << 32)
+    assert before <= sec * 1_000_000_000 + cpu.dmem.load_word(0x208) <= after
+    assert x[23] == 6                           # short read: EOF after 6 bytes
+    assert [cpu.dmem.load_byte(0x301 + k) for k in range(7)] == list(b"abcdef") + [0]
+    assert x[24] == (-ENOSYS) & 0xFFFF_FFFF
+    assert cpu.exit_code == -1 and handler.calls == 6
+
+    # register() plugs in new numbers; without a handler ECALL just halts
+    cpu = _make_cpu(MISC_PROG)
+    cpu.syscalls = SyscallHandler(stdin=io.BytesIO(b""))
+    cpu.syscalls.register(500, lambda cpu, *args: 0x1234)
+    cpu.run(max_steps=1000)
+    assert cpu.regs.read(24) == 0x1234
+
+    cpu = _make_cpu(MISC_PROG)
+    info = cpu.run(max_steps=1000, stop=StopConditions())
+    assert (info.reason, info.pc, cpu.exit_code) == (STOP_ECALL, 0x0C, None)
+
+
+# ------------------------------------------------------------
+# Test 4 — CLI: --syscalls passes the exit status through
+# ------------------------------------------------------------
+def test_cli_syscalls(tmp_path, capfd):
+    hex_path = tmp_path / "hello.hex"
+    hex_path.write_text("\n".join(f"{w:08X}" for w in HELLO_PROG) + "\n")
+    assert run_cpu.main([str(hex_path), "--syscalls"]) == 7
+    out = capfd.readouterr().out
+    assert out.startswith("hi\n")
+    assert "Stop reason: exit" in out and "Exit code: 7" in out
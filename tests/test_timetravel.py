@@ -0,0 +1,217 @@
+# tests/test_timetravel.py
+import io
+
+import pytest
+
+from src.cpu_core.memory import Memory
+from src.cpu_core.paged_memory import PagedMemory
+from src.cpu_core.datapath import CPU, StopConditions, StopInfo
+from src.cpu_core.syscalls import SyscallHandler
+from src.cpu_core.timetravel import TimeTravel
+
+
+# Store a running sum to 40 consecutive words from 0x100, then EBREAK
+# (243 instructions).  The sb overwrites one byte of each stored word.
+FILL_PROG = [
+    0x02800513,   # 0x00: addi x10, x0, 40
+    0x10000613,   # 0x04: addi x12, x0, 0x100
+    0x00A585B3,   # 0x08: add  x11, x11, x10
+    0x00B62023,   # 0x0C: sw   x11, 0(x12)
+    0x00A60123,   # 0x10: sb   x10, 2(x12)
+    0x00460613,   # 0x14: addi x12, x12, 4
+    0xFFF50513,   # 0x18: addi x10, x10, -1
+    0xFE0516E3,   # 0x1C: bne  x10, x0, -20
+    0x00100073,   # 0x20: ebreak
+]
+TOTAL_STEPS = 243
+
+# addi a7, x0, 93 ; addi a0, x0, 7 ; addi x5, x0, 1 ; ecall (exit 7)
+EXIT_PROG = [0x05D00893, 0x00700513, 0x00100293, 0x00000073]
+
+# write(1, 0x100, 4), then branch on its result: 0x1C only runs if a0 != 4
+WRITE_PROG = [
+    0x04000893,   # 0x00: addi a7, x0, 64
+    0x00100513,   # 0x04: addi a0, x0, 1
+    0x10000593,   # 0x08: addi a1, x0, 0x100
+    0x00400613,   # 0x0C: addi a2, x0, 4
+    0x00000073,   # 0x10: ecall
+    0xFFC50313,   # 0x14: addi x6, a0, -4
+    0x00030463,   # 0x18: beq  x6, x0, +8
+    0x00100393,   # 0x1C: addi x7, x0, 1
+    0x00200413,   # 0x20: addi x8, x0, 2
+    0x00140413,   # 0x24: addi x8, x8, 1
+    0x00140413,   # 0x28: addi x8, x8, 1
+    0x00140413,   # 0x2C: addi x8, x8, 1
+    0x00100073,   # 0x30: ebreak
+]
+
+
+def _make_cpu(mem_factory) -> CPU:
+    imem = mem_factory()
+    imem.load_program(FILL_PROG)
+    return CPU(imem, mem_factory(), predecode=True)
+
+
+def _state(cpu: CPU):
+    return (cpu.cycle, cpu.pc, cpu.regs.dump(),
+            [cpu.dmem.load_word(4 * k) for k in range(128)])
+
+
+def _trace(mem_factory):
+    """State before every cycle of a plain run (index = cycle)."""
+    cpu = _make_cpu(mem_factory)
+    states = [_state(cpu)]
+    for _ in range(TOTAL_STEPS):
+        cpu.step()
+        states.append(_state(cpu))
+    return states
+
+
+# ------------------------------------------------------------
+# Test 1 — step_back undoes register and memory writes exactly
+# ------------------------------------------------------------
+@pytest.mark.parametrize("mem_factory", [lambda: Memory(256), lambda: PagedMemory(1 << 16)])
+def test_step_back_matches_forward_trace(mem_factory):
+    states = _trace(mem_factory)
+    cpu = _make_cpu(mem_factory)
+    tt = TimeTravel(cpu, snapshot_every=50)
+    cpu.run(max_steps=1000, stop=StopConditions())
+    assert _state(cpu) == states[TOTAL_STEPS]
+
+    tt.step_back()
+    assert _state(cpu) == states[TOTAL_STEPS - 1]
+    tt.step_back(100)
+    assert _state(cpu) == states[TOTAL_STEPS - 101]
+    tt.goto_cycle(7)
+    assert _state(cpu) == states[7]
+
+    # Running forward again re-records; fast engines fall back to run()
+    cpu.run_fast(100)
+    assert _state(cpu) == states[107]
+    tt.step_back(100)
+    assert _state(cpu) == states[7]
+    with pytest.raises(ValueError, match="future"):
+        tt.goto_cycle(8)
+
+    tt.detach()
+    assert cpu.timetravel is None
+    cpu.run(max_steps=1000, stop=StopConditions())
+    assert _state(cpu) == states[TOTAL_STEPS]
+
+
+# ------------------------------------------------------------
+# Test 2 — bounded journal: old history is reached through snapshots
+# ------------------------------------------------------------
+def test_bounded_history_replays_from_snapshots():
+    mem_factory = lambda: PagedMemory(1 << 16)
+    states = _trace(mem_factory)
+    cpu = _make_cpu(mem_factory)
+    tt = TimeTravel(cpu, snapshot_every=10, max_journal=30, max_snapshots=6)
+    cpu.run(max_steps=1000, stop=StopConditions())
+
+    assert tt.journal_length <= 30
+    assert len(tt.snapshots) <= 6
+    assert tt.oldest_cycle == 0                 # the first snapshot is never thinned
+    gaps = [b.cycle - a.cycle for a, b in zip(tt.snapshots, tt.snapshots[1:])]
+    assert gaps == sorted(gaps, reverse=True)   # older history is sparser
+
+    tt.goto_cycle(3)
+    assert _state(cpu) == states[3]
+    cpu.run(max_steps=1000, stop=StopConditions())
+    assert _state(cpu) == states[TOTAL_STEPS]
+    tt.step_back(TOTAL_STEPS - 150)
+    assert _state(cpu) == states[150]
+
+
+# ------------------------------------------------------------
+# Test 3 — run_back_to finds the latest earlier visit of a PC
+# ------------------------------------------------------------
+def test_run_back_to():
+    states = _trace(lambda: Memory(256))
+    cpu = _make_cpu(lambda: Memory(256))
+    tt = TimeTravel(cpu, snapshot_every=16, max_journal=40)
+    cpu.run(max_steps=1000, stop=StopConditions())
+
+    # The last store of the loop happened 6 instructions before the end
+    assert tt.run_back_to(0x0C)
+    assert _state(cpu) == states[TOTAL_STEPS - 6]
+    assert tt.run_back_to(0x0C)
+    assert _state(cpu) == states[TOTAL_STEPS - 12]
+
+    # 0x04 only ran at cycle 1, long before the journal starts
+    assert tt.run_back_to(0x04)
+    assert _state(cpu) == states[1]
+
+    # Unknown PC: nothing changes
+    assert not tt.run_back_to(0x400)
+    assert _state(cpu) == states[1]
+
+
+# ------------------------------------------------------------
+# Test 4 — rewinding past a guest exit clears the exit code
+# ------------------------------------------------------------
+@pytest.mark.parametrize("max_journal", [1000, 2])
+def test_rewind_past_exit(max_journal):
+    imem = PagedMemory(1 << 16)
+    imem.load_program(EXIT_PROG)
+    cpu = CPU(imem, PagedMemory(1 << 16))
+    cpu.syscalls = SyscallHandler()
+    tt = TimeTravel(cpu, snapshot_every=1, max_journal=max_journal)
+    assert cpu.run(max_steps=100, stop=StopConditions()).reason == "exit"
+    assert cpu.exit_code == 7
+
+    tt.step_back(3)
+    assert (cpu.cycle, cpu.exit_code) == (1, None)
+    assert cpu.run(max_steps=100, stop=StopConditions()) == StopInfo("exit", 3, 16)
+    assert cpu.exit_code == 7
+
+
+# ------------------------------------------------------------
+# Test 5 — replaying across an ECALL reuses its result, without host I/O
+# ------------------------------------------------------------
+def test_replay_across_syscall():
+    imem = PagedMemory(1 << 16)
+    imem.load_program(WRITE_PROG)
+    cpu = CPU(imem, PagedMemory(1 << 16))
+    out = io.BytesIO()
+    cpu.syscalls = handler = SyscallHandler(stdout=out, flush_threshold=1)
+    tt = TimeTravel(cpu, snapshot_every=4, max_journal=2)
+    cpu.run(max_steps=100, stop=StopConditions())
+    assert out.getvalue() == bytes(4) and handler.calls == 1
+
+    # 0x20 is older than the journal: found by replaying from a snapshot
+    assert tt.run_back_to(0x20)
+    assert (cpu.cycle, cpu.regs.read(10), cpu.regs.read(6)) == (7, 4, 0)
+    assert cpu.syscalls is handler
+    assert out.getvalue() == bytes(4) and handler.calls == 1
+
+    # Running forward from before the ECALL calls the host again
+    tt.goto_cycle(2)
+    cpu.run(max_steps=100, stop=StopConditions())
+    assert out.getvalue() == bytes(8) and handler.calls == 2
+    assert cpu.regs.read(7) == 0 and cpu.regs.read(8) == 5
+
+
+# ------------------------------------------------------------
+# Test 6 — replays never log ECALLs, so later rewinds drop stale results
+# ------------------------------------------------------------
+def test_syscall_log_stays_consistent():
+    imem = PagedMemory(1 << 16)
+    imem.load_program([0x00000073] + [0x00000013] * 9 + [0x00000073] + [0x00000013] * 20)
+    cpu = CPU(imem, PagedMemory(1 << 16))
+    cpu.regs.write(17, 500)                         # a7: a custom syscall
+    tt = TimeTravel(cpu, snapshot_every=1000, max_journal=2)   # replays start at 0
+    cpu.step()                                      # cycle 0: ECALL, no handler
+    handler = SyscallHandler()
+    handler.register(500, lambda *_: 123)
+    cpu.syscalls = handler
+    cpu.run(max_steps=15)                           # cycle 10: ECALL sets a0 = 123
+    assert cpu.regs.read(10) == 123
+
+    tt.goto_cycle(13)                               # replays both ECALLs
+    tt.goto_cycle(5)
+    cpu.syscalls = None
+    cpu.run(max_steps=10)                           # cycle 10 again, now a no-op
+    assert cpu.regs.read(10) == 0
+    tt.goto_cycle(12)
+    assert cpu.regs.read(10) == 0